@@ -23,8 +23,9 @@ load_dotenv()
     "--input",
     "-i",
     required=True,
+    multiple=True,
     type=click.Path(exists=True),
-    help="Path to input PlantUML diagram file (.puml)",
+    help="Path to input PlantUML diagram file (.puml); repeat to analyse a multi-file model",
 )
 @click.option(
     "--output",
@@ -52,7 +53,7 @@ load_dotenv()
 )
 @click.option(
     "--llm-provider",
-    type=click.Choice(["openai", "anthropic"], case_sensitive=False),
+    type=click.Choice(["openai", "anthropic", "local"], case_sensitive=False),
     default="openai",
     help="LLM provider for naming abstract classes (default: openai)",
 )
@@ -79,6 +80,145 @@ load_dotenv()
     default=2,
     help="Minimum extent size for concepts (default: 2)",
 )
+@click.option(
+    "--partition-by",
+    type=click.Choice(["package", "component", "community"], case_sensitive=False),
+    default=None,
+    help="Run FCA independently per package, graph component or community",
+)
+@click.option(
+    "--partition-feature-sharing/--no-partition-feature-sharing",
+    default=None,
+    help="Link classes sharing features when computing components/communities",
+)
+@click.option(
+    "--fca-hubs",
+    is_flag=True,
+    help="Also run FCA on the classes linked across partitions",
+)
+@click.option(
+    "--max-workers",
+    type=int,
+    default=None,
+    help="Maximum number of partitions analysed in parallel",
+)
+@click.option(
+    "--kg-backend",
+    type=click.Choice(["networkx", "compact"], case_sensitive=False),
+    default="networkx",
+    help="Knowledge graph storage backend (default: networkx)",
+)
+@click.option(
+    "--shared-features",
+    is_flag=True,
+    help="Use one knowledge graph node per distinct feature",
+)
+@click.option(
+    "--kg-export",
+    type=click.Choice(["ndjson", "node-link", "none"], case_sensitive=False),
+    default="ndjson",
+    help="Knowledge graph export format (default: ndjson)",
+)
+@click.option(
+    "--kg-export-compress",
+    is_flag=True,
+    help="Gzip the ndjson knowledge graph export",
+)
+@click.option(
+    "--kg-store",
+    type=click.Path(),
+    default=None,
+    help="SQLite database accumulating the knowledge graph of every run",
+)
+@click.option(
+    "--kg-rdf",
+    is_flag=True,
+    help="Also export the knowledge graph as N-Triples",
+)
+@click.option(
+    "--naming-concurrency",
+    type=int,
+    default=4,
+    help="Maximum number of concurrent LLM naming requests (default: 4)",
+)
+@click.option(
+    "--naming-batch-size",
+    type=int,
+    default=1,
+    help="Number of concepts named per LLM request (default: 1)",
+)
+@click.option(
+    "--naming-cache",
+    type=click.Path(),
+    default=None,
+    help="SQLite file caching LLM-generated names across runs",
+)
+@click.option(
+    "--naming-cache-ttl",
+    type=float,
+    default=None,
+    help="Lifetime of cached names in seconds (default: no expiry)",
+)
+@click.option(
+    "--naming-similarity",
+    type=float,
+    default=None,
+    help="Share one name between concepts whose intents have this Jaccard similarity",
+)
+@click.option(
+    "--llm-rpm",
+    type=float,
+    default=None,
+    help="Maximum LLM requests per minute (default: unlimited)",
+)
+@click.option(
+    "--llm-tpm",
+    type=float,
+    default=None,
+    help="Maximum LLM tokens per minute (default: unlimited)",
+)
+@click.option(
+    "--llm-max-retries",
+    type=int,
+    default=3,
+    help="Retries of rate-limited, timed-out or failed LLM requests (default: 3)",
+)
+@click.option(
+    "--llm-timeout",
+    type=float,
+    default=30.0,
+    help="Per-request LLM timeout in seconds (default: 30)",
+)
+@click.option(
+    "--llm-base-url",
+    type=str,
+    default=None,
+    help="OpenAI-compatible endpoint of the 'local' provider (e.g. python -m src.mock_llm)",
+)
+@click.option(
+    "--llm-record",
+    type=click.Path(),
+    default=None,
+    help="Record LLM prompts and responses to this JSON lines file",
+)
+@click.option(
+    "--llm-replay",
+    type=click.Path(exists=True),
+    default=None,
+    help="Replay LLM responses from a recording instead of calling the provider",
+)
+@click.option(
+    "--fallback-rules",
+    multiple=True,
+    type=click.Path(exists=True),
+    help="JSON keyword rules for fallback naming, tried before the built-in ones; repeatable",
+)
+@click.option(
+    "--name-index",
+    type=click.Path(),
+    default=None,
+    help="Class name index of processed diagrams, used by fallback naming and extended by every run",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 def main(
     input,
@@ -91,6 +231,30 @@ def main(
     fca4j_path,
     min_relevance,
     min_extent_size,
+    partition_by,
+    max_workers,
+    partition_feature_sharing,
+    fca_hubs,
+    kg_backend,
+    shared_features,
+    kg_export,
+    kg_export_compress,
+    kg_store,
+    kg_rdf,
+    naming_concurrency,
+    naming_batch_size,
+    naming_cache,
+    naming_cache_ttl,
+    naming_similarity,
+    llm_rpm,
+    llm_tpm,
+    llm_max_retries,
+    llm_timeout,
+    llm_base_url,
+    llm_record,
+    llm_replay,
+    fallback_rules,
+    name_index,
     verbose,
 ):
     """
@@ -119,9 +283,13 @@ def main(
         click.echo("=" * 80)
         click.echo()
 
-    # Validate input file
-    if not input.endswith(".puml") and not input.endswith(".plantuml"):
-        click.secho("Warning: Input file doesn't have .puml extension", fg="yellow")
+    # Validate input files
+    for input_file in input:
+        if not input_file.endswith(".puml") and not input_file.endswith(".plantuml"):
+            click.secho(
+                f"Warning: Input file {input_file} doesn't have .puml extension",
+                fg="yellow",
+            )
 
     # Configure pipeline
     config = PipelineConfig(
@@ -133,6 +301,30 @@ def main(
         output_dir=output_dir,
         logs_dir=logs_dir,
         reports_dir=reports_dir,
+        partition_by=partition_by,
+        max_workers=max_workers,
+        partition_feature_sharing=partition_feature_sharing,
+        fca_hubs=fca_hubs,
+        kg_backend=kg_backend,
+        shared_features=shared_features,
+        kg_export_format=kg_export,
+        kg_export_compress=kg_export_compress,
+        kg_store_path=kg_store,
+        kg_export_rdf=kg_rdf,
+        naming_concurrency=naming_concurrency,
+        naming_batch_size=naming_batch_size,
+        naming_cache_path=naming_cache,
+        naming_cache_ttl=naming_cache_ttl,
+        naming_similarity=naming_similarity,
+        llm_requests_per_minute=llm_rpm,
+        llm_tokens_per_minute=llm_tpm,
+        llm_max_retries=llm_max_retries,
+        llm_timeout=llm_timeout,
+        llm_base_url=llm_base_url,
+        llm_record_path=llm_record,
+        llm_replay_path=llm_replay,
+        fallback_rules_paths=list(fallback_rules),
+        name_index_path=name_index,
     )
 
     try:
@@ -140,11 +332,12 @@ def main(
         if verbose:
             click.echo("Initializing pipeline...")
 
-        pipeline = UMLEnhancementPipeline(config)
-
         # Run pipeline
-        click.echo(f"Processing: {input}")
-        results = pipeline.run(input, output)
+        with UMLEnhancementPipeline(config) as pipeline:
+            click.echo(f"Processing: {', '.join(input)}")
+            results = pipeline.run(
+                input[0] if len(input) == 1 else list(input), output
+            )
 
         # Display results
         click.echo()
@@ -208,11 +401,8 @@ def validate(input_file):
     click.echo(f"Validating: {input_file}")
 
     try:
-        with open(input_file, "r") as f:
-            content = f.read()
-
         parser = PlantUMLParser()
-        result = parser.parse(content)
+        result = parser.parse_file(input_file)
 
         click.secho("✓ Valid PlantUML diagram", fg="green")
         click.echo(f"  - Classes: {len(result['classes'])}")
@@ -5,6 +5,8 @@ import csv
 from typing import List, Dict
 from dataclasses import dataclass, asdict
 
+from ..parser import parse_member
+
 
 @dataclass
 class ConceptEvaluation:
@@ -98,19 +100,18 @@ class ConceptEvaluator:
     def _generate_name_justification(self, abstract_class) -> str:
         """Generate justification for the chosen name."""
         # Extract attribute/method names from intent
-        attributes = [
-            f for f in abstract_class.intent if ":" in f or not f.endswith(")")
-        ]
-        methods = [f for f in abstract_class.intent if f.endswith(")")]
+        members = [parse_member(feature) for feature in abstract_class.intent]
+        attributes = [m for m in members if m.kind == "attribute"]
+        methods = [m for m in members if m.kind == "method"]
 
         justification_parts = []
 
         if attributes:
-            attr_names = ", ".join([a.split(":")[0].strip() for a in attributes[:3]])
+            attr_names = ", ".join(a.visibility + a.name for a in attributes[:3])
             justification_parts.append(f"Common attributes: {attr_names}")
 
         if methods:
-            method_names = ", ".join([m.replace("()", "").strip() for m in methods[:3]])
+            method_names = ", ".join(m.visibility + m.name for m in methods[:3])
             justification_parts.append(f"Common methods: {method_names}")
 
         if len(abstract_class.extent) > 0:
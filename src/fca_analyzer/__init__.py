@@ -238,27 +238,50 @@ class FCAAnalyzer:
         if not rows:
             return concepts
 
-        # Get objects and attributes
-        objects = [row["object"] for row in rows]
-        attributes = [k for k in rows[0].keys() if k != "object"]
+        # Get objects and attributes. The object column is the first one:
+        # "object" in hand-written contexts, empty in KnowledgeGraph exports
+        object_column = reader.fieldnames[0]
+        attributes = [k for k in reader.fieldnames if k != object_column]
 
         # Create simple concepts based on common attributes
         # This is simplified - real FCA would compute the concept lattice
         for attr in attributes:
             extent = set()
             for row in rows:
-                if (
-                    row.get(attr) == "True"
-                    or row.get(attr) == "1"
-                    or row.get(attr) is True
-                ):
-                    extent.add(row["object"])
+                if row.get(attr) in ("True", "1", "X") or row.get(attr) is True:
+                    extent.add(row[object_column])
 
             if extent:
                 concepts.append(FormalConcept(extent=extent, intent={attr}))
 
         return concepts
 
+    def merge_concepts(self, concept_lists: List[List[FormalConcept]]):
+        """
+        Replace the current concepts with those of several separate analyses.
+
+        Used when the model is partitioned and each partition is analysed on
+        its own. Concepts found by several analyses (same extent and intent)
+        are kept once, and relevance scores are recomputed over the merged
+        list so they stay comparable across partitions.
+
+        Args:
+            concept_lists: Concepts returned by each partial analysis
+
+        Returns:
+            The merged list of concepts
+        """
+        seen = set()
+        self.concepts = []
+        for concepts in concept_lists:
+            for concept in concepts:
+                key = (frozenset(concept.extent), frozenset(concept.intent))
+                if key not in seen:
+                    seen.add(key)
+                    self.concepts.append(concept)
+        self._calculate_relevance_scores()
+        return self.concepts
+
     def _calculate_relevance_scores(self):
         """Calculate relevance scores for concepts.
 
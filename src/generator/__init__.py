@@ -7,6 +7,14 @@ import os
 class PlantUMLGenerator:
     """Generator for enhanced PlantUML diagrams."""
 
+    # PlantUML keyword used to declare each kind of parsed class
+    CLASS_KEYWORDS = {
+        "class": "class",
+        "abstract": "abstract class",
+        "interface": "interface",
+        "enum": "enum",
+    }
+
     def __init__(self):
         self.output_lines = []
 
@@ -172,7 +180,8 @@ class PlantUMLGenerator:
         if inherited_features is None:
             inherited_features = set()
 
-        self._add_line(f"class {uml_class.name} {{")
+        keyword = self.CLASS_KEYWORDS.get(uml_class.kind, "class")
+        self._add_line(f"{keyword} {uml_class.name} {{")
 
         # Add attributes (excluding inherited ones)
         for attr in uml_class.attributes:
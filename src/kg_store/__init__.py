@@ -0,0 +1,297 @@
+"""SQLite persistence for knowledge graphs, queryable across pipeline runs."""
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..knowledge_graph import MEMBER_RELATIONS, KnowledgeGraph
+from ..parser import UMLClass, UMLRelationship, parse_member
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS classes (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    stereotypes TEXT NOT NULL DEFAULT '[]',
+    UNIQUE (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_classes_name ON classes(name);
+CREATE TABLE IF NOT EXISTS features (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_features_key ON features(key);
+CREATE INDEX IF NOT EXISTS idx_features_name ON features(name);
+CREATE TABLE IF NOT EXISTS incidence (
+    class_id INTEGER NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    feature_id INTEGER NOT NULL REFERENCES features(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (class_id, feature_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_incidence_feature ON incidence(feature_id);
+CREATE TABLE IF NOT EXISTS relationships (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    cardinality_source TEXT,
+    cardinality_target TEXT,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(run_id, source);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(run_id, target);
+"""
+
+
+class KnowledgeGraphStore:
+    """
+    Store knowledge graphs of many runs in one SQLite database.
+
+    Classes, features (deduplicated across runs), the class x feature
+    incidence and relationship edges live in separate indexed tables, so
+    questions such as "which classes declare createdAt" are answered
+    without loading any graph.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Open (and create if needed) a store.
+
+        Args:
+            path: SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self._feature_ids: Dict[Tuple[str, str], int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def save(self, kg: KnowledgeGraph, source: Optional[str] = None) -> int:
+        """
+        Persist a knowledge graph as a new run.
+
+        All rows are bulk inserted in a single transaction; if it rolls
+        back, the feature IDs it created are not cached.
+
+        Args:
+            kg: Knowledge graph built with either backend
+            source: Free-form description of the run input (e.g. file paths)
+
+        Returns:
+            ID of the new run
+        """
+        conn = self.connection
+        new_feature_ids: Dict[Tuple[str, str], int] = {}
+        with conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (created_at, source) VALUES (?, ?)",
+                (datetime.now().isoformat(), source),
+            ).lastrowid
+
+            classes = list(kg.iter_classes())
+            conn.executemany(
+                "INSERT INTO classes (run_id, name, stereotypes) VALUES (?, ?, ?)",
+                (
+                    (run_id, name, json.dumps(list(data.get("stereotypes") or [])))
+                    for name, data in classes
+                ),
+            )
+            class_ids = dict(
+                conn.execute("SELECT name, id FROM classes WHERE run_id = ?", (run_id,))
+            )
+
+            incidence = []
+            for name, data in classes:
+                class_id = class_ids[name]
+                position = 0
+                for kind in MEMBER_RELATIONS:
+                    for key in data.get(f"{kind}s") or []:
+                        incidence.append(
+                            (
+                                class_id,
+                                self._feature_id(kind, key, new_feature_ids),
+                                position,
+                            )
+                        )
+                        position += 1
+            conn.executemany(
+                "INSERT OR IGNORE INTO incidence (class_id, feature_id, position) "
+                "VALUES (?, ?, ?)",
+                incidence,
+            )
+
+            conn.executemany(
+                "INSERT INTO relationships (run_id, source, target, kind, "
+                "cardinality_source, cardinality_target, label) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        run_id,
+                        source_name,
+                        target_name,
+                        data.get("relation"),
+                        data.get("cardinality_source"),
+                        data.get("cardinality_target"),
+                        data.get("label"),
+                    )
+                    for source_name, target_name, data in kg.iter_relationships()
+                ),
+            )
+
+        # Only cache IDs of rows that are committed
+        self._feature_ids.update(new_feature_ids)
+        return run_id
+
+    def _feature_id(
+        self, kind: str, key: str, new_feature_ids: Dict[Tuple[str, str], int]
+    ) -> int:
+        """
+        Get the ID of a feature, inserting it on first use.
+
+        IDs looked up or created by the current transaction go to
+        new_feature_ids until it commits.
+        """
+        feature_id = self._feature_ids.get((kind, key))
+        if feature_id is None:
+            feature_id = new_feature_ids.get((kind, key))
+        if feature_id is None:
+            conn = self.connection
+            conn.execute(
+                "INSERT OR IGNORE INTO features (kind, key, name) VALUES (?, ?, ?)",
+                (kind, key, parse_member(key).name),
+            )
+            feature_id = conn.execute(
+                "SELECT id FROM features WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()[0]
+            new_feature_ids[(kind, key)] = feature_id
+        return feature_id
+
+    def runs(self) -> List[Dict]:
+        """List the stored runs, oldest first."""
+        return [
+            {"id": run_id, "created_at": created_at, "source": source}
+            for run_id, created_at, source in self.connection.execute(
+                "SELECT id, created_at, source FROM runs ORDER BY id"
+            )
+        ]
+
+    def classes_with_feature(
+        self, feature: str, run_id: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Find the classes declaring a feature.
+
+        Args:
+            feature: Member name (e.g. "createdAt") or full feature key
+                (e.g. "+createdAt: Date")
+            run_id: Restrict to one run; all runs if omitted
+
+        Returns:
+            Sorted list of (run_id, class_name) tuples
+        """
+        query = (
+            "SELECT DISTINCT c.run_id, c.name FROM features f "
+            "JOIN incidence i ON i.feature_id = f.id "
+            "JOIN classes c ON c.id = i.class_id "
+            "WHERE (f.name = ? OR f.key = ?)"
+        )
+        params: list = [feature, feature]
+        if run_id is not None:
+            query += " AND c.run_id = ?"
+            params.append(run_id)
+        query += " ORDER BY c.run_id, c.name"
+        return [tuple(row) for row in self.connection.execute(query, params)]
+
+    def load(
+        self, run_id: int, classes: Optional[List[str]] = None, **kg_options
+    ) -> KnowledgeGraph:
+        """
+        Load a run (or part of it) back into a KnowledgeGraph.
+
+        Args:
+            run_id: Run to load
+            classes: Only load these classes and the relationships touching
+                them; the whole run if omitted
+            **kg_options: Passed to KnowledgeGraph (backend, shared_features)
+
+        Returns:
+            Knowledge graph rebuilt from the stored rows
+        """
+        conn = self.connection
+        if classes is None:
+            selection = ""
+        else:
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS selected (name TEXT PRIMARY KEY)"
+            )
+            conn.execute("DELETE FROM selected")
+            conn.executemany(
+                "INSERT OR IGNORE INTO selected (name) VALUES (?)",
+                ((name,) for name in classes),
+            )
+            selection = " AND c.name IN (SELECT name FROM selected)"
+
+        uml_classes = {}
+        ids = {}
+        for class_id, name, stereotypes in conn.execute(
+            "SELECT c.id, c.name, c.stereotypes FROM classes c "
+            f"WHERE c.run_id = ?{selection} ORDER BY c.id",
+            (run_id,),
+        ):
+            uml_classes[name] = UMLClass(
+                name=name,
+                attributes=[],
+                methods=[],
+                stereotypes=json.loads(stereotypes),
+            )
+            ids[class_id] = uml_classes[name]
+
+        for class_id, kind, key in conn.execute(
+            "SELECT i.class_id, f.kind, f.key FROM incidence i "
+            "JOIN features f ON f.id = i.feature_id "
+            "JOIN classes c ON c.id = i.class_id "
+            f"WHERE c.run_id = ?{selection} ORDER BY i.class_id, i.position",
+            (run_id,),
+        ):
+            getattr(ids[class_id], f"{kind}s").append(key)
+
+        if classes is None:
+            rel_filter = ""
+        else:
+            rel_filter = (
+                " AND (source IN (SELECT name FROM selected)"
+                " OR target IN (SELECT name FROM selected))"
+            )
+        relationships = [
+            UMLRelationship(*row)
+            for row in conn.execute(
+                "SELECT source, target, kind, cardinality_source, "
+                "cardinality_target, label FROM relationships "
+                f"WHERE run_id = ?{rel_filter} ORDER BY id",
+                (run_id,),
+            )
+        ]
+
+        kg = KnowledgeGraph(**kg_options)
+        kg.from_uml_model(uml_classes, relationships)
+        return kg
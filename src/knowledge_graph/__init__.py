@@ -1,9 +1,49 @@
 """Knowledge graph module for transforming UML diagrams into graph representations."""
 
-from typing import Dict, List, Set
+import gzip
+import json
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote
 import networkx as nx
 from dataclasses import dataclass
 
+from ..parser import SYMBOLS, Symbols, UMLClass, UMLRelationship, parse_member
+
+# Edge relations linking a class to its members
+MEMBER_RELATIONS = {"attribute": "has_attribute", "method": "has_method"}
+
+# Storage backends for KnowledgeGraph
+BACKENDS = ("networkx", "compact")
+
+
+# Features declared by more classes than this are ignored when partitioning
+# (an "id" attribute on every class would otherwise join everything)
+MAX_FEATURE_DEGREE = 100
+
+# Default namespace of the RDF view
+RDF_BASE_URI = "http://uml-enhancing-tool.org/kg/"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+
+
+def feature_node_id(kind: str, key: str) -> str:
+    """Node ID of a feature shared by all classes declaring it."""
+    return f"{kind}:{key}"
+
+
+def _escape_literal(value: str) -> str:
+    """Escape a string for an N-Triples literal."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
 
 @dataclass
 class GraphNode:
@@ -14,112 +54,853 @@ class GraphNode:
     properties: Dict
 
 
+class CompactGraph:
+    """
+    Integer-indexed, array-backed storage of a UML knowledge graph.
+
+    Classes and features are identified by integer IDs. Class membership is
+    kept as one CSR adjacency per member relation (has_attribute,
+    has_method) and relationships as typed edge arrays, one set per
+    relationship kind, sorted by source class. A relationship declared
+    several times is stored once with its number of declarations, like the
+    single edge of the networkx backend. A NetworkX view with one node per
+    class and per distinct feature is built on demand.
+    """
+
+    def __init__(self, symbols: Optional[Symbols] = None):
+        self.symbols = symbols if symbols is not None else SYMBOLS
+
+        # Classes: declared classes first, then classes only referenced by
+        # relationships (declared[cid] == 0)
+        self.class_names: List[str] = []
+        self.class_index: Dict[str, int] = {}
+        self.declared = array("b")
+        self.stereotypes: Dict[int, List[str]] = {}
+
+        # Features: normalized member keys
+        self.feature_keys: List[str] = []
+        self.feature_kinds: List[str] = []
+        self.feature_index: Dict[str, int] = {}
+
+        # CSR adjacency: members of class c are indices[indptr[c]:indptr[c + 1]]
+        self.indptr = {
+            relation: array("i", [0]) for relation in MEMBER_RELATIONS.values()
+        }
+        self.indices = {relation: array("i") for relation in MEMBER_RELATIONS.values()}
+
+        # Relationship edges per kind: parallel arrays of class IDs, of
+        # string-table IDs (-1 for None) for cardinalities and labels, and of
+        # the number of declarations of each edge
+        self.strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self.edges: Dict[str, Dict[str, array]] = {}
+
+        # Incoming index per kind: edge rows ordered by target class, with
+        # the matching target IDs for binary search
+        self.incoming: Dict[str, Dict[str, array]] = {}
+
+    def from_uml_model(self, classes: Dict, relationships: List) -> "CompactGraph":
+        """
+        Build the compact graph from a parsed UML model.
+
+        Args:
+            classes: Dictionary of UML classes
+            relationships: List of UML relationships
+
+        Returns:
+            The populated CompactGraph
+        """
+        for class_name, uml_class in classes.items():
+            cid = self._class_id(class_name)
+            self.declared[cid] = 1
+            if uml_class.stereotypes:
+                self.stereotypes[cid] = uml_class.stereotypes
+
+            for kind, members in (
+                ("attribute", uml_class.attributes),
+                ("method", uml_class.methods),
+            ):
+                relation = MEMBER_RELATIONS[kind]
+                self.indices[relation].extend(
+                    self._feature_id(key, kind) for key in members
+                )
+                self.indptr[relation].append(len(self.indices[relation]))
+
+        # Group edges by kind, counting repeated declarations, and store each
+        # kind sorted by source
+        grouped: Dict[str, Counter] = {}
+        for rel in relationships:
+            grouped.setdefault(rel.relationship_type, Counter())[
+                (
+                    self._class_id(rel.source),
+                    self._class_id(rel.target),
+                    self._string_id(rel.cardinality_source),
+                    self._string_id(rel.cardinality_target),
+                    self._string_id(rel.label),
+                )
+            ] += 1
+        for kind, counts in grouped.items():
+            rows = sorted(counts, key=lambda row: row[0])
+            columns = (
+                "source",
+                "target",
+                "cardinality_source",
+                "cardinality_target",
+                "label",
+            )
+            self.edges[kind] = {
+                column: array("i", (row[i] for row in rows))
+                for i, column in enumerate(columns)
+            }
+            self.edges[kind]["count"] = array("i", (counts[row] for row in rows))
+            targets = self.edges[kind]["target"]
+            order = sorted(range(len(targets)), key=targets.__getitem__)
+            self.incoming[kind] = {
+                "row": array("i", order),
+                "target": array("i", (targets[row] for row in order)),
+            }
+
+        # Classes only referenced by relationships have no members
+        for relation, indptr in self.indptr.items():
+            indptr.extend([indptr[-1]] * (len(self.class_names) + 1 - len(indptr)))
+
+        return self
+
+    def _class_id(self, name: str) -> int:
+        cid = self.class_index.get(name)
+        if cid is None:
+            cid = len(self.class_names)
+            name = self.symbols.intern(name)
+            self.class_names.append(name)
+            self.class_index[name] = cid
+            self.declared.append(0)
+        return cid
+
+    def _feature_id(self, key: str, kind: str) -> int:
+        fid = self.feature_index.get(key)
+        if fid is None:
+            fid = len(self.feature_keys)
+            key = self.symbols.intern(key)
+            self.feature_keys.append(key)
+            self.feature_kinds.append(kind)
+            self.feature_index[key] = fid
+        return fid
+
+    def _string_id(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        sid = self._string_index.get(value)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(self.symbols.intern(value))
+            self._string_index[value] = sid
+        return sid
+
+    def _string(self, sid: int) -> Optional[str]:
+        return self.strings[sid] if sid >= 0 else None
+
+    def declared_classes(self) -> List[str]:
+        """Names of the classes declared in the model."""
+        return [n for cid, n in enumerate(self.class_names) if self.declared[cid]]
+
+    def class_members(self, class_name: str, kind: str) -> List[str]:
+        """Feature keys of one kind ('attribute' or 'method') of a class."""
+        cid = self.class_index[class_name]
+        relation = MEMBER_RELATIONS[kind]
+        indptr, indices = self.indptr[relation], self.indices[relation]
+        return [self.feature_keys[f] for f in indices[indptr[cid] : indptr[cid + 1]]]
+
+    def iter_relationships(
+        self,
+        class_name: Optional[str] = None,
+        incoming: bool = False,
+        relation: Optional[str] = None,
+    ):
+        """
+        Iterate over relationship edges as (source, target, data) tuples.
+
+        Args:
+            class_name: Only yield edges leaving this class (or entering it
+                when incoming is True)
+            incoming: Select edges by target instead of source
+            relation: Only yield edges of this relationship kind
+
+        Yields:
+            Tuples of source name, target name and edge attributes
+        """
+        cid = self.class_index.get(class_name) if class_name is not None else None
+        if class_name is not None and cid is None:
+            return
+
+        for kind, columns in self.edges.items():
+            if relation is not None and kind != relation:
+                continue
+            sources = columns["source"]
+            if cid is None:
+                rows = range(len(sources))
+            elif incoming:
+                # Rows ordered by target: binary search the target range
+                index = self.incoming[kind]
+                targets = index["target"]
+                rows = index["row"][
+                    bisect_left(targets, cid) : bisect_right(targets, cid)
+                ]
+            else:
+                # Edges are sorted by source: binary search the row range
+                rows = range(bisect_left(sources, cid), bisect_right(sources, cid))
+            for row in rows:
+                yield (
+                    self.class_names[sources[row]],
+                    self.class_names[columns["target"][row]],
+                    {
+                        "relation": kind,
+                        "cardinality_source": self._string(
+                            columns["cardinality_source"][row]
+                        ),
+                        "cardinality_target": self._string(
+                            columns["cardinality_target"][row]
+                        ),
+                        "label": self._string(columns["label"][row]),
+                    },
+                )
+
+    def iter_declarations(self) -> Iterator[Tuple[str, str, Dict]]:
+        """Yield every relationship edge once per declaration in the model."""
+        for kind, columns in self.edges.items():
+            counts = columns["count"]
+            for row, edge in enumerate(self.iter_relationships(relation=kind)):
+                for _ in range(counts[row]):
+                    yield edge
+
+    def number_of_nodes(self) -> int:
+        return len(self.class_names) + len(self.feature_keys)
+
+    def number_of_edges(self) -> int:
+        memberships = sum(len(indices) for indices in self.indices.values())
+        relations = sum(len(columns["source"]) for columns in self.edges.values())
+        return memberships + relations
+
+    def iter_nodes(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (node_id, attributes) for every node, features first.
+
+        Nodes are produced from the compact arrays one at a time, so callers
+        streaming them out never hold a NetworkX view in memory.
+        """
+        for fid, key in enumerate(self.feature_keys):
+            kind = self.feature_kinds[fid]
+            yield feature_node_id(kind, key), {"type": kind, "value": key}
+
+        for cid, class_name in enumerate(self.class_names):
+            if not self.declared[cid]:
+                # Relationship endpoint never declared as a class
+                yield class_name, {}
+                continue
+            yield class_name, {
+                "type": "class",
+                "attributes": self.class_members(class_name, "attribute"),
+                "methods": self.class_members(class_name, "method"),
+                "stereotypes": self.stereotypes.get(cid, []),
+            }
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, Dict]]:
+        """Yield (source, target, attributes) for membership then relationship edges."""
+        for cid, class_name in enumerate(self.class_names):
+            if not self.declared[cid]:
+                continue
+            for kind, relation in MEMBER_RELATIONS.items():
+                for key in self.class_members(class_name, kind):
+                    yield class_name, feature_node_id(kind, key), {"relation": relation}
+
+        yield from self.iter_relationships()
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Materialize a NetworkX view of the graph.
+
+        Each distinct feature becomes a single node (see feature_node_id)
+        linked to every class that declares it.
+
+        Returns:
+            NetworkX directed graph
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.iter_nodes())
+        graph.add_edges_from(self.iter_edges())
+        return graph
+
+
 class KnowledgeGraph:
     """Knowledge graph representation of UML diagrams."""
 
-    def __init__(self):
-        self.graph = nx.DiGraph()
+    def __init__(
+        self,
+        symbols: Optional[Symbols] = None,
+        backend: str = "networkx",
+        shared_features: bool = False,
+    ):
+        """
+        Initialize the knowledge graph.
+
+        Args:
+            symbols: Symbols used to intern class and member names
+                (defaults to the process-wide SYMBOLS shared with the parser)
+            backend: "networkx" stores NetworkX nodes for classes and members;
+                "compact" stores an integer-indexed CompactGraph and only
+                builds a NetworkX view when `graph` is accessed
+            shared_features: With the networkx backend, create a single node
+                per distinct feature (see feature_node_id) with has_attribute/
+                has_method edges from every class declaring it, instead of one
+                node per member occurrence. The compact backend always
+                shares features.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown knowledge graph backend '{backend}'. "
+                f"Expected one of: {', '.join(BACKENDS)}"
+            )
+
+        self.backend = backend
+        self.shared_features = shared_features
+        self.symbols = symbols if symbols is not None else SYMBOLS
+        self.compact: Optional[CompactGraph] = None
+        self._graph = nx.DiGraph()
+        self._graph_is_view = False
         self._node_counter = 0
 
-    def from_uml_model(self, classes: Dict, relationships: List) -> nx.DiGraph:
+        # Relationship adjacency of the networkx backend, maintained at build
+        # time: direction ("out"/"in") -> class -> relation -> entry ->
+        # (other, data), where entry is (other, cardinalities, label). A
+        # relationship declared several times is indexed once and counted in
+        # _relationship_counts by (direction, class, relation, *entry)
+        self._adjacency: Dict[str, Dict[str, Dict[str, Dict[Tuple, Tuple]]]] = {
+            "out": {},
+            "in": {},
+        }
+        self._relationship_counts: Counter = Counter()
+
+    @property
+    def graph(self) -> nx.DiGraph:
+        """NetworkX graph (materialized on demand for the compact backend)."""
+        if self.compact is not None and not self._graph_is_view:
+            self._graph = self.compact.to_networkx()
+            self._graph_is_view = True
+        return self._graph
+
+    def from_uml_model(self, classes: Dict, relationships: List):
         """
         Transform UML model into a knowledge graph.
 
+        Any graph built by a previous call is replaced.
+
         Args:
             classes: Dictionary of UML classes
             relationships: List of UML relationships
 
         Returns:
-            NetworkX directed graph representing the knowledge graph
+            NetworkX directed graph representing the knowledge graph, or the
+            CompactGraph when the compact backend is used
         """
-        # Add class nodes
+        self._graph = nx.DiGraph()
+        self._graph_is_view = False
+        self._node_counter = 0
+        self._adjacency = {"out": {}, "in": {}}
+        self._relationship_counts = Counter()
+
+        if self.backend == "compact":
+            self.compact = CompactGraph(self.symbols).from_uml_model(
+                classes, relationships
+            )
+            return self.compact
+
         for class_name, uml_class in classes.items():
+            self._add_class(class_name, uml_class)
+        for rel in relationships:
+            self._add_relationship(rel)
+
+        return self.graph
+
+    def _add_class(self, class_name: str, uml_class):
+        """Add (or refresh) a class node and its member nodes."""
+        intern = self.symbols.intern
+
+        # Class names are interned so node keys, node attributes and the
+        # parsed model all reference the same string objects
+        class_name = intern(class_name)
+        self.graph.add_node(
+            class_name,
+            type="class",
+            attributes=uml_class.attributes,
+            methods=uml_class.methods,
+            stereotypes=uml_class.stereotypes,
+        )
+
+        if self.shared_features:
+            # One node per distinct feature, linked from every class
+            # declaring it: the class x feature incidence is the graph
+            for kind, members in (
+                ("attribute", uml_class.attributes),
+                ("method", uml_class.methods),
+            ):
+                for key in members:
+                    node_id = feature_node_id(kind, key)
+                    if node_id not in self.graph:
+                        self.graph.add_node(node_id, type=kind, value=intern(key))
+                    self.graph.add_edge(
+                        class_name, node_id, relation=MEMBER_RELATIONS[kind]
+                    )
+            return
+
+        # Add attribute nodes
+        for attr in uml_class.attributes:
+            attr = intern(attr)
+            attr_id = f"{class_name}_{attr}_{self._get_next_id()}"
             self.graph.add_node(
-                class_name,
-                type="class",
-                attributes=uml_class.attributes,
-                methods=uml_class.methods,
-                stereotypes=uml_class.stereotypes,
+                attr_id, type="attribute", value=attr, parent_class=class_name
             )
+            self.graph.add_edge(class_name, attr_id, relation="has_attribute")
 
-            # Add attribute nodes
-            for attr in uml_class.attributes:
-                attr_id = f"{class_name}_{attr}_{self._get_next_id()}"
-                self.graph.add_node(
-                    attr_id, type="attribute", value=attr, parent_class=class_name
-                )
-                self.graph.add_edge(class_name, attr_id, relation="has_attribute")
+        # Add method nodes
+        for method in uml_class.methods:
+            method = intern(method)
+            method_id = f"{class_name}_{method}_{self._get_next_id()}"
+            self.graph.add_node(
+                method_id, type="method", value=method, parent_class=class_name
+            )
+            self.graph.add_edge(class_name, method_id, relation="has_method")
 
-            # Add method nodes
-            for method in uml_class.methods:
-                method_id = f"{class_name}_{method}_{self._get_next_id()}"
-                self.graph.add_node(
-                    method_id, type="method", value=method, parent_class=class_name
-                )
-                self.graph.add_edge(class_name, method_id, relation="has_method")
+    def _remove_class_members(self, class_name: str):
+        """Remove the member edges of a class and the nodes left unused."""
+        graph = self.graph
+        for node in list(graph.successors(class_name)):
+            if graph.nodes[node].get("type") not in MEMBER_RELATIONS:
+                continue
+            if self.shared_features:
+                graph.remove_edge(class_name, node)
+                if not graph.in_degree(node):
+                    graph.remove_node(node)
+            else:
+                graph.remove_node(node)
 
-        # Add relationship edges
-        for rel in relationships:
-            self.graph.add_edge(
-                rel.source,
-                rel.target,
-                relation=rel.relationship_type,
-                cardinality_source=rel.cardinality_source,
-                cardinality_target=rel.cardinality_target,
-                label=rel.label,
+    def _add_relationship(self, rel):
+        """Add a relationship edge and index it in both directions."""
+        intern = self.symbols.intern
+        source, target = intern(rel.source), intern(rel.target)
+        data = {
+            "relation": rel.relationship_type,
+            "cardinality_source": rel.cardinality_source,
+            "cardinality_target": rel.cardinality_target,
+            "label": rel.label,
+        }
+        self.graph.add_edge(source, target, **data)
+        for direction, node, other in (("out", source, target), ("in", target, source)):
+            entry = self._relationship_entry(other, rel)
+            count_key = (direction, node, rel.relationship_type, *entry)
+            self._relationship_counts[count_key] += 1
+            # A repeated relationship is one DiGraph edge: index it once
+            if self._relationship_counts[count_key] == 1:
+                self._adjacency[direction].setdefault(node, {}).setdefault(
+                    rel.relationship_type, {}
+                )[entry] = (other, data)
+
+    @staticmethod
+    def _relationship_entry(other: str, rel) -> Tuple:
+        """Hashable index key of a relationship seen from one of its ends."""
+        return (other, rel.cardinality_source, rel.cardinality_target, rel.label)
+
+    def _remove_relationship(self, rel):
+        """
+        Remove one declaration of a relationship.
+
+        The index entries and the edge are only dropped once every
+        declaration of a repeated relationship has been removed.
+        """
+        # Each direction is cleaned up on its own so that one index missing
+        # the entry does not leave it behind in the other
+        remaining = 0
+        for direction, node, other in (
+            ("out", rel.source, rel.target),
+            ("in", rel.target, rel.source),
+        ):
+            entry = self._relationship_entry(other, rel)
+            count_key = (direction, node, rel.relationship_type, *entry)
+            count = self._relationship_counts.pop(count_key, 0)
+            if count > 1:
+                self._relationship_counts[count_key] = count - 1
+                remaining = max(remaining, count - 1)
+                continue
+            by_relation = self._adjacency[direction].get(node, {})
+            edges = by_relation.get(rel.relationship_type, {})
+            edges.pop(entry, None)
+            if not edges:
+                by_relation.pop(rel.relationship_type, None)
+            if not by_relation:
+                self._adjacency[direction].pop(node, None)
+
+        graph = self.graph
+        if remaining or not graph.has_edge(rel.source, rel.target):
+            return
+
+        # The DiGraph keeps one edge per class pair: fall back to another
+        # relationship between the same classes if there is one
+        remaining = [
+            edge_data
+            for other, edge_data in self.neighbors(rel.source)
+            if other == rel.target
+        ]
+        if remaining:
+            graph.edges[rel.source, rel.target].update(remaining[-1])
+            return
+
+        graph.remove_edge(rel.source, rel.target)
+        for node in (rel.source, rel.target):
+            # Endpoints that were never declared only existed for this edge
+            if node in graph and "type" not in graph.nodes[node]:
+                if not graph.degree(node):
+                    graph.remove_node(node)
+
+    def apply_diff(
+        self,
+        added: Dict,
+        removed: List[str],
+        modified_classes: Dict,
+        relationship_changes: Dict[str, List],
+    ) -> Dict[str, List[str]]:
+        """
+        Update the graph in place from a model diff.
+
+        The arguments match the "changes" reported by
+        PlantUMLParser.reparse, so an edited diagram can be reflected
+        without rebuilding the graph. The networkx backend mutates nodes,
+        edges and the relationship indexes directly; the compact backend
+        rebuilds its arrays from the updated model.
+
+        Args:
+            added: New classes by name
+            removed: Names of the deleted classes
+            modified_classes: Changed classes by name (their new version)
+            relationship_changes: {"added": [...], "removed": [...]} lists of
+                UML relationships
+
+        Returns:
+            {"classes": [...], "features": [...]}: the incidence rows and the
+            feature columns (keys) that changed, for incremental FCA
+        """
+        touched = list(added) + list(removed) + list(modified_classes)
+        before = self._class_feature_sets(touched)
+
+        if self.compact is not None:
+            self._rebuild_compact(
+                added, removed, modified_classes, relationship_changes
             )
+        else:
+            for rel in relationship_changes.get("removed", []):
+                self._remove_relationship(rel)
+            for class_name in removed:
+                if class_name not in self.graph:
+                    continue
+                self._remove_class_members(class_name)
+                if self.graph.degree(class_name):
+                    # Still referenced by relationships: keep a bare endpoint
+                    self.graph.nodes[class_name].clear()
+                else:
+                    self.graph.remove_node(class_name)
+            for class_name, uml_class in modified_classes.items():
+                if class_name in self.graph:
+                    self._remove_class_members(class_name)
+                self._add_class(class_name, uml_class)
+            for class_name, uml_class in added.items():
+                self._add_class(class_name, uml_class)
+            for rel in relationship_changes.get("added", []):
+                self._add_relationship(rel)
 
-        return self.graph
+        after = self._class_feature_sets(touched)
+        features = set()
+        for class_name in touched:
+            features |= before.get(class_name, set()) ^ after.get(class_name, set())
+
+        return {"classes": sorted(set(touched)), "features": sorted(features)}
+
+    def _rebuild_compact(
+        self,
+        added: Dict,
+        removed: List[str],
+        modified_classes: Dict,
+        relationship_changes: Dict[str, List],
+    ):
+        """Apply a model diff to the compact backend by rebuilding it."""
+        classes = {
+            name: UMLClass(
+                name=name,
+                attributes=list(data["attributes"]),
+                methods=list(data["methods"]),
+                stereotypes=list(data["stereotypes"]),
+            )
+            for name, data in self.iter_classes()
+        }
+        for class_name in removed:
+            classes.pop(class_name, None)
+        classes.update(modified_classes)
+        classes.update(added)
+
+        relationships = [
+            UMLRelationship(
+                source,
+                target,
+                data["relation"],
+                data["cardinality_source"],
+                data["cardinality_target"],
+                data["label"],
+            )
+            for source, target, data in self.compact.iter_declarations()
+        ]
+        for rel in relationship_changes.get("removed", []):
+            if rel in relationships:
+                relationships.remove(rel)
+        relationships.extend(relationship_changes.get("added", []))
+
+        self.from_uml_model(classes, relationships)
 
     def _get_next_id(self) -> int:
         """Generate unique node IDs."""
         self._node_counter += 1
         return self._node_counter
 
-    def export_for_fca(self, output_path: str):
+    def iter_classes(self) -> Iterator[Tuple[str, Dict]]:
         """
-        Export knowledge graph in a format suitable for FCA4J analysis.
+        Yield (class_name, data) for every declared class.
+
+        data holds the class "attributes" and "methods" keys and its
+        "stereotypes", whichever backend stores the graph.
+        """
+        if self.compact is not None:
+            compact = self.compact
+            for class_name in compact.declared_classes():
+                yield class_name, {
+                    "attributes": compact.class_members(class_name, "attribute"),
+                    "methods": compact.class_members(class_name, "method"),
+                    "stereotypes": compact.stereotypes.get(
+                        compact.class_index[class_name], []
+                    ),
+                }
+            return
+
+        for node, data in self.graph.nodes(data=True):
+            if data.get("type") == "class":
+                yield node, data
+
+    def iter_relationships(self) -> Iterator[Tuple[str, str, Dict]]:
+        """Yield (source, target, data) for every relationship edge."""
+        if self.compact is not None:
+            yield from self.compact.iter_relationships()
+            return
+
+        member_relations = set(MEMBER_RELATIONS.values())
+        for source, target, data in self.graph.edges(data=True):
+            if data.get("relation") not in member_relations:
+                yield source, target, data
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        Yield one JSON-serializable record per node, then per edge.
+
+        Node records are {"node": id, **attributes} and edge records are
+        {"edge": [source, target], **attributes}. The compact backend is
+        read directly without materializing the NetworkX view.
+        """
+        if self.compact is not None:
+            nodes, edges = self.compact.iter_nodes(), self.compact.iter_edges()
+        else:
+            nodes, edges = self.graph.nodes(data=True), self.graph.edges(data=True)
+
+        for node, data in nodes:
+            yield {"node": node, **data}
+        for source, target, data in edges:
+            yield {"edge": [source, target], **data}
+
+    def export_stream(self, output_path: str, compress: bool = False) -> str:
+        """
+        Stream the graph to newline-delimited JSON, one record per line.
+
+        Records (see iter_records) are serialized with compact separators and
+        written as they are produced, so memory stays flat regardless of the
+        graph size.
 
         Args:
-            output_path: Path to save the exported data
+            output_path: Destination file
+            compress: Write the stream through gzip
+
+        Returns:
+            Path of the written file
         """
-        # Create formal context (objects × attributes matrix)
-        context = []
+        opener = gzip.open if compress else open
+        dumps = json.JSONEncoder(separators=(",", ":")).encode
 
-        # Extract classes as objects
-        classes = [
-            n for n, d in self.graph.nodes(data=True) if d.get("type") == "class"
-        ]
+        with opener(output_path, "wt", encoding="utf-8") as f:
+            for record in self.iter_records():
+                f.write(dumps(record))
+                f.write("\n")
 
-        # Extract all unique attributes AND methods as features
-        # Sanitize feature names to avoid XML parsing issues (< > become &lt; &gt;)
-        features = set()
-        for node, data in self.graph.nodes(data=True):
-            if data.get("type") in ["attribute", "method"]:
-                feature = data.get("value")
-                # Replace < and > to avoid XML parsing errors in FCA4J output
-                feature = feature.replace("<", "&lt;").replace(">", "&gt;")
-                features.add(feature)
+        return output_path
 
-        # Build the formal context
-        for cls in classes:
-            row = {"object": cls}
+    def iter_triples(
+        self, base_uri: str = RDF_BASE_URI
+    ) -> Iterator[Tuple[str, str, str, bool]]:
+        """
+        Yield the RDF view of the graph as (subject, predicate, object, literal).
 
-            # Get attributes and methods of this class
-            cls_features = set()
-            for neighbor in self.graph.neighbors(cls):
-                node_data = self.graph.nodes[neighbor]
-                if node_data.get("type") in ["attribute", "method"]:
-                    feature = node_data.get("value")
-                    # Sanitize feature name (same as above)
-                    feature = feature.replace("<", "&lt;").replace(">", "&gt;")
-                    cls_features.add(feature)
+        Classes are <base>class/<name>, features <base>attribute/<key> or
+        <base>method/<key> (one resource per distinct feature), and the
+        vocabulary lives under <base>vocab#. Each relationship is both a
+        direct class-to-class triple and a <base>relationship/<n> resource
+        carrying its type, cardinalities and label. literal is True when the
+        object is a plain string rather than an IRI.
+
+        Args:
+            base_uri: Namespace prefix of every generated IRI
+
+        Yields:
+            Triples, one at a time, read from either backend
+        """
+        vocab = f"{base_uri}vocab#"
+        class_type, relationship_type = f"{vocab}Class", f"{vocab}Relationship"
+        feature_types = {kind: f"{vocab}{kind.title()}" for kind in MEMBER_RELATIONS}
+        relations = {
+            kind: f"{vocab}{relation.title().replace('_', '')}"
+            for kind, relation in MEMBER_RELATIONS.items()
+        }
+
+        def class_iri(name):
+            return f"{base_uri}class/{quote(name, safe='')}"
+
+        seen = set()
+        for name, data in self.iter_classes():
+            subject = class_iri(name)
+            yield subject, RDF_TYPE, class_type, False
+            yield subject, RDFS_LABEL, name, True
+            for stereotype in data.get("stereotypes") or []:
+                yield subject, f"{vocab}stereotype", stereotype, True
+
+            for kind, relation in relations.items():
+                for key in data.get(f"{kind}s") or []:
+                    feature = f"{base_uri}{kind}/{quote(key, safe='')}"
+                    yield subject, relation, feature, False
+                    if feature in seen:
+                        continue
+                    seen.add(feature)
+                    yield feature, RDF_TYPE, feature_types[kind], False
+                    yield feature, RDFS_LABEL, key, True
+                    yield feature, f"{vocab}name", parse_member(key).name, True
+
+        for index, (source, target, data) in enumerate(self.iter_relationships()):
+            kind = data.get("relation") or "association"
+            source, target = class_iri(source), class_iri(target)
+            yield source, f"{vocab}{kind}", target, False
+
+            node = f"{base_uri}relationship/{index}"
+            yield node, RDF_TYPE, relationship_type, False
+            yield node, f"{vocab}source", source, False
+            yield node, f"{vocab}target", target, False
+            yield node, f"{vocab}relationType", kind, True
+            for field, predicate in (
+                ("cardinality_source", "cardinalitySource"),
+                ("cardinality_target", "cardinalityTarget"),
+                ("label", "label"),
+            ):
+                if data.get(field):
+                    yield node, f"{vocab}{predicate}", data[field], True
+
+    def to_rdf(self, base_uri: str = RDF_BASE_URI):
+        """
+        Build an in-memory rdflib Graph of the RDF view (see iter_triples).
+
+        Convenient for SPARQL queries on small models; use export_rdf to
+        stream large ones.
+
+        Returns:
+            rdflib.Graph
+        """
+        try:
+            from rdflib import Graph, Literal, URIRef
+        except ImportError:
+            raise ImportError("rdflib package not installed. Run: pip install rdflib")
+
+        graph = Graph()
+        for subject, predicate, obj, literal in self.iter_triples(base_uri):
+            graph.add(
+                (
+                    URIRef(subject),
+                    URIRef(predicate),
+                    Literal(obj) if literal else URIRef(obj),
+                )
+            )
+        return graph
+
+    def export_rdf(
+        self,
+        output_path: str,
+        base_uri: str = RDF_BASE_URI,
+        build_graph: bool = False,
+    ) -> str:
+        """
+        Write the RDF view of the graph as N-Triples.
+
+        By default triples are formatted and written one by one as
+        iter_triples produces them, so the export never holds the model in
+        memory. With build_graph=True the rdflib Graph is built first and
+        serialized by rdflib.
+
+        Args:
+            output_path: Destination .nt file
+            base_uri: Namespace prefix of every generated IRI
+            build_graph: Serialize through an in-memory rdflib Graph
+
+        Returns:
+            Path of the written file
+        """
+        if build_graph:
+            self.to_rdf(base_uri).serialize(
+                destination=output_path, format="nt", encoding="utf-8"
+            )
+            return output_path
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            for subject, predicate, obj, literal in self.iter_triples(base_uri):
+                obj = f'"{_escape_literal(obj)}"' if literal else f"<{obj}>"
+                f.write(f"<{subject}> <{predicate}> {obj} .\n")
+
+        return output_path
+
+    def export_for_fca(self, output_path: str, classes: Optional[List[str]] = None):
+        """
+        Export knowledge graph in a format suitable for FCA4J analysis.
 
-            # Mark presence/absence of each feature
-            for feature in features:
-                row[feature] = feature in cls_features
+        Args:
+            output_path: Path to save the exported data
+            classes: Restrict the context to these classes (e.g. one
+                partition of the model); all classes when omitted
+        """
+        # Extract classes as objects, with their attributes AND methods as
+        # features. Feature values are normalized keys, so sharing is found
+        # by hash lookup.
+        incidence = self._class_feature_sets(classes)
+        classes = list(incidence)
+
+        # Sanitize feature names to avoid XML parsing issues in FCA4J output
+        # (< > become &lt; &gt;); each distinct key is sanitized once
+        sanitized = {}
+        class_features = {}
+        for cls, values in incidence.items():
+            cls_features = set()
+            for value in values:
+                feature = sanitized.get(value)
+                if feature is None:
+                    feature = value.replace("<", "&lt;").replace(">", "&gt;")
+                    sanitized[value] = feature
+                cls_features.add(feature)
+            class_features[cls] = cls_features
 
-            context.append(row)
+        features = set(sanitized.values())
 
         # Save to file (CSV format for FCA4J)
         # FCA4J CSV format: rows = objects, columns = attributes
@@ -127,63 +908,425 @@ class KnowledgeGraph:
         import csv
 
         with open(output_path, "w", newline="") as f:
-            if context and features:
-                sorted_features = sorted(list(features))
-                sorted_classes = sorted(classes)
+            if classes and features:
+                sorted_features = sorted(features)
 
                 # Write header: empty first cell, then attribute names as columns
-                fieldnames = [""] + sorted_features
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
+                writer = csv.writer(f)
+                writer.writerow([""] + sorted_features)
 
                 # Write each class as a row
-                for cls in sorted_classes:
-                    # Find which attributes this class has
-                    cls_attrs = set()
-                    for row in context:
-                        if row["object"] == cls:
-                            for feature in features:
-                                if row.get(feature, False):
-                                    cls_attrs.add(feature)
-                            break
-
-                    # Build the row
-                    fca_row = {"": cls}
-                    for feature in sorted_features:
-                        fca_row[feature] = "X" if feature in cls_attrs else ""
-                    writer.writerow(fca_row)
+                for cls in sorted(classes):
+                    cls_attrs = class_features[cls]
+                    writer.writerow(
+                        [cls]
+                        + [
+                            "X" if feature in cls_attrs else ""
+                            for feature in sorted_features
+                        ]
+                    )
 
         return output_path
 
-    def get_class_features(self, class_name: str) -> Dict:
+    def _class_feature_sets(
+        self, classes: Optional[List[str]] = None
+    ) -> Dict[str, Set[str]]:
         """
-        Get all features (attributes, methods, relationships) of a class.
+        Map each class to the set of its feature keys.
 
         Args:
-            class_name: Name of the class
+            classes: Restrict to these classes; all declared classes if omitted
 
         Returns:
-            Dictionary containing class features
+            Dictionary of class name to attribute and method keys
         """
-        if class_name not in self.graph:
-            return {}
+        if self.compact is not None:
+            compact = self.compact
+            if classes is None:
+                classes = compact.declared_classes()
+            return {
+                cls: set(compact.class_members(cls, "attribute"))
+                | set(compact.class_members(cls, "method"))
+                for cls in classes
+                if cls in compact.class_index
+                and compact.declared[compact.class_index[cls]]
+            }
 
-        node_data = self.graph.nodes[class_name]
+        if classes is None:
+            classes = [
+                n for n, d in self.graph.nodes(data=True) if d.get("type") == "class"
+            ]
 
-        # Get relationships
-        relationships = []
-        for source, target, data in self.graph.edges(class_name, data=True):
-            if data.get("relation") not in ["has_attribute", "has_method"]:
-                relationships.append(
-                    {
-                        "target": target,
-                        "type": data.get("relation"),
-                        "cardinality": data.get("cardinality_target"),
-                    }
+        incidence = {}
+        for cls in classes:
+            if self.graph.nodes.get(cls, {}).get("type") != "class":
+                continue
+            incidence[cls] = {
+                self.graph.nodes[neighbor]["value"]
+                for neighbor in self.graph.neighbors(cls)
+                if self.graph.nodes[neighbor].get("type") in MEMBER_RELATIONS
+            }
+        return incidence
+
+    def incidence_matrix(
+        self, layout: str = "csr", classes: Optional[List[str]] = None
+    ) -> Tuple:
+        """
+        Export the class x feature incidence as a matrix.
+
+        Rows are sorted by class name and columns by raw feature key (unlike
+        export_for_fca, keys are not escaped), so FCA preprocessing,
+        similarity computations and evaluation metrics can run as vectorized
+        matrix operations instead of graph walks.
+
+        Args:
+            layout: "csr" for a SciPy CSR sparse matrix of uint8 ones, or
+                "packed" for a NumPy uint8 array of shape
+                (classes, ceil(features / 8)) with bits packed big-endian
+                along each row (as numpy.packbits does)
+            classes: Restrict the rows to these classes
+
+        Returns:
+            Tuple of (matrix, class labels, feature labels)
+        """
+        if layout not in ("csr", "packed"):
+            raise ValueError(
+                f"Unknown incidence matrix layout '{layout}'. Expected csr or packed"
+            )
+
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("NumPy package not installed. Run: pip install numpy")
+
+        incidence = self._class_feature_sets(classes)
+        class_labels = sorted(incidence)
+        feature_labels = sorted(set().union(*incidence.values()))
+        column = {feature: j for j, feature in enumerate(feature_labels)}
+
+        indptr = np.zeros(len(class_labels) + 1, dtype=np.int64)
+        cols = []
+        for i, cls in enumerate(class_labels):
+            cols.extend(sorted(column[feature] for feature in incidence[cls]))
+            indptr[i + 1] = len(cols)
+        cols = np.asarray(cols, dtype=np.int64)
+
+        if layout == "packed":
+            rows = np.repeat(np.arange(len(class_labels)), np.diff(indptr))
+            matrix = np.zeros(
+                (len(class_labels), (len(feature_labels) + 7) // 8), dtype=np.uint8
+            )
+            bits = np.left_shift(1, 7 - (cols & 7)).astype(np.uint8)
+            np.bitwise_or.at(matrix, (rows, cols >> 3), bits)
+            return matrix, class_labels, feature_labels
+
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise ImportError("SciPy package not installed. Run: pip install scipy")
+
+        matrix = csr_matrix(
+            (np.ones(len(cols), dtype=np.uint8), cols, indptr),
+            shape=(len(class_labels), len(feature_labels)),
+        )
+        return matrix, class_labels, feature_labels
+
+    def _partition_edges(
+        self, feature_sharing: bool, max_feature_degree: Optional[int]
+    ) -> Tuple[List[str], Dict[str, Set[str]], Dict[str, List[str]]]:
+        """
+        Inputs of the partitioning algorithms.
+
+        Returns:
+            Declared class names, the undirected relationship neighbours of
+            each class, and the classes of every shared feature kept for
+            feature-sharing edges (empty unless feature_sharing)
+        """
+        incidence = self._class_feature_sets()
+        classes = list(incidence)
+
+        related: Dict[str, Set[str]] = {class_name: set() for class_name in classes}
+        for source, target, _ in self.iter_relationships():
+            if source in related and target in related and source != target:
+                related[source].add(target)
+                related[target].add(source)
+
+        sharing: Dict[str, List[str]] = {}
+        if feature_sharing:
+            for class_name, features in incidence.items():
+                for feature in features:
+                    sharing.setdefault(feature, []).append(class_name)
+            sharing = {
+                feature: members
+                for feature, members in sharing.items()
+                if len(members) > 1
+                and (max_feature_degree is None or len(members) <= max_feature_degree)
+            }
+
+        return classes, related, sharing
+
+    def connected_components(
+        self,
+        feature_sharing: bool = False,
+        max_feature_degree: Optional[int] = MAX_FEATURE_DEGREE,
+    ) -> List[List[str]]:
+        """
+        Split the declared classes into connected components.
+
+        Args:
+            feature_sharing: Also connect classes declaring a common feature
+            max_feature_degree: Ignore features declared by more classes than
+                this when feature_sharing (None keeps them all)
+
+        Returns:
+            Components as lists of class names, largest first
+        """
+        classes, related, sharing = self._partition_edges(
+            feature_sharing, max_feature_degree
+        )
+        parent = {class_name: class_name for class_name in classes}
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for class_name, others in related.items():
+            for other in others:
+                parent[find(class_name)] = find(other)
+        for members in sharing.values():
+            root = find(members[0])
+            for member in members[1:]:
+                parent[find(member)] = root
+
+        components: Dict[str, List[str]] = {}
+        for class_name in classes:
+            components.setdefault(find(class_name), []).append(class_name)
+        return sorted(components.values(), key=len, reverse=True)
+
+    def communities(
+        self,
+        feature_sharing: bool = True,
+        max_feature_degree: Optional[int] = MAX_FEATURE_DEGREE,
+        max_iterations: int = 20,
+        seed: int = 0,
+    ) -> List[List[str]]:
+        """
+        Detect communities of classes by label propagation.
+
+        Every class starts in its own community and repeatedly adopts the
+        label most common among its neighbours: each relationship counts
+        once, and classes sharing a feature declared by d classes count
+        1 / (d - 1) each, so large features weigh as much as one edge.
+        Runs in linear time per iteration.
+
+        Args:
+            feature_sharing: Also link classes declaring a common feature
+            max_feature_degree: Ignore features declared by more classes than
+                this (None keeps them all)
+            max_iterations: Stop after this many passes if labels still change
+            seed: Seed of the visiting order, for reproducible communities
+
+        Returns:
+            Communities as lists of class names, largest first
+        """
+        classes, related, sharing = self._partition_edges(
+            feature_sharing, max_feature_degree
+        )
+        labels = {class_name: index for index, class_name in enumerate(classes)}
+
+        # Label counts per shared feature, updated as classes change label,
+        # with the vote weight of the feature
+        features_of: Dict[str, List[Tuple[Counter, float]]] = {}
+        for members in sharing.values():
+            counts = Counter(labels[m] for m in members)
+            weight = 1 / (len(members) - 1)
+            for member in members:
+                features_of.setdefault(member, []).append((counts, weight))
+
+        order = list(classes)
+        rng = random.Random(seed)
+        for _ in range(max_iterations):
+            rng.shuffle(order)
+            changed = False
+            for class_name in order:
+                current = labels[class_name]
+                votes: Dict[int, float] = {}
+                for other in related[class_name]:
+                    label = labels[other]
+                    votes[label] = votes.get(label, 0) + 1
+                shared = features_of.get(class_name, ())
+                own = 0.0
+                for counts, weight in shared:
+                    own += weight
+                    for label, count in counts.items():
+                        votes[label] = votes.get(label, 0) + weight * count
+                if own:
+                    # A class does not vote for itself
+                    votes[current] -= own
+                if not votes:
+                    continue
+
+                best = max(votes.values()) - 1e-9
+                if best <= 0 or votes.get(current, 0) >= best:
+                    continue
+                label = min(label for label, vote in votes.items() if vote >= best)
+
+                labels[class_name] = label
+                for counts, _ in shared:
+                    counts[current] -= 1
+                    if not counts[current]:
+                        del counts[current]
+                    counts[label] += 1
+                changed = True
+            if not changed:
+                break
+
+        communities: Dict[int, List[str]] = {}
+        for class_name in classes:
+            communities.setdefault(labels[class_name], []).append(class_name)
+        return sorted(communities.values(), key=len, reverse=True)
+
+    def boundary_classes(
+        self,
+        partitions: List[List[str]],
+        feature_sharing: bool = True,
+        max_feature_degree: Optional[int] = MAX_FEATURE_DEGREE,
+    ) -> List[str]:
+        """
+        Classes linked to a class of another partition.
+
+        These hubs are where abstractions spanning partitions can be missed
+        when each partition is analysed alone.
+
+        Args:
+            partitions: Lists of class names
+            feature_sharing: Also count features shared across partitions
+            max_feature_degree: Ignore features declared by more classes than
+                this (None keeps them all)
+
+        Returns:
+            Hub class names, in class order
+        """
+        classes, related, sharing = self._partition_edges(
+            feature_sharing, max_feature_degree
+        )
+        partition_of = {
+            class_name: index
+            for index, members in enumerate(partitions)
+            for class_name in members
+        }
+
+        hubs = set()
+        for class_name, others in related.items():
+            if class_name in partition_of and any(
+                partition_of.get(other, partition_of[class_name])
+                != partition_of[class_name]
+                for other in others
+            ):
+                hubs.add(class_name)
+        for members in sharing.values():
+            members = [m for m in members if m in partition_of]
+            if len({partition_of[m] for m in members}) > 1:
+                hubs.update(members)
+
+        return [class_name for class_name in classes if class_name in hubs]
+
+    def neighbors(
+        self,
+        class_name: str,
+        relation: Optional[str] = None,
+        direction: str = "out",
+    ) -> List[Tuple[str, Dict]]:
+        """
+        Classes related to a class, looked up in the relationship indexes.
+
+        Args:
+            class_name: Name of the class
+            relation: Only follow this relationship kind (e.g. "inheritance")
+            direction: "out" for relationships leaving the class, "in" for
+                relationships pointing at it
+
+        Returns:
+            List of (other class, edge data) tuples
+        """
+        if direction not in ("out", "in"):
+            raise ValueError(f"Unknown direction '{direction}'. Expected 'out' or 'in'")
+
+        if self.compact is not None:
+            incoming = direction == "in"
+            return [
+                (source if incoming else target, data)
+                for source, target, data in self.compact.iter_relationships(
+                    class_name, incoming=incoming, relation=relation
                 )
+            ]
+
+        by_relation = self._adjacency[direction].get(class_name, {})
+        if relation is not None:
+            return list(by_relation.get(relation, {}).values())
+        return [edge for edges in by_relation.values() for edge in edges.values()]
+
+    def get_class_features(self, class_name: str) -> Dict:
+        """
+        Get all features (attributes, methods, relationships) of a class.
+
+        Args:
+            class_name: Name of the class
+
+        Returns:
+            Dictionary containing class features, with outgoing
+            "relationships" and "incoming_relationships"
+        """
+        if self.compact is not None:
+            cid = self.compact.class_index.get(class_name)
+            if cid is None or not self.compact.declared[cid]:
+                return {}
+            attributes = self.compact.class_members(class_name, "attribute")
+            methods = self.compact.class_members(class_name, "method")
+        else:
+            node_data = self.graph.nodes.get(class_name)
+            if node_data is None:
+                return {}
+            attributes = node_data.get("attributes", [])
+            methods = node_data.get("methods", [])
 
         return {
-            "attributes": node_data.get("attributes", []),
-            "methods": node_data.get("methods", []),
-            "relationships": relationships,
+            "attributes": attributes,
+            "methods": methods,
+            "relationships": [
+                {
+                    "target": target,
+                    "type": data["relation"],
+                    "cardinality": data["cardinality_target"],
+                }
+                for target, data in self.neighbors(class_name)
+            ],
+            "incoming_relationships": [
+                {
+                    "source": source,
+                    "type": data["relation"],
+                    "cardinality": data["cardinality_source"],
+                }
+                for source, data in self.neighbors(class_name, direction="in")
+            ],
         }
+
+    def get_features_for(self, classes: List[str]) -> Dict[str, Dict]:
+        """
+        Batch version of get_class_features.
+
+        Args:
+            classes: Class names
+
+        Returns:
+            Dictionary of class name to its features; unknown classes are
+            omitted
+        """
+        features = {}
+        for class_name in classes:
+            class_features = self.get_class_features(class_name)
+            if class_features:
+                features[class_name] = class_features
+        return features
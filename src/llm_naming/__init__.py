@@ -1,10 +1,48 @@
 """LLM naming module for generating meaningful names for abstract classes."""
 
+import functools
+import hashlib
 import os
-from typing import List, Dict, Optional
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import json
 
+from ..parser import parse_member
+
+# Model queried for each provider
+DEFAULT_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-sonnet-20240229",
+    "local": "mock",
+}
+
+# Providers with an LLM client; anything else uses fallback naming
+PROVIDERS = ("openai", "anthropic", "local")
+
+# OpenAI-compatible endpoint of the "local" provider (see src.mock_llm)
+DEFAULT_LOCAL_BASE_URL = "http://127.0.0.1:8000/v1"
+
+# Keyword -> concept name tables of the fallback namer
+DEFAULT_FALLBACK_RULES = os.path.join(os.path.dirname(__file__), "fallback_rules.json")
+
+# Bump when the naming prompts change so cached names are not reused
+PROMPT_VERSION = "1"
+
+# Rough characters-per-token ratio used to size batched prompts
+CHARS_PER_TOKEN = 4
+
+# Completion tokens allowed for a single name, and per name in a batch
+NAME_MAX_TOKENS = 50
+TOKENS_PER_NAME = 16
+
 
 @dataclass
 class AbstractClass:
@@ -17,44 +55,856 @@ class AbstractClass:
     relevance_score: float = 0.0  # FCA relevance score for fusion/prioritization
 
 
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Tokens added per minute
+            capacity: Maximum burst (defaults to one minute of tokens)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens, sleeping until enough are available.
+
+        Requests larger than the capacity only wait for a full bucket.
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for LLM calls."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens: int) -> float:
+        """Wait for one request slot and `tokens` tokens; returns seconds waited."""
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None:
+            waited += self.tokens.acquire(tokens)
+        return waited
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing provider for a while.
+
+    After `failure_threshold` consecutive failed requests the circuit opens
+    and requests are refused for `reset_timeout` seconds; then one trial
+    request is let through (half-open) and its outcome closes or reopens
+    the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """ "closed", "open" or "half-open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Whether an LLM call failure is transient.
+
+    Rate limiting (429), timeouts, conflicts and server errors (5xx) are
+    retried; authentication or invalid request errors are not.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    name = type(error).__name__
+    return any(
+        marker in name
+        for marker in ("Timeout", "Connection", "RateLimit", "Overloaded")
+    )
+
+
+class LocalLLMError(RuntimeError):
+    """HTTP error returned by an OpenAI-compatible local endpoint."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LocalChatClient:
+    """Minimal OpenAI-compatible chat-completions client using urllib."""
+
+    def __init__(
+        self, base_url: str, api_key: Optional[str] = None, timeout: float = 30.0
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Endpoint root, e.g. "http://127.0.0.1:8000/v1"
+            api_key: Sent as a bearer token when given
+            timeout: Default request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: int,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Request a chat completion and return the content of the first choice."""
+        response = self.chat(model, messages, max_tokens, temperature, timeout)
+        return response["choices"][0]["message"]["content"]
+
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: int,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        """
+        Request a chat completion.
+
+        Returns:
+            Decoded response body (choices, usage, ...)
+
+        Raises:
+            LocalLLMError: On an HTTP error status (status_code is set)
+            TimeoutError: When the request times out
+            ConnectionError: When the endpoint cannot be reached
+        """
+        body = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            }
+        ).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions", data=body, headers=headers
+        )
+
+        try:
+            with urllib.request.urlopen(
+                request, timeout=timeout or self.timeout
+            ) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise LocalLLMError(
+                f"Local LLM returned HTTP {e.code}", status_code=e.code
+            ) from e
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, TimeoutError):
+                raise TimeoutError(str(e.reason)) from e
+            raise ConnectionError(str(e.reason)) from e
+
+
+class ReplayMissError(LookupError):
+    """A replayed prompt has no recorded response."""
+
+
+class PromptRecording:
+    """
+    LLM prompts and responses stored in a JSON lines file.
+
+    In "record" mode every successful response is appended to the file; in
+    "replay" mode responses are served from it and no provider is called,
+    which makes naming runs reproducible offline.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: str, mode: str = "replay"):
+        """
+        Open a recording.
+
+        Args:
+            path: JSON lines file (created on first record)
+            mode: "record" or "replay"
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self._responses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[entry["key"]] = entry["response"]
+        elif mode == "replay":
+            raise FileNotFoundError(f"Recording not found: {path}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(prompt: str, max_tokens: int) -> str:
+        """Hash of a prompt and its completion budget."""
+        return hashlib.sha256(f"{max_tokens}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def replay(self, prompt: str, max_tokens: int) -> str:
+        """Recorded response of a prompt; ReplayMissError if there is none."""
+        response = self._responses.get(self.make_key(prompt, max_tokens))
+        if response is None:
+            raise ReplayMissError("Prompt not found in recording")
+        return response
+
+    def record(self, prompt: str, max_tokens: int, response: str, **metadata):
+        """Append a response (metadata such as provider/model is kept as-is)."""
+        key = self.make_key(prompt, max_tokens)
+        entry = {"key": key, **metadata, "prompt": prompt, "response": response}
+        with self._lock:
+            self._responses[key] = response
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+class NameCache:
+    """
+    Persistent SQLite cache of LLM-generated names.
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`. The cache is safe to share between the
+    threads of concurrent batch naming.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        ttl: Optional[float] = None,
+        max_entries: int = 100_000,
+    ):
+        """
+        Open (and create if needed) a name cache.
+
+        Args:
+            path: SQLite database file, or ":memory:"
+            ttl: Lifetime of an entry in seconds (None: never expires)
+            max_entries: Number of entries kept before evicting the least
+                recently used ones
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS names (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_names_accessed ON names(accessed_at);
+            """)
+
+    @staticmethod
+    def make_key(
+        provider: str, model: Optional[str], extent: List[str], intent: List[str]
+    ) -> str:
+        """Hash of the provider, model, prompt version and sorted extent/intent."""
+        payload = json.dumps(
+            [provider, model, PROMPT_VERSION, sorted(extent), sorted(intent)],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached name.
+
+        Returns:
+            (name, confidence), or None on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT name, confidence, created_at FROM names WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                self.connection.execute("DELETE FROM names WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute(
+                "UPDATE names SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return row[0], row[1]
+
+    def put(self, key: str, name: str, confidence: float):
+        """Store a name, evicting the least recently used entries if full."""
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO names "
+                "(key, name, confidence, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, name, confidence, now, now),
+            )
+            excess = self._size() - self.max_entries
+            if excess > 0:
+                self.connection.execute(
+                    "DELETE FROM names WHERE key IN (SELECT key FROM names "
+                    "ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+
+    def _size(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters of this session and the number of entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": self._size()}
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+
+class FallbackRuleEngine:
+    """
+    Keyword rules naming a concept from the member names of its intent.
+
+    Rules are tried in order and the first whose matcher fires names the
+    concept. A matcher lists "contains" keywords (substrings of a member
+    name) or "exact" keywords (whole member names), compared in lowercase
+    against the names of all members or only of the attributes ("scope").
+    A rule's "names" are variants tried in order, each optionally guarded
+    by another matcher or by a minimum number of features:
+
+        {"concept": "authentication",
+         "match": {"contains": ["password", "login"], "scope": "members"},
+         "names": [{"min_features": 3, "name": "User"},
+                   {"name": "Authenticatable"}]}
+
+    All "contains" keywords are compiled into one regular expression and
+    all "exact" keywords into one dictionary, and the matchers hit by a
+    feature are kept in a bounded LRU cache, so naming many concepts costs
+    little more than a set union per concept while the engine shared by
+    every service of the process does not grow with each new feature.
+    """
+
+    SCOPES = ("members", "attributes")
+
+    def __init__(self, rules: List[Dict], cache_size: int = 4096):
+        """
+        Compile rule tables.
+
+        Args:
+            rules: Rules as described in the class docstring
+            cache_size: Distinct features whose matcher hits are cached
+
+        Raises:
+            ValueError: If a rule or matcher is malformed
+        """
+        self.rules = rules
+        self._matchers: List[str] = []  # scope of each matcher
+        contains: Dict[str, set] = {}
+        exact: Dict[str, set] = {}
+
+        def compile_matcher(spec: Dict) -> int:
+            scope = spec.get("scope", "members")
+            if scope not in self.SCOPES:
+                raise ValueError(f"Unknown matcher scope '{scope}'")
+            if not spec.get("contains") and not spec.get("exact"):
+                raise ValueError("A matcher needs 'contains' or 'exact' keywords")
+            matcher_id = len(self._matchers)
+            self._matchers.append(scope)
+            for keyword in spec.get("contains", []):
+                contains.setdefault(keyword.lower(), set()).add(matcher_id)
+            for keyword in spec.get("exact", []):
+                exact.setdefault(keyword.lower(), set()).add(matcher_id)
+            return matcher_id
+
+        self._rules = []
+        for rule in rules:
+            if not rule.get("names"):
+                raise ValueError(f"Rule {rule.get('concept', rule)} has no names")
+            variants = [
+                (
+                    compile_matcher(variant["match"]) if "match" in variant else None,
+                    variant.get("min_features", 0),
+                    variant["name"],
+                )
+                for variant in rule["names"]
+            ]
+            self._rules.append((compile_matcher(rule["match"]), variants))
+
+        self._exact = {keyword: frozenset(ids) for keyword, ids in exact.items()}
+        # A match of a keyword implies a match of every keyword it contains;
+        # the regex reports only the longest keyword at each position
+        self._contains = {
+            keyword: frozenset(
+                matcher_id
+                for other, ids in contains.items()
+                if other in keyword
+                for matcher_id in ids
+            )
+            for keyword in contains
+        }
+        keywords = sorted(contains, key=len, reverse=True)
+        self._pattern = (
+            re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+            if keywords
+            else None
+        )
+        self._feature_hits = functools.lru_cache(maxsize=cache_size)(
+            self._match_feature
+        )
+
+    @classmethod
+    def load(
+        cls, *paths: str, include_default: bool = True, cache_size: int = 4096
+    ) -> "FallbackRuleEngine":
+        """
+        Load rule tables from JSON files ({"rules": [...]}).
+
+        Args:
+            *paths: Rule files; earlier files take precedence
+            include_default: Append the shipped DEFAULT_FALLBACK_RULES
+            cache_size: Distinct features whose matcher hits are cached
+
+        Returns:
+            Compiled engine
+        """
+        if include_default:
+            paths = (*paths, DEFAULT_FALLBACK_RULES)
+        rules = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                rules.extend(json.load(f)["rules"])
+        return cls(rules, cache_size=cache_size)
+
+    def _match_feature(self, feature: str) -> Tuple[frozenset, bool]:
+        """Matchers hit by a feature's member name, and whether it is an attribute."""
+        member = parse_member(feature)
+        name = member.name.lower()
+        hits = set(self._exact.get(name, ()))
+        if self._pattern is not None:
+            for match in self._pattern.finditer(name):
+                hits.update(self._contains[match.group(1)])
+        return frozenset(hits), member.kind == "attribute"
+
+    def match(self, intent: List[str]) -> Optional[str]:
+        """
+        Name a concept from its intent.
+
+        Args:
+            intent: Feature keys shared by the concept
+
+        Returns:
+            Concept name without the "Abstract" prefix, or None when no
+            rule applies
+        """
+        member_hits: set = set()
+        attribute_hits: set = set()
+        for feature in intent:
+            hits, is_attribute = self._feature_hits(feature)
+            member_hits |= hits
+            if is_attribute:
+                attribute_hits |= hits
+
+        def fired(matcher_id: Optional[int]) -> bool:
+            if matcher_id is None:
+                return True
+            scope = self._matchers[matcher_id]
+            return matcher_id in (member_hits if scope == "members" else attribute_hits)
+
+        for matcher_id, variants in self._rules:
+            if not fired(matcher_id):
+                continue
+            for guard, min_features, name in variants:
+                if len(intent) >= min_features and fired(guard):
+                    return name
+        return None
+
+
+_DEFAULT_ENGINE: Optional[FallbackRuleEngine] = None
+
+
+def _default_fallback_rules() -> FallbackRuleEngine:
+    """Engine compiled from the shipped rules, shared by all services."""
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        _DEFAULT_ENGINE = FallbackRuleEngine.load()
+    return _DEFAULT_ENGINE
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in [0, 100]) of sorted values."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class NamingMetrics:
+    """
+    Thread-safe record of LLM calls and naming outcomes.
+
+    Every provider call (including its retries) is one entry of `calls`
+    with its latency, rate-limit wait, retries and token usage; token
+    counts are estimated from the text when the provider reports no usage.
+    Counters track cache hits, fallback names (and those taken from the
+    name index), replayed prompts and calls refused by the circuit breaker.
+    """
+
+    COUNTERS = ("cache_hits", "fallbacks", "index_names", "replayed", "circuit_open")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded calls and counters."""
+        with self._lock:
+            self.calls: List[Dict] = []
+            self.counters: Dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+
+    def record_call(self, **call):
+        """Record one provider call (see LLMNamingService._record_call)."""
+        with self._lock:
+            self.calls.append(call)
+
+    def count(self, name: str, amount: int = 1):
+        """Increment one of COUNTERS."""
+        with self._lock:
+            self.counters[name] += amount
+
+    def summary(self, include_calls: bool = False) -> Dict:
+        """
+        Aggregate the recorded calls.
+
+        Args:
+            include_calls: Also return the per-call records under "per_call"
+
+        Returns:
+            Totals of calls, retries and tokens, latency statistics in
+            seconds (mean, p50, p95, max) and the counters
+        """
+        with self._lock:
+            calls = list(self.calls)
+            counters = dict(self.counters)
+
+        latencies = sorted(call["latency"] for call in calls)
+        prompt_tokens = sum(call["prompt_tokens"] for call in calls)
+        completion_tokens = sum(call["completion_tokens"] for call in calls)
+        summary = {
+            "calls": len(calls),
+            "failed_calls": sum(1 for call in calls if not call["ok"]),
+            "retries": sum(call["retries"] for call in calls),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "estimated_usage_calls": sum(1 for call in calls if call["estimated"]),
+            "latency_total": sum(latencies),
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+            "rate_limit_wait": sum(call["rate_limit_wait"] for call in calls),
+            **counters,
+        }
+        if include_calls:
+            summary["per_call"] = calls
+        return summary
+
+
+# Process-wide LLM clients keyed by (provider, api_key, base_url): pipelines
+# of a batch run share SDK clients and their HTTP connection pools
+_CLIENT_POOL: Dict[Tuple[str, Optional[str], Optional[str]], object] = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+
+def _pooled_client(key: Tuple[str, Optional[str], Optional[str]], factory):
+    """Get the pooled client for key, creating it with factory() if needed."""
+    with _CLIENT_POOL_LOCK:
+        client = _CLIENT_POOL.get(key)
+        if client is None:
+            client = _CLIENT_POOL[key] = factory()
+        return client
+
+
+def clear_client_pool():
+    """Forget every pooled LLM client (e.g. after rotating API keys)."""
+    with _CLIENT_POOL_LOCK:
+        _CLIENT_POOL.clear()
+
+
 class LLMNamingService:
     """Service for naming abstract classes using LLM."""
 
-    def __init__(self, provider: str = "openai", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        provider: str = "openai",
+        api_key: Optional[str] = None,
+        concurrency: int = 4,
+        batch_size: int = 1,
+        max_prompt_tokens: int = 3000,
+        model: Optional[str] = None,
+        cache: Optional[NameCache] = None,
+        dedupe: bool = True,
+        dedupe_threshold: Optional[float] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 20.0,
+        request_timeout: Optional[float] = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        base_url: Optional[str] = None,
+        recording: Optional[PromptRecording] = None,
+        fallback_rules: Optional[FallbackRuleEngine] = None,
+        name_index=None,
+        name_index_min_score: float = 0.5,
+    ):
         """
         Initialize LLM naming service.
 
         Args:
-            provider: LLM provider ('openai' or 'anthropic')
+            provider: LLM provider ('openai', 'anthropic' or 'local', an
+                OpenAI-compatible endpoint such as src.mock_llm)
             api_key: API key for the LLM service
+            concurrency: Maximum number of naming requests in flight during
+                batch naming (1 names the classes one after the other)
+            batch_size: Maximum number of concepts named by one request in
+                batch naming (1 sends one prompt per concept)
+            max_prompt_tokens: Estimated prompt size at which a batch is split
+            model: Model to query (defaults to DEFAULT_MODELS[provider])
+            cache: Persistent name cache consulted before any LLM request
+            dedupe: In batch naming, name candidates sharing an intent once
+            dedupe_threshold: Also share one name between candidates whose
+                intents have at least this Jaccard similarity (None: exact
+                intent matches only)
+            requests_per_minute: Request rate limit (None: unlimited)
+            tokens_per_minute: Estimated prompt + completion token rate
+                limit (None: unlimited)
+            max_retries: Retries of a transient failure (429, timeout, 5xx)
+            retry_base_delay: Base of the jittered exponential backoff, in
+                seconds
+            retry_max_delay: Upper bound of a single backoff delay
+            request_timeout: Per-request timeout in seconds
+            failure_threshold: Consecutive failed requests that open the
+                circuit breaker, sending every concept to fallback naming
+            reset_timeout: Seconds before an open circuit lets a trial
+                request through
+            base_url: Endpoint of the 'local' provider (default:
+                $LOCAL_LLM_BASE_URL or DEFAULT_LOCAL_BASE_URL); also passed
+                to the OpenAI client when set
+            recording: Record responses to, or replay them from, a file
+            fallback_rules: Rule tables of fallback naming (default:
+                DEFAULT_FALLBACK_RULES)
+            name_index: src.name_index.ClassNameIndex of previously seen
+                classes; fallback naming uses the nearest class name when
+                no rule applies
+            name_index_min_score: Minimum cosine similarity of a name
+                index suggestion
         """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
         self.provider = provider
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_prompt_tokens = max_prompt_tokens
+        self.model = model or DEFAULT_MODELS.get(provider)
+        self.cache = cache
+        self.dedupe = dedupe
+        self.dedupe_threshold = dedupe_threshold
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.request_timeout = request_timeout
+        self.circuit_breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.base_url = base_url
+        self.recording = recording
+        self.fallback_rules = fallback_rules or _default_fallback_rules()
+        self.name_index = name_index
+        self.name_index_min_score = name_index_min_score
         self.api_key = api_key or os.getenv(f"{provider.upper()}_API_KEY")
-        self.client = None
+        self.metrics = NamingMetrics()
+        # Token usage reported by the provider for the current thread's call
+        self._usage = threading.local()
 
-        if self.api_key:
-            self._initialize_client()
+        # The SDK import and client creation wait for the first query
+        self._client = None
+        self._client_resolved = False
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        LLM client, created on first access.
+
+        None when the provider needs an API key and none is configured.
+        """
+        if not self._client_resolved:
+            with self._client_lock:
+                if not self._client_resolved:
+                    if self.api_key or self.provider == "local":
+                        self._initialize_client()
+                    self._client_resolved = True
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+        self._client_resolved = True
 
     def _initialize_client(self):
-        """Initialize the LLM client."""
+        """Initialize the LLM client, reusing a pooled one when possible."""
         if self.provider == "openai":
             try:
                 import openai
-
-                self.client = openai.OpenAI(api_key=self.api_key)
             except ImportError:
                 raise ImportError(
                     "OpenAI package not installed. Run: pip install openai"
                 )
+            options = {"base_url": self.base_url} if self.base_url else {}
+            # Retries are done by _query_llm (max_retries, backoff, metrics):
+            # SDK retries would multiply the attempts behind its back
+            self._client = _pooled_client(
+                ("openai", self.api_key, self.base_url),
+                lambda: openai.OpenAI(api_key=self.api_key, max_retries=0, **options),
+            )
         elif self.provider == "anthropic":
             try:
                 import anthropic
-
-                self.client = anthropic.Anthropic(api_key=self.api_key)
             except ImportError:
                 raise ImportError(
                     "Anthropic package not installed. Run: pip install anthropic"
                 )
+            self._client = _pooled_client(
+                ("anthropic", self.api_key, None),
+                lambda: anthropic.Anthropic(api_key=self.api_key, max_retries=0),
+            )
+        elif self.provider == "local":
+            base_url = self.base_url or os.getenv(
+                "LOCAL_LLM_BASE_URL", DEFAULT_LOCAL_BASE_URL
+            )
+            self._client = _pooled_client(
+                ("local", self.api_key, base_url),
+                lambda: LocalChatClient(base_url, api_key=self.api_key),
+            )
+
+    def _can_query(self) -> bool:
+        """
+        Whether names can come from the LLM (or a replayed recording).
+
+        Decided from the configuration alone: the client is only created by
+        the first provider call (see _query).
+        """
+        if self.provider not in PROVIDERS:
+            return False
+        if self.recording is not None and self.recording.replaying:
+            return True
+        if self._client_resolved:
+            return self._client is not None
+        return bool(self.api_key) or self.provider == "local"
 
     def name_abstract_class(self, abstract_class: AbstractClass) -> AbstractClass:
         """
@@ -66,30 +916,60 @@ class LLMNamingService:
         Returns:
             AbstractClass with suggested_name filled in
         """
-        if not self.client:
+        if self._from_cache(abstract_class):
+            return abstract_class
+        return self._name_with_llm(abstract_class)
+
+    def _name_with_llm(self, abstract_class: AbstractClass) -> AbstractClass:
+        """Name one abstract class without consulting the cache."""
+        if not self._can_query():
             # Fallback to simple naming strategy
             return self._fallback_naming(abstract_class)
 
         prompt = self._create_naming_prompt(abstract_class)
 
         try:
-            if self.provider == "openai":
-                response = self._query_openai(prompt)
-            elif self.provider == "anthropic":
-                response = self._query_anthropic(prompt)
-            else:
-                return self._fallback_naming(abstract_class)
+            response = self._query(prompt)
 
             # Parse response
             abstract_class.suggested_name = self._parse_llm_response(response)
             abstract_class.confidence = 0.9  # High confidence for LLM-generated names
 
+        except ImportError:
+            # A missing SDK is a setup error, not a failed call
+            raise
         except Exception as e:
             print(f"LLM naming failed: {e}. Using fallback naming.")
             return self._fallback_naming(abstract_class)
 
+        self._to_cache(abstract_class)
         return abstract_class
 
+    def _cache_key(self, abstract_class: AbstractClass) -> str:
+        return NameCache.make_key(
+            self.provider, self.model, abstract_class.extent, abstract_class.intent
+        )
+
+    def _from_cache(self, abstract_class: AbstractClass) -> bool:
+        """Fill in a cached name; returns whether the cache had one."""
+        if self.cache is None:
+            return False
+        cached = self.cache.get(self._cache_key(abstract_class))
+        if cached is None:
+            return False
+        abstract_class.suggested_name, abstract_class.confidence = cached
+        self.metrics.count("cache_hits")
+        return True
+
+    def _to_cache(self, abstract_class: AbstractClass):
+        """Remember an LLM-generated name (fallback names are not cached)."""
+        if self.cache is not None and abstract_class.suggested_name:
+            self.cache.put(
+                self._cache_key(abstract_class),
+                abstract_class.suggested_name,
+                abstract_class.confidence,
+            )
+
     def _create_naming_prompt(self, abstract_class: AbstractClass) -> str:
         """Create a prompt for the LLM to name the abstract class."""
         prompt = f"""You are a software architecture expert specializing in object-oriented design and domain modeling. 
@@ -120,10 +1000,245 @@ Name:"""
 
         return prompt
 
-    def _query_openai(self, prompt: str) -> str:
+    def _create_batch_prompt(self, abstract_classes: List[AbstractClass]) -> str:
+        """Create one prompt naming several abstract classes (IDs C1..Cn)."""
+        concepts = "\n\n".join(
+            self._describe_concept(f"C{i}", ac)
+            for i, ac in enumerate(abstract_classes, start=1)
+        )
+        ids = ", ".join(f'"C{i}"' for i in range(1, len(abstract_classes) + 1))
+
+        return f"""You are a software architecture expert specializing in object-oriented design and domain modeling.
+
+Each concept below is a group of classes sharing common features. For each concept, suggest a meaningful abstract class name that captures the SEMANTIC CONCEPT the classes represent together (e.g. shared email/password/login -> "User", shared id/name -> "Entity").
+
+Each name should:
+- Be PascalCase, a noun or adjective describing the abstraction
+- Be concise (1-2 words preferred)
+- NOT include "Abstract" prefix (it will be added automatically)
+
+{concepts}
+
+Respond with ONLY a JSON object mapping every concept ID ({ids}) to its name, for example {{"C1": "User"}}.
+
+JSON:"""
+
+    @staticmethod
+    def _describe_concept(concept_id: str, abstract_class: AbstractClass) -> str:
+        """Describe one concept of a batched prompt."""
+        return (
+            f"{concept_id}:\n"
+            f"  Classes: {', '.join(abstract_class.extent)}\n"
+            f"  Shared features: {'; '.join(abstract_class.intent)}"
+        )
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Cheap token estimate used to size batches."""
+        return len(text) // CHARS_PER_TOKEN + 1
+
+    def _split_batches(
+        self, abstract_classes: List[AbstractClass]
+    ) -> List[List[AbstractClass]]:
+        """
+        Group abstract classes into batches for multi-concept prompts.
+
+        A batch is closed when it reaches batch_size concepts or when adding
+        the next concept would push the estimated prompt over
+        max_prompt_tokens.
+        """
+        overhead = self._estimate_tokens(self._create_batch_prompt([]))
+        batches: List[List[AbstractClass]] = []
+        batch: List[AbstractClass] = []
+        tokens = overhead
+
+        for ac in abstract_classes:
+            cost = self._estimate_tokens(self._describe_concept("C00", ac))
+            if batch and (
+                len(batch) >= self.batch_size or tokens + cost > self.max_prompt_tokens
+            ):
+                batches.append(batch)
+                batch, tokens = [], overhead
+            batch.append(ac)
+            tokens += cost
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _parse_batch_response(self, response: str) -> Dict[str, str]:
+        """Extract the ID -> name mapping from a batched response."""
+        # Tolerate code fences or text around the JSON object
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            str(key): value
+            for key, value in data.items()
+            if isinstance(value, str) and value.strip()
+        }
+
+    def name_abstract_classes_batched(
+        self, abstract_classes: List[AbstractClass]
+    ) -> List[AbstractClass]:
+        """
+        Name several abstract classes with a single LLM request.
+
+        Concepts whose name is missing or invalid in the response are named
+        individually; if the request itself fails, every concept of the
+        batch gets the fallback name.
+
+        Args:
+            abstract_classes: Concepts of one batch (see _split_batches)
+
+        Returns:
+            The same abstract classes with suggested names
+        """
+        pending = [ac for ac in abstract_classes if not self._from_cache(ac)]
+
+        if not self._can_query():
+            for ac in pending:
+                self._fallback_naming(ac)
+        else:
+            self._name_batch_with_llm(pending)
+        return abstract_classes
+
+    def _name_batch_with_llm(self, pending: List[AbstractClass]) -> List[AbstractClass]:
+        """Name concepts that missed the cache with one batched request."""
+        if len(pending) <= 1:
+            for ac in pending:
+                self._name_with_llm(ac)
+            return pending
+
+        prompt = self._create_batch_prompt(pending)
+        try:
+            response = self._query(
+                prompt, max_tokens=TOKENS_PER_NAME * len(pending) + 20
+            )
+        except ImportError:
+            # A missing SDK is a setup error, not a failed call
+            raise
+        except Exception as e:
+            print(f"LLM batch naming failed: {e}. Using fallback naming.")
+            for ac in pending:
+                self._fallback_naming(ac)
+            return pending
+
+        names = self._parse_batch_response(response)
+        for i, ac in enumerate(pending, start=1):
+            name = self._sanitize_class_name(names.get(f"C{i}", ""))
+            if name:
+                ac.suggested_name = name
+                ac.confidence = 0.9
+                self._to_cache(ac)
+            else:
+                self._name_with_llm(ac)
+        return pending
+
+    def _query(self, prompt: str, max_tokens: int = NAME_MAX_TOKENS) -> str:
+        """
+        Send a prompt to the configured provider.
+
+        Calls are rate limited, transient failures are retried with
+        jittered exponential backoff, and the circuit breaker refuses calls
+        (CircuitOpenError) after repeated failures. With a replaying
+        recording no provider is called.
+        """
+        if self.recording is not None and self.recording.replaying:
+            self.metrics.count("replayed")
+            return self.recording.replay(prompt, max_tokens)
+        if not self.circuit_breaker.allow():
+            self.metrics.count("circuit_open")
+            raise CircuitOpenError("LLM circuit breaker is open")
+        # The first provider call imports the SDK and creates (or reuses) the
+        # client
+        if self.client is None:
+            raise RuntimeError(f"No {self.provider} client configured")
+
+        send = {
+            "openai": self._query_openai,
+            "anthropic": self._query_anthropic,
+            "local": self._query_local,
+        }[self.provider]
+        estimated_tokens = self._estimate_tokens(prompt) + max_tokens
+
+        start = time.perf_counter()
+        waited = 0.0
+        attempt = 0
+        while True:
+            waited += self.rate_limiter.acquire(estimated_tokens)
+            self._usage.tokens = None
+            try:
+                response = send(prompt, max_tokens)
+            except Exception as e:
+                if attempt < self.max_retries and is_retryable_error(e):
+                    time.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                self.circuit_breaker.record_failure()
+                self._record_call(start, waited, attempt, prompt, None)
+                raise
+            self.circuit_breaker.record_success()
+            self._record_call(start, waited, attempt, prompt, response)
+            if self.recording is not None:
+                self.recording.record(
+                    prompt,
+                    max_tokens,
+                    response,
+                    provider=self.provider,
+                    model=self.model,
+                )
+            return response
+
+    def _report_usage(self, prompt_tokens, completion_tokens):
+        """Remember the token usage a provider reported for this call."""
+        if prompt_tokens is not None and completion_tokens is not None:
+            self._usage.tokens = (prompt_tokens, completion_tokens)
+
+    def _record_call(
+        self,
+        start: float,
+        waited: float,
+        retries: int,
+        prompt: str,
+        response: Optional[str],
+    ):
+        """Add a finished provider call to the metrics."""
+        usage = getattr(self._usage, "tokens", None)
+        estimated = usage is None
+        if estimated:
+            usage = (
+                self._estimate_tokens(prompt),
+                self._estimate_tokens(response) if response else 0,
+            )
+        self.metrics.record_call(
+            provider=self.provider,
+            model=self.model,
+            ok=response is not None,
+            latency=time.perf_counter() - start,
+            rate_limit_wait=waited,
+            retries=retries,
+            prompt_tokens=usage[0],
+            completion_tokens=usage[1],
+            estimated=estimated,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay before retry `attempt + 1`."""
+        return random.uniform(
+            0, min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+        )
+
+    def _query_openai(self, prompt: str, max_tokens: int = NAME_MAX_TOKENS) -> str:
         """Query OpenAI API."""
         response = self.client.chat.completions.create(
-            model="gpt-4o-mini",  # Updated to available model
+            model=self.model,
             messages=[
                 {
                     "role": "system",
@@ -132,20 +1247,51 @@ Name:"""
                 {"role": "user", "content": prompt},
             ],
             temperature=0.3,
-            max_tokens=50,
+            max_tokens=max_tokens,
+            timeout=self.request_timeout,
+        )
+        usage = getattr(response, "usage", None)
+        self._report_usage(
+            getattr(usage, "prompt_tokens", None),
+            getattr(usage, "completion_tokens", None),
         )
         return response.choices[0].message.content.strip()
 
-    def _query_anthropic(self, prompt: str) -> str:
+    def _query_anthropic(self, prompt: str, max_tokens: int = NAME_MAX_TOKENS) -> str:
         """Query Anthropic API."""
         response = self.client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=50,
+            model=self.model,
+            max_tokens=max_tokens,
             temperature=0.3,
             messages=[{"role": "user", "content": prompt}],
+            timeout=self.request_timeout,
+        )
+        usage = getattr(response, "usage", None)
+        self._report_usage(
+            getattr(usage, "input_tokens", None),
+            getattr(usage, "output_tokens", None),
         )
         return response.content[0].text.strip()
 
+    def _query_local(self, prompt: str, max_tokens: int = NAME_MAX_TOKENS) -> str:
+        """Query an OpenAI-compatible local endpoint."""
+        response = self.client.chat(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a software architecture expert specializing in object-oriented design.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.3,
+            timeout=self.request_timeout,
+        )
+        usage = response.get("usage") or {}
+        self._report_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return response["choices"][0]["message"]["content"].strip()
+
     def _parse_llm_response(self, response: str) -> str:
         """Parse and clean the LLM response."""
         # Remove any quotes, extra whitespace, or explanations
@@ -185,6 +1331,7 @@ Name:"""
         Fallback naming strategy when LLM is not available.
         Creates a semantic name based on common attributes and class names.
         """
+        self.metrics.count("fallbacks")
         if not abstract_class.intent:
             # Use extent as base
             if len(abstract_class.extent) > 0:
@@ -195,42 +1342,24 @@ Name:"""
             abstract_class.confidence = 0.3
             return abstract_class
 
-        # Analyze intent to determine semantic meaning
-        intent_str = " ".join(abstract_class.intent).lower()
-
-        # Try to identify semantic concepts from the attributes
-        if any(
-            auth in intent_str
-            for auth in [
-                "password",
-                "motdepasse",
-                "email",
-                "login",
-                "seconnecter",
-                "authenticate",
-            ]
-        ):
-            # Authentication/User concept
-            if len(abstract_class.intent) >= 3:
-                abstract_class.suggested_name = "AbstractUser"
-            else:
-                abstract_class.suggested_name = "AbstractAuthenticatable"
-        elif "id :" in intent_str or "id:" in intent_str:
-            # Identifiable entity
-            if any(name in intent_str for name in ["nom", "name", "title", "label"]):
-                abstract_class.suggested_name = "AbstractEntity"
-            else:
-                abstract_class.suggested_name = "AbstractIdentifiable"
-        elif any(name in intent_str for name in ["nom :", "name:", "title:", "label:"]):
-            # Named/Labeled concept
-            if "title" in intent_str:
-                abstract_class.suggested_name = "AbstractTitled"
-            else:
-                abstract_class.suggested_name = "AbstractNamed"
-        else:
+        # Semantic concepts come from the rule tables, which match the member
+        # names (not the raw lines): "+ id : int" and "+id: int" are alike
+        base_name = self.fallback_rules.match(abstract_class.intent)
+        if base_name is None and self.name_index is not None:
+            # Nearest class of previously processed diagrams
+            suggestions = self.name_index.suggest(
+                abstract_class.intent, top_k=1, exclude=abstract_class.extent
+            )
+            if suggestions and suggestions[0][1] >= self.name_index_min_score:
+                base_name = suggestions[0][0]
+                if base_name.startswith("Abstract") and len(base_name) > 8:
+                    base_name = base_name[len("Abstract") :]
+                self.metrics.count("index_names")
+        if base_name is None:
             # Generic fallback: use first attribute name
-            base_name = self._sanitize_class_name(abstract_class.intent[0])
-            abstract_class.suggested_name = f"Abstract{base_name}"
+            first = parse_member(abstract_class.intent[0])
+            base_name = self._sanitize_class_name(first.name)
+        abstract_class.suggested_name = f"Abstract{base_name}"
 
         abstract_class.confidence = 0.5  # Lower confidence for fallback naming
         return abstract_class
@@ -241,19 +1370,104 @@ Name:"""
         """
         Name multiple abstract classes.
 
+        Candidates with the same intent (or, with dedupe_threshold, a
+        similar one) are named once: each group is represented by its
+        first candidate's intent and the union of the group's extents, and
+        the name is copied back to every member.
+
+        With an LLM client, up to `concurrency` requests run at once on a
+        thread pool, so a batch takes about as long as its slowest requests
+        rather than the sum of all of them. With batch_size > 1 each request
+        names a group of concepts (see name_abstract_classes_batched).
+
         Args:
             abstract_classes: List of abstract classes to name
 
         Returns:
-            List of abstract classes with suggested names
+            List of abstract classes with suggested names, in input order
+        """
+        if not self.dedupe:
+            return self._name_all(abstract_classes)
+
+        groups = self._group_by_intent(abstract_classes)
+        representatives = [
+            group[0] if len(group) == 1 else self._representative(group)
+            for group in groups
+        ]
+        self._name_all(representatives)
+
+        for group, representative in zip(groups, representatives):
+            for ac in group:
+                ac.suggested_name = representative.suggested_name
+                ac.confidence = representative.confidence
+        return abstract_classes
+
+    def _group_by_intent(
+        self, abstract_classes: List[AbstractClass]
+    ) -> List[List[AbstractClass]]:
+        """
+        Group candidates sharing a canonical intent.
+
+        With dedupe_threshold, a candidate also joins the first group whose
+        intent has at least that Jaccard similarity with its own.
         """
-        named_classes = []
+        groups: Dict[frozenset, List[AbstractClass]] = {}
+        for ac in abstract_classes:
+            intent = frozenset(ac.intent)
+            group = groups.get(intent)
+            if group is None and self.dedupe_threshold is not None and intent:
+                for other, candidates in groups.items():
+                    union = len(intent | other)
+                    if union and len(intent & other) / union >= self.dedupe_threshold:
+                        group = candidates
+                        break
+            if group is None:
+                group = groups[intent] = []
+            group.append(ac)
+        return list(groups.values())
+
+    @staticmethod
+    def _representative(group: List[AbstractClass]) -> AbstractClass:
+        """Concept naming a whole group: first intent, union of extents."""
+        extent = list(dict.fromkeys(cls for ac in group for cls in ac.extent))
+        return AbstractClass(
+            extent=extent,
+            intent=list(group[0].intent),
+            relevance_score=max(ac.relevance_score for ac in group),
+        )
+
+    def _name_all(self, abstract_classes: List[AbstractClass]) -> List[AbstractClass]:
+        """Name every candidate, one request or batch per job."""
+        # Cached names first: only the misses need the LLM (and its client)
+        pending = [ac for ac in abstract_classes if not self._from_cache(ac)]
+
+        # Fallback naming is local and cheap: no point in threads or batches
+        if not self._can_query():
+            for ac in pending:
+                self._fallback_naming(ac)
+            return list(abstract_classes)
+
+        if self.batch_size > 1:
+            jobs = self._split_batches(pending)
+            name = self._name_batch_with_llm
+        else:
+            jobs = [[ac] for ac in pending]
+            name = self._name_single
+
+        if self.concurrency == 1 or len(jobs) < 2:
+            for job in jobs:
+                name(job)
+        else:
+            workers = min(self.concurrency, len(jobs))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Consume the results to surface exceptions of the jobs
+                list(executor.map(name, jobs))
 
-        for abstract_class in abstract_classes:
-            named_class = self.name_abstract_class(abstract_class)
-            named_classes.append(named_class)
+        return list(abstract_classes)
 
-        return named_classes
+    def _name_single(self, job: List[AbstractClass]) -> List[AbstractClass]:
+        """Name a one-concept job (batch_size 1) that missed the cache."""
+        return [self._name_with_llm(job[0])]
 
     def export_named_classes(
         self, abstract_classes: List[AbstractClass], output_path: str
@@ -0,0 +1,242 @@
+"""Local stand-in for an OpenAI-compatible chat-completions API."""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+# Concepts of a batched naming prompt ("C1:\n  Classes: ...\n  Shared features: ...")
+_BATCH_CONCEPT = re.compile(
+    r"^(C\d+):\n  Classes: .*\n  Shared features: (.*)$", re.MULTILINE
+)
+# Shared features of a single-concept naming prompt
+_SINGLE_FEATURE = re.compile(r"^  - (.+)$", re.MULTILINE)
+
+ERROR_TYPES = {429: "rate_limit_error", 408: "timeout_error"}
+
+
+def _feature_name(feature: str) -> str:
+    """Deterministic one-word name derived from a feature key."""
+    name = re.split(r"[:(]", feature.strip().lstrip("+-#~"), maxsplit=1)[0]
+    name = re.sub(r"\W", "", name)
+    return name[:1].upper() + name[1:] if name else "Entity"
+
+
+def default_responder(prompt: str, request: Dict) -> str:
+    """
+    Answer a naming prompt the way a well-behaved model would.
+
+    Batched prompts get a JSON object mapping every concept ID to a name;
+    single prompts get a bare name. Names are derived from the first
+    shared feature, so the same prompt always gets the same answer.
+
+    Args:
+        prompt: Content of the last user message
+        request: Decoded request body
+
+    Returns:
+        Completion text
+    """
+    concepts = _BATCH_CONCEPT.findall(prompt)
+    if concepts:
+        return json.dumps(
+            {
+                concept_id: _feature_name(features.split(";")[0])
+                for concept_id, features in concepts
+            }
+        )
+    features = _SINGLE_FEATURE.findall(prompt)
+    return _feature_name(features[0]) if features else "Entity"
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve POST /v1/chat/completions for the owning MockLLMServer."""
+
+    def do_POST(self):
+        mock = self.server.mock
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "Not found", "type": "not_found"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(
+                400, {"error": {"message": "Invalid JSON", "type": "invalid_request"}}
+            )
+            return
+
+        delay, fail = mock._draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            status = mock.error_status
+            self._send(
+                status,
+                {
+                    "error": {
+                        "message": f"Injected error {status}",
+                        "type": ERROR_TYPES.get(status, "server_error"),
+                        "code": status,
+                    }
+                },
+                headers={"Retry-After": "0"} if status == 429 else None,
+            )
+            return
+
+        messages = request.get("messages") or []
+        prompt = next(
+            (
+                m.get("content", "")
+                for m in reversed(messages)
+                if m.get("role") == "user"
+            ),
+            "",
+        )
+        content = mock.responder(prompt, request)
+        prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        self._send(
+            200,
+            {
+                "id": f"chatcmpl-mock-{mock._next_id()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+    def _send(self, status: int, body: Dict, headers: Optional[Dict] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockLLMServer:
+    """
+    Threaded HTTP server implementing the OpenAI chat-completions shape.
+
+    Used with the "local" naming provider to exercise concurrency, caching
+    and retry behaviour without a real API: every request can be delayed
+    (latency plus uniform jitter) and a seeded fraction of them fail with
+    an HTTP error status.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        seed: int = 0,
+        responder: Optional[Callable[[str, Dict], str]] = None,
+    ):
+        """
+        Initialize the server (not yet listening).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds added to every response
+            jitter: Extra random delay of up to this many seconds
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status of injected errors (429, 500, 503, ...)
+            seed: Seed of the latency and error draws
+            responder: Function (prompt, request) -> completion text;
+                default_responder if omitted
+        """
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.responder = responder or default_responder
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to configure the client with (".../v1")."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        """Start serving in a background thread."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _draw(self):
+        """Draw the delay and error outcome of one request."""
+        with self._lock:
+            self._requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self._errors += 1
+        return delay, fail
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return self._requests
+
+    def stats(self) -> Dict[str, int]:
+        """Requests received and errors injected so far."""
+        with self._lock:
+            return {"requests": self._requests, "errors": self._errors}
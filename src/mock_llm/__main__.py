@@ -0,0 +1,43 @@
+"""Run the mock LLM server: python -m src.mock_llm --port 8000."""
+
+import time
+
+import click
+
+from . import MockLLMServer
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Interface to bind")
+@click.option("--port", type=int, default=8000, help="Port to bind (default: 8000)")
+@click.option("--latency", type=float, default=0.0, help="Seconds per response")
+@click.option("--jitter", type=float, default=0.0, help="Extra random delay (s)")
+@click.option(
+    "--error-rate", type=float, default=0.0, help="Fraction of failed requests"
+)
+@click.option("--error-status", type=int, default=429, help="Injected HTTP status")
+@click.option("--seed", type=int, default=0, help="Seed of latency/error draws")
+def main(host, port, latency, jitter, error_rate, error_status, seed):
+    """Serve an OpenAI-compatible chat-completions endpoint for naming tests."""
+    server = MockLLMServer(
+        host=host,
+        port=port,
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        error_status=error_status,
+        seed=seed,
+    ).start()
+    click.echo(f"Mock LLM listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        click.echo(f"Served {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""Offline class-name suggestions from a TF-IDF index of previously seen classes."""
+
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..parser import UMLClass, parse_member
+
+# File header: magic, format version, padding, then the counts of
+# documents, distinct names, terms and postings
+_MAGIC = b"UMLNIDX1"
+_VERSION = 1
+_HEADER = struct.Struct("<8sII4Q")
+
+# Words of a camelCase / snake_case / PascalCase member name
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("NumPy package not installed. Run: pip install numpy")
+    return np
+
+
+def feature_terms(feature: str) -> Set[str]:
+    """
+    Index terms of one feature key.
+
+    A feature contributes its whole lowercase member name and each word of
+    that name, so "+createdAt: Date" and "+updatedAt()" share "at" while
+    keeping "createdat" as a more specific term.
+
+    Args:
+        feature: Feature key such as "+createdAt: Date"
+
+    Returns:
+        Set of terms
+    """
+    name = parse_member(feature).name
+    terms = {f"m:{name.lower()}"} if name else set()
+    terms.update(f"w:{word.lower()}" for word in _WORD.findall(name))
+    return terms
+
+
+def _term_hash(term: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def _hashed_terms(features: Iterable[str]) -> frozenset:
+    return frozenset(_term_hash(t) for f in features for t in feature_terms(f))
+
+
+def _idf(document_frequency, documents: int):
+    """Smoothed inverse document frequency (never below 1)."""
+    np = _numpy()
+    return np.log((1.0 + documents) / (1.0 + document_frequency)) + 1.0
+
+
+def _sections(documents: int, names: int, terms: int, postings: int):
+    """(dtype, length) of every array of the file, in storage order."""
+    return [
+        ("<u8", terms),  # sorted term hashes
+        ("<u8", terms + 1),  # postings offset of each term
+        ("<f4", terms),  # idf of each term
+        ("<u4", postings),  # posting document IDs
+        ("<f4", postings),  # posting weights (L2-normalized TF-IDF)
+        ("<u4", documents),  # name ID of each document
+        ("<u8", names + 1),  # offset of each name in the name blob
+        ("u1", None),  # UTF-8 name blob (rest of the file)
+    ]
+
+
+class ClassNameIndexBuilder:
+    """
+    Collect (class name, features) documents and write a ClassNameIndex.
+
+    Identical documents are kept once, so re-processing a diagram does not
+    skew the index.
+    """
+
+    def __init__(self):
+        self._documents: Set[Tuple[str, frozenset]] = set()
+
+    @classmethod
+    def from_index(cls, index: "ClassNameIndex") -> "ClassNameIndexBuilder":
+        """Start from the documents of an existing index (to extend it)."""
+        builder = cls()
+        builder._documents.update(index.iter_documents())
+        return builder
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_class(self, name: str, features: Iterable[str]):
+        """
+        Add one class.
+
+        Args:
+            name: Class name (package qualifiers are dropped)
+            features: Feature keys of its attributes and methods
+        """
+        terms = _hashed_terms(features)
+        if terms:
+            self._documents.add((name.rsplit(".", 1)[-1], terms))
+
+    def add_classes(self, classes: Dict[str, UMLClass]):
+        """Add every class of a parsed UML model."""
+        for uml_class in classes.values():
+            self.add_class(uml_class.name, uml_class.attributes + uml_class.methods)
+
+    def save(self, path: str):
+        """
+        Write the index atomically (open readers keep their mapping).
+
+        Args:
+            path: Index file
+        """
+        np = _numpy()
+        documents = sorted(self._documents, key=lambda d: (d[0], sorted(d[1])))
+        names = sorted({name for name, _ in documents})
+        name_ids = {name: i for i, name in enumerate(names)}
+
+        doc_ids = np.repeat(
+            np.arange(len(documents), dtype=np.uint32),
+            [len(terms) for _, terms in documents],
+        )
+        hashes = np.fromiter(
+            (h for _, terms in documents for h in terms),
+            dtype=np.uint64,
+            count=len(doc_ids),
+        )
+        term_hashes, term_ids, frequency = np.unique(
+            hashes, return_inverse=True, return_counts=True
+        )
+        idf = _idf(frequency, len(documents)).astype(np.float32)
+
+        # Binary term weights scaled by idf, normalized per document
+        weights = idf[term_ids].astype(np.float64)
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights**2))
+        weights = (weights / norms[doc_ids]).astype(np.float32)
+
+        order = np.lexsort((doc_ids, term_ids))
+        offsets = np.zeros(len(term_hashes) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum(frequency)
+
+        encoded = [name.encode("utf-8") for name in names]
+        name_offsets = np.zeros(len(names) + 1, dtype=np.uint64)
+        name_offsets[1:] = np.cumsum([len(b) for b in encoded])
+
+        arrays = [
+            term_hashes,
+            offsets,
+            idf,
+            doc_ids[order],
+            weights[order],
+            np.array([name_ids[name] for name, _ in documents], dtype=np.uint32),
+            name_offsets,
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        ]
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(
+                    _HEADER.pack(
+                        _MAGIC,
+                        _VERSION,
+                        0,
+                        len(documents),
+                        len(names),
+                        len(term_hashes),
+                        len(doc_ids),
+                    )
+                )
+                for array, (dtype, _) in zip(arrays, _sections(0, 0, 0, 0)):
+                    f.write(array.astype(dtype, copy=False).tobytes())
+                    f.write(b"\0" * (-f.tell() % 8))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class ClassNameIndex:
+    """
+    Memory-mapped TF-IDF index suggesting class names for a feature set.
+
+    Every class of the indexed diagrams is a document whose terms are the
+    member names (and their words) of its features. A lookup scores the
+    documents sharing a term with the query by cosine similarity and
+    returns the best-scoring class names; only the postings of the query
+    terms are read, so lookups need neither network nor a loaded corpus.
+    """
+
+    def __init__(self, buffer, path: Optional[str] = None):
+        """
+        Wrap index bytes (use ClassNameIndex.open for files).
+
+        Args:
+            buffer: Bytes or mmap holding an index written by
+                ClassNameIndexBuilder.save
+            path: File the buffer was mapped from
+        """
+        np = _numpy()
+        magic, version, _, documents, names, terms, postings = _HEADER.unpack_from(
+            buffer
+        )
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a class name index (version {_VERSION})")
+
+        self.path = path
+        self._buffer = buffer
+        self.documents = documents
+        arrays = []
+        offset = _HEADER.size
+        for dtype, length in _sections(documents, names, terms, postings):
+            if length is None:
+                length = int(arrays[-1][-1]) if len(arrays[-1]) else 0
+            array = np.frombuffer(buffer, dtype=dtype, count=length, offset=offset)
+            arrays.append(array)
+            offset += array.nbytes + (-(offset + array.nbytes) % 8)
+        (
+            self._term_hashes,
+            self._term_offsets,
+            self._idf,
+            self._posting_docs,
+            self._posting_weights,
+            self._doc_names,
+            self._name_offsets,
+            self._name_blob,
+        ) = arrays
+        self._unknown_idf = float(_idf(0, documents))
+
+    @classmethod
+    def open(cls, path: str) -> "ClassNameIndex":
+        """Memory-map an index file."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path)
+
+    def close(self):
+        """Release the mapping (the index cannot be queried afterwards)."""
+        # Drop the array views first: a mapping with live views cannot close
+        for name in (
+            "_term_hashes",
+            "_term_offsets",
+            "_idf",
+            "_posting_docs",
+            "_posting_weights",
+            "_doc_names",
+            "_name_offsets",
+            "_name_blob",
+        ):
+            setattr(self, name, None)
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.documents
+
+    def _name(self, name_id: int) -> str:
+        start, end = self._name_offsets[name_id], self._name_offsets[name_id + 1]
+        return self._name_blob[start:end].tobytes().decode("utf-8")
+
+    def suggest(
+        self,
+        intent: Iterable[str],
+        top_k: int = 3,
+        exclude: Iterable[str] = (),
+    ) -> List[Tuple[str, float]]:
+        """
+        Suggest class names for a set of features.
+
+        Args:
+            intent: Feature keys (e.g. the intent of a concept)
+            top_k: Maximum number of names
+            exclude: Names never suggested (e.g. the concept's extent)
+
+        Returns:
+            (class name, cosine similarity) tuples, best first; a name seen
+            in several diagrams scores its best match
+
+        Documents sharing only very common terms (in over 1/8 of the index)
+        with the query are not scored when the query also has rarer terms,
+        which keeps lookups fast on large indexes.
+        """
+        np = _numpy()
+        hashes = np.fromiter(_hashed_terms(intent), dtype=np.uint64)
+        if not len(hashes) or not len(self._term_hashes):
+            return []
+
+        positions = np.searchsorted(self._term_hashes, hashes)
+        positions[positions == len(self._term_hashes)] = 0
+        known = self._term_hashes[positions] == hashes
+        positions = positions[known]
+
+        # Unknown terms still count in the query norm
+        query_idf = self._idf[positions].astype(np.float64)
+        norm = math.sqrt(
+            float((query_idf**2).sum())
+            + (len(hashes) - len(positions)) * self._unknown_idf**2
+        )
+        if not len(positions):
+            return []
+
+        starts = self._term_offsets[positions].astype(np.int64)
+        ends = self._term_offsets[positions + 1].astype(np.int64)
+        query_weights = query_idf / norm
+        # Terms found in more than 1/8 of the documents only rescore the
+        # candidates brought in by the selective terms
+        common = (ends - starts) * 8 >= self.documents
+        if not common.all():
+            docs = np.concatenate(
+                [
+                    self._posting_docs[s:e]
+                    for s, e in zip(starts[~common], ends[~common])
+                ]
+            )
+            weights = np.concatenate(
+                [
+                    self._posting_weights[s:e] * w
+                    for s, e, w in zip(
+                        starts[~common], ends[~common], query_weights[~common]
+                    )
+                ]
+            )
+            docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights)
+            for s, e, w in zip(starts[common], ends[common], query_weights[common]):
+                # Postings of a term are sorted by document
+                posting = self._posting_docs[s:e]
+                found = np.minimum(np.searchsorted(posting, docs), len(posting) - 1)
+                hit = posting[found] == docs
+                scores[hit] += self._posting_weights[s:e][found[hit]] * w
+        else:
+            # Only common terms: accumulate one score per document
+            accumulator = np.zeros(self.documents)
+            for s, e, w in zip(starts, ends, query_weights):
+                accumulator[self._posting_docs[s:e]] += self._posting_weights[s:e] * w
+            docs = np.flatnonzero(accumulator)
+            scores = accumulator[docs]
+
+        excluded = {name.rsplit(".", 1)[-1] for name in exclude}
+        # Walk documents best first; a name's first document is its best
+        # score. Only a shortlist is sorted unless many names are skipped.
+        shortlist = max(32, 4 * top_k + len(excluded))
+        while True:
+            if shortlist < len(scores):
+                candidates = np.argpartition(-scores, shortlist)[:shortlist]
+            else:
+                candidates = np.arange(len(scores))
+            candidates = candidates[np.lexsort((docs[candidates], -scores[candidates]))]
+
+            suggestions, seen = [], set()
+            for k in candidates:
+                name_id = int(self._doc_names[docs[k]])
+                if name_id in seen:
+                    continue
+                seen.add(name_id)
+                name = self._name(name_id)
+                if name not in excluded:
+                    suggestions.append((name, float(scores[k])))
+                    if len(suggestions) == top_k:
+                        return suggestions
+            if len(candidates) == len(scores):
+                return suggestions
+            shortlist *= 4
+
+    def iter_documents(self) -> Iterable[Tuple[str, frozenset]]:
+        """Yield (class name, term hashes) of every indexed document."""
+        np = _numpy()
+        term_of_posting = np.repeat(
+            self._term_hashes, np.diff(self._term_offsets).astype(np.int64)
+        )
+        order = np.argsort(self._posting_docs, kind="stable")
+        docs = self._posting_docs[order]
+        hashes = term_of_posting[order]
+        bounds = np.searchsorted(docs, np.arange(self.documents + 1))
+        for doc in range(self.documents):
+            terms = frozenset(int(h) for h in hashes[bounds[doc] : bounds[doc + 1]])
+            yield self._name(int(self._doc_names[doc])), terms
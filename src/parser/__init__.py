@@ -1,24 +1,263 @@
 """PlantUML parser module for extracting UML diagram elements."""
 
-from typing import Dict, List, Optional
+import difflib
+import os
+import re
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+# Preprocessor directives that pull another diagram file into the current one
+INCLUDE_DIRECTIVES = ("!include", "!include_once", "!include_many")
 
-@dataclass
+# Class-like declarations: kind keyword, optional quoted name, name, alias
+CLASS_DECLARATION = re.compile(
+    r"^(abstract\s+class|abstract|class|interface|enum)\s+"
+    r'(?:"([^"]+)"|([\w.$]+))(?:\s+as\s+([\w.$]+))?(.*)$'
+)
+CLASS_KINDS = {
+    "class": "class",
+    "abstract": "abstract",
+    "abstract class": "abstract",
+    "interface": "interface",
+    "enum": "enum",
+}
+
+# Grouping blocks whose name qualifies the classes they contain
+PACKAGE_DECLARATION = re.compile(r'^(package|namespace)\s+(?:"([^"]+)"|([^\s{<]+))')
+
+# dataclass(slots=True) is only available from Python 3.10 onwards
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class Symbols:
+    """
+    Interning strategy for class, member and type names.
+
+    Parsers and knowledge graphs accept any Symbols: a scoped SymbolTable or
+    the process-wide SYMBOLS (a SystemSymbols).
+    """
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """
+        Return the canonical instance of a string.
+
+        Args:
+            value: String to intern (None is passed through)
+
+        Returns:
+            The shared instance equal to value
+        """
+        raise NotImplementedError
+
+
+class SymbolTable(Symbols):
+    """
+    Interning table for class, member and type names.
+
+    Every name that goes through the table is stored once; later lookups of
+    an equal string return that same object. Large models therefore keep a
+    single copy of names such as "+id: int" no matter how many classes
+    declare them, and equality checks between interned names short-circuit
+    on identity.
+
+    The table keeps its names alive as long as it lives, so scope it to a
+    parse or a run. Without an explicit table, names go through the
+    process-wide SYMBOLS, a SystemSymbols backed by sys.intern.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[str, str] = {}
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """
+        Return the canonical instance of a string.
+
+        Args:
+            value: String to intern (None is passed through)
+
+        Returns:
+            The shared instance equal to value
+        """
+        if value is None:
+            return None
+        return self._symbols.setdefault(value, value)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._symbols
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+class SystemSymbols(Symbols):
+    """
+    Interning through sys.intern.
+
+    Gives the same identity sharing as a SymbolTable without a table of our
+    own: interned strings are released once nothing references them, so
+    long sessions that parse many diagrams do not accumulate names.
+    """
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """Return the canonical instance of a string (None is passed through)."""
+        if value is None:
+            return None
+        return sys.intern(value)
+
+
+# Process-wide interning shared by parsers and knowledge graphs by default
+SYMBOLS = SystemSymbols()
+
+
+@dataclass(frozen=True, **_SLOTS)
+class UMLMember:
+    """Represents a parsed attribute or method of a UML class."""
+
+    kind: str  # 'attribute' or 'method'
+    visibility: str  # '+', '-', '#', '~' or '' when omitted
+    name: str
+    type: Optional[str] = None  # Attribute type
+    parameters: Tuple[str, ...] = ()  # Normalized "name: Type" parameters
+    return_type: Optional[str] = None
+    modifiers: Tuple[str, ...] = ()  # e.g. ('static',) for {static}
+    raw: str = ""  # Line as written in the diagram
+    key: str = ""  # Normalized feature key used for matching across classes
+
+
+def _normalize_type(type_str: Optional[str]) -> Optional[str]:
+    """Collapse whitespace in a type expression ("List< String >" -> "List<String>")."""
+    if not type_str:
+        return None
+    type_str = " ".join(type_str.split())
+    type_str = re.sub(r"\s*([<>\[\]])\s*", r"\1", type_str)
+    type_str = re.sub(r"\s*,\s*", ", ", type_str)
+    return type_str or None
+
+
+def _split_top_level(text: str, separator: str = ",") -> List[str]:
+    """Split on a separator that is not nested inside <>, () or []."""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char in "<([":
+            depth += 1
+        elif char in ">)]":
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _split_name_and_type(declaration: str):
+    """Split "name : Type" or Java-style "Type name" into (name, type)."""
+    if ":" in declaration:
+        name, type_str = declaration.split(":", 1)
+        return name.strip(), _normalize_type(type_str)
+
+    tokens = declaration.split()
+    if len(tokens) > 1:
+        return tokens[-1], _normalize_type(" ".join(tokens[:-1]))
+    return declaration.strip(), None
+
+
+def parse_member(line: str, symbols: Optional[Symbols] = None) -> UMLMember:
+    """
+    Parse a class member line into a structured record.
+
+    Spacing and declaration style are normalized so that "+ email : String"
+    and "+email: String" produce the same feature key.
+
+    Args:
+        line: Member line such as "+ email : String" or "+login(user: String)"
+        symbols: Optional symbol table used to intern the parsed names
+
+    Returns:
+        UMLMember describing the attribute or method
+    """
+    raw = line.strip()
+    rest = raw
+
+    visibility = ""
+    if rest[:1] in ("+", "-", "#", "~"):
+        visibility, rest = rest[0], rest[1:].strip()
+
+    modifiers = []
+    while rest.startswith("{") and "}" in rest:
+        modifier, rest = rest[1:].split("}", 1)
+        modifiers.append(modifier.strip())
+        rest = rest.strip()
+
+    # Visibility may also follow the modifiers ("{static} +count : int")
+    if not visibility and rest[:1] in ("+", "-", "#", "~"):
+        visibility, rest = rest[0], rest[1:].strip()
+
+    prefix = visibility + "".join(f"{{{m}}} " for m in modifiers)
+
+    if "(" in rest:
+        head, _, tail = rest.partition("(")
+        params_str, _, after = tail.rpartition(")")
+        head_tokens = head.split()
+        name = head_tokens[-1] if head_tokens else ""
+        return_type = _normalize_type(" ".join(head_tokens[:-1]))
+        if after.strip().startswith(":"):
+            return_type = _normalize_type(after.strip()[1:])
+
+        parameters = []
+        for param in _split_top_level(params_str):
+            param_name, param_type = _split_name_and_type(param)
+            parameters.append(
+                f"{param_name}: {param_type}" if param_type else param_name
+            )
+
+        key = f"{prefix}{name}({', '.join(parameters)})"
+        if return_type:
+            key += f": {return_type}"
+        kind, type_str = "method", None
+    else:
+        name, type_str = _split_name_and_type(rest)
+        key = f"{prefix}{name}: {type_str}" if type_str else f"{prefix}{name}"
+        kind, parameters, return_type = "attribute", [], None
+
+    intern = symbols.intern if symbols is not None else (lambda value: value)
+
+    return UMLMember(
+        kind=kind,
+        visibility=visibility,
+        name=intern(name),
+        type=intern(type_str),
+        parameters=tuple(intern(p) for p in parameters),
+        return_type=intern(return_type),
+        modifiers=tuple(modifiers),
+        raw=raw,
+        key=intern(key),
+    )
+
+
+@dataclass(**_SLOTS)
 class UMLClass:
     """Represents a UML class."""
 
     name: str
-    attributes: List[str]
-    methods: List[str]
+    attributes: List[str]  # Normalized feature keys of the attributes
+    methods: List[str]  # Normalized feature keys of the methods
     stereotypes: List[str] = None
+    members: List[UMLMember] = None  # Structured attributes and methods
+    kind: str = "class"  # class, abstract, interface, enum
+    package: Optional[str] = None  # Dotted name of the enclosing package(s)
 
     def __post_init__(self):
         if self.stereotypes is None:
             self.stereotypes = []
+        if self.members is None:
+            self.members = []
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class UMLRelationship:
     """Represents a UML relationship between classes."""
 
@@ -30,74 +269,434 @@ class UMLRelationship:
     label: Optional[str] = None
 
 
+@dataclass(**_SLOTS)
+class ElementSpan:
+    """Line range of a parsed diagram element (0-based, inclusive)."""
+
+    start: int
+    end: int
+    kind: str  # 'class' or 'relationship'
+    element: Union[UMLClass, UMLRelationship]
+
+
 class PlantUMLParser:
     """Parser for PlantUML diagrams."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        include_cache: Optional[Dict[str, Dict]] = None,
+        symbols: Optional[Symbols] = None,
+    ):
+        """
+        Initialize the parser.
+
+        Args:
+            include_cache: Mapping of absolute file paths to already-parsed
+                models. Share one dictionary between parsers (e.g. for the
+                duration of a pipeline run) so that fragments included by
+                many diagrams are only parsed once.
+            symbols: Symbols used to intern names (defaults to the
+                process-wide SYMBOLS, backed by sys.intern)
+        """
         self.classes: Dict[str, UMLClass] = {}
         self.relationships: List[UMLRelationship] = []
+        self.include_cache: Dict[str, Dict] = (
+            include_cache if include_cache is not None else {}
+        )
+        self.symbols = symbols if symbols is not None else SYMBOLS
+        self.lines: List[str] = []
+        self.line_map: List[ElementSpan] = []
+        self._member_cache: Dict[str, UMLMember] = {}
+        self._merged_relationships: set = set()
 
-    def parse(self, plantuml_content: str) -> Dict:
+    def parse(self, plantuml_content: str, base_dir: Optional[str] = None) -> Dict:
         """
         Parse PlantUML content and extract classes and relationships.
 
         Args:
             plantuml_content: The PlantUML diagram as a string
+            base_dir: Directory used to resolve relative !include paths
+                (defaults to the current working directory)
+
+        Returns:
+            Dictionary containing parsed classes and relationships
+        """
+        self._reset()
+        self._parse_content(plantuml_content, base_dir, include_stack=[])
+
+        return self._result(base_dir)
+
+    def reparse(self, old_result: Dict, new_text: str) -> Dict:
+        """
+        Incrementally parse an edited version of a previously parsed diagram.
+
+        The old and new texts are diffed line by line. Classes and
+        relationships whose lines fall entirely inside unchanged regions
+        (and whose enclosing package is unchanged) are reused as-is; only
+        the changed class blocks and relationship lines are re-tokenized.
+        Included files are resolved through the include cache, so edits to
+        included files are only seen with a fresh cache.
+
+        Args:
+            old_result: Result of a previous parse() or reparse() call
+            new_text: The edited PlantUML diagram as a string
+
+        Returns:
+            Dictionary containing parsed classes and relationships (as
+            returned by parse()) plus a "changes" entry with the added,
+            removed and modified classes, the added and removed
+            relationships and the number of re-tokenized lines
+        """
+        base_dir = old_result.get("base_dir")
+        new_lines = new_text.strip().split("\n")
+        reusable: Dict[int, ElementSpan] = {}
+
+        # Results without a line map (e.g. from parse_files) are reparsed fully
+        if "line_map" in old_result:
+            matcher = difflib.SequenceMatcher(
+                None, old_result["lines"], new_lines, autojunk=False
+            )
+            equal_blocks = [
+                (i1, i2, j1 - i1)
+                for tag, i1, i2, j1, _ in matcher.get_opcodes()
+                if tag == "equal"
+            ]
+
+            # An element is reusable when its whole span sits in one equal block
+            for span in old_result["line_map"]:
+                for i1, i2, offset in equal_blocks:
+                    if i1 <= span.start and span.end < i2:
+                        reusable[span.start + offset] = ElementSpan(
+                            span.start + offset,
+                            span.end + offset,
+                            span.kind,
+                            span.element,
+                        )
+                        break
+
+        self._reset()
+        retokenized = self._parse_lines(new_lines, base_dir, [], reusable)
+
+        result = self._result(base_dir)
+        result["changes"] = self._diff_models(old_result, result)
+        result["changes"]["retokenized_lines"] = retokenized
+        return result
+
+    def parse_file(self, path: str) -> Dict:
+        """
+        Parse a PlantUML file, resolving its !include directives.
+
+        Args:
+            path: Path to the PlantUML file
 
         Returns:
             Dictionary containing parsed classes and relationships
         """
+        path = os.path.abspath(path)
+        with open(path, "r") as f:
+            content = f.read()
+
+        self._reset()
+        self._parse_content(content, os.path.dirname(path), include_stack=[path])
+
+        return self._result(os.path.dirname(path))
+
+    def parse_files(self, paths: List[str]) -> Dict:
+        """
+        Parse several PlantUML files into a single model.
+
+        Classes and relationships from every file (and every file they
+        include) are merged, so a model split across many files can be
+        analysed as one formal context.
+
+        Args:
+            paths: Paths to the PlantUML files
+
+        Returns:
+            Dictionary containing parsed classes and relationships
+        """
+        self._reset()
+
+        for path in paths:
+            self._merge_fragment(self._load_fragment(os.path.abspath(path), []))
+
+        return {"classes": self.classes, "relationships": self.relationships}
+
+    def _reset(self):
+        """Clear the state left over from a previous parse."""
         self.classes = {}
         self.relationships = []
+        self.lines: List[str] = []
+        self.line_map: List[ElementSpan] = []
+        self._merged_relationships = set()
+
+    def _result(self, base_dir: Optional[str]) -> Dict:
+        """Build the result of parsing a single diagram text."""
+        return {
+            "classes": self.classes,
+            "relationships": self.relationships,
+            "lines": self.lines,
+            "line_map": self.line_map,
+            "base_dir": base_dir,
+        }
+
+    @staticmethod
+    def _diff_models(old_result: Dict, new_result: Dict) -> Dict:
+        """Compare two parse results and report what changed."""
+        old_classes = old_result["classes"]
+        new_classes = new_result["classes"]
+
+        def relationship_key(rel):
+            return (
+                rel.source,
+                rel.target,
+                rel.relationship_type,
+                rel.cardinality_source,
+                rel.cardinality_target,
+                rel.label,
+            )
+
+        old_relationships = Counter(map(relationship_key, old_result["relationships"]))
+        new_relationships = Counter(map(relationship_key, new_result["relationships"]))
+
+        def pick(relationships, keys):
+            picked = []
+            for rel in relationships:
+                if keys[relationship_key(rel)] > 0:
+                    keys[relationship_key(rel)] -= 1
+                    picked.append(rel)
+            return picked
+
+        return {
+            "added": {n: c for n, c in new_classes.items() if n not in old_classes},
+            "removed": [n for n in old_classes if n not in new_classes],
+            # Reused classes are the same object, so only re-tokenized ones
+            # need a field-by-field comparison
+            "modified": {
+                n: c
+                for n, c in new_classes.items()
+                if n in old_classes and old_classes[n] is not c and old_classes[n] != c
+            },
+            "relationships": {
+                "added": pick(
+                    new_result["relationships"], new_relationships - old_relationships
+                ),
+                "removed": pick(
+                    old_result["relationships"], old_relationships - new_relationships
+                ),
+            },
+        }
 
-        lines = plantuml_content.strip().split("\n")
+    def _load_fragment(self, path: str, include_stack: List[str]) -> Dict:
+        """
+        Return the parsed model of a file, using the include cache.
+
+        Args:
+            path: Absolute path to the PlantUML file
+            include_stack: Files currently being resolved (for cycle detection)
+
+        Returns:
+            Dictionary containing the file's classes and relationships
+        """
+        if path in include_stack:
+            cycle = " -> ".join(include_stack + [path])
+            raise ValueError(f"Circular !include detected: {cycle}")
+
+        if path not in self.include_cache:
+            with open(path, "r") as f:
+                content = f.read()
+
+            child = PlantUMLParser(
+                include_cache=self.include_cache, symbols=self.symbols
+            )
+            child._parse_content(content, os.path.dirname(path), include_stack + [path])
+            self.include_cache[path] = {
+                "classes": child.classes,
+                "relationships": child.relationships,
+            }
+
+        return self.include_cache[path]
+
+    def _merge_fragment(self, fragment: Dict):
+        """Merge a parsed file into the current model."""
+        self.classes.update(fragment["classes"])
+
+        # Cached fragments share their relationship objects, so a fragment
+        # reached through several include paths is only merged once
+        for rel in fragment["relationships"]:
+            if id(rel) not in self._merged_relationships:
+                self._merged_relationships.add(id(rel))
+                self.relationships.append(rel)
+
+    def _parse_include(
+        self, line: str, base_dir: Optional[str], include_stack: List[str]
+    ):
+        """Resolve an !include directive and merge the included model."""
+        directive, _, target = line.partition(" ")
+        target = target.strip().strip('"')
+
+        # Standard library (<...>) and URL includes cannot be resolved locally
+        if directive not in INCLUDE_DIRECTIVES or not target or target.startswith("<"):
+            return
+
+        # Drop diagram selectors such as "file.puml!1" or "file.puml!ID"
+        target = target.split("!")[0]
+        path = os.path.abspath(os.path.join(base_dir or os.getcwd(), target))
+
+        self._merge_fragment(self._load_fragment(path, include_stack))
+
+    def _parse_content(
+        self, plantuml_content: str, base_dir: Optional[str], include_stack: List[str]
+    ):
+        """Parse diagram text into the current model."""
+        self._parse_lines(plantuml_content.strip().split("\n"), base_dir, include_stack)
+
+    def _parse_lines(
+        self,
+        lines: List[str],
+        base_dir: Optional[str],
+        include_stack: List[str],
+        reusable: Optional[Dict[int, ElementSpan]] = None,
+    ) -> int:
+        """
+        Parse diagram lines into the current model, recording element spans.
+
+        Args:
+            lines: Lines of the diagram
+            base_dir: Directory used to resolve relative !include paths
+            include_stack: Files currently being resolved (for cycle detection)
+            reusable: Already-parsed elements keyed by their first line; such
+                elements are taken over instead of being tokenized again
+
+        Returns:
+            Number of lines that were tokenized
+        """
+        self.lines = lines
+        reusable = reusable or {}
         current_class = None
+        current_span = None
+        packages: List[str] = []  # Open package/namespace blocks
+        tokenized = 0
+
+        index = -1
+        while index + 1 < len(lines):
+            index += 1
+
+            span = reusable.get(index)
+            package_name = ".".join(packages) if packages else None
+            if span and (span.kind != "class" or span.element.package == package_name):
+                # Unchanged element: a class block closes itself, so parsing
+                # resumes outside of any class body after it
+                if span.kind == "class":
+                    self.classes[span.element.name] = span.element
+                    current_class = None
+                else:
+                    self.relationships.append(span.element)
+                self.line_map.append(span)
+
+                # Relationship lines written inside the class body come along
+                for nested in range(span.start + 1, span.end + 1):
+                    if nested in reusable:
+                        self.relationships.append(reusable[nested].element)
+                        self.line_map.append(reusable[nested])
+
+                index = span.end
+                continue
 
-        for line in lines:
-            line = line.strip()
+            tokenized += 1
+            line = lines[index].strip()
 
             # Skip empty lines and comments
             if not line or line.startswith("'") or line.startswith("@"):
                 continue
 
-            # Parse class declarations
-            if line.startswith("class "):
-                current_class = self._parse_class_declaration(line)
+            # Resolve includes; other preprocessor directives are ignored
+            if line.startswith("!"):
+                self._parse_include(line, base_dir, include_stack)
+                continue
+
+            declaration = CLASS_DECLARATION.match(line)
+            package = PACKAGE_DECLARATION.match(line) if not declaration else None
+
+            # Parse class, abstract class, interface and enum declarations
+            if declaration:
+                class_name = self._parse_class_declaration(declaration, package_name)
+                current_span = ElementSpan(
+                    index, index, "class", self.classes[class_name]
+                )
+                self.line_map.append(current_span)
+                # Only a declaration that opens a body receives members
+                body = declaration.group(5)
+                current_class = (
+                    class_name
+                    if "{" in body and not body.rstrip().endswith("}")
+                    else None
+                )
+            elif package:
+                if "{" in line and not line.endswith("}"):
+                    packages.append(package.group(2) or package.group(3))
             elif line == "}":
-                current_class = None
-            elif current_class and (
-                line.startswith("+") or line.startswith("-") or line.startswith("#")
-            ):
+                if current_class:
+                    current_class = None
+                    current_span.end = index
+                elif packages:
+                    packages.pop()
+            elif current_class and line[0] in ("+", "-", "#", "~", "{"):
                 self._parse_class_member(current_class, line)
+                current_span.end = index
             # Parse relationships
             elif any(
                 rel in line
                 for rel in ["--|>", "--*", "--o", "--", "<|--", "*--", "o--"]
             ):
+                count = len(self.relationships)
                 self._parse_relationship(line)
+                if len(self.relationships) > count:
+                    self.line_map.append(
+                        ElementSpan(
+                            index, index, "relationship", self.relationships[-1]
+                        )
+                    )
 
-        return {"classes": self.classes, "relationships": self.relationships}
+        return tokenized
 
-    def _parse_class_declaration(self, line: str) -> str:
-        """Parse a class declaration line."""
-        parts = line.replace("class ", "").replace("{", "").strip().split()
-        class_name = parts[0]
+    def _parse_class_declaration(
+        self, declaration: re.Match, package: Optional[str] = None
+    ) -> str:
+        """Parse a class, abstract class, interface or enum declaration."""
+        keyword, quoted_name, name, alias, rest = declaration.groups()
+        class_name = self.symbols.intern(alias or quoted_name or name)
 
-        self.classes[class_name] = UMLClass(name=class_name, attributes=[], methods=[])
+        self.classes[class_name] = UMLClass(
+            name=class_name,
+            attributes=[],
+            methods=[],
+            stereotypes=[
+                self.symbols.intern(s.strip()) for s in re.findall(r"<<(.+?)>>", rest)
+            ],
+            kind=CLASS_KINDS[" ".join(keyword.split())],
+            package=self.symbols.intern(package),
+        )
 
         return class_name
 
     def _parse_class_member(self, class_name: str, line: str):
-        """Parse class attributes and methods."""
-        if "(" in line:  # Method
-            self.classes[class_name].methods.append(line)
-        else:  # Attribute
-            self.classes[class_name].attributes.append(line)
+        """Parse class attributes and methods into structured members."""
+        # Identical lines are parsed once and the frozen record is shared
+        member = self._member_cache.get(line)
+        if member is None:
+            member = parse_member(line, self.symbols)
+            self._member_cache[line] = member
+
+        uml_class = self.classes[class_name]
+        uml_class.members.append(member)
+        if member.kind == "method":
+            uml_class.methods.append(member.key)
+        else:
+            uml_class.attributes.append(member.key)
 
     def _parse_relationship(self, line: str):
         """Parse relationship between classes with cardinality support."""
-        import re
-
         for rel_type, symbol in [
             ("inheritance", "--|>"),
             ("inheritance", "<|--"),
@@ -148,14 +747,15 @@ class PlantUMLParser:
                         cardinality_target = None
                         label = None
 
+                    intern = self.symbols.intern
                     self.relationships.append(
                         UMLRelationship(
-                            source=source,
-                            target=target,
+                            source=intern(source),
+                            target=intern(target),
                             relationship_type=rel_type,
-                            cardinality_source=cardinality_source,
-                            cardinality_target=cardinality_target,
-                            label=label,
+                            cardinality_source=intern(cardinality_source),
+                            cardinality_target=intern(cardinality_target),
+                            label=intern(label),
                         )
                     )
                     break
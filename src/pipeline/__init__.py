@@ -3,17 +3,32 @@
 import os
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 from pathlib import Path
 
 from ..parser import PlantUMLParser
 from ..knowledge_graph import KnowledgeGraph
+from ..kg_store import KnowledgeGraphStore
 from ..fca_analyzer import FCAAnalyzer
-from ..llm_naming import LLMNamingService, AbstractClass
+from ..llm_naming import (
+    LLMNamingService,
+    AbstractClass,
+    NameCache,
+    PromptRecording,
+    FallbackRuleEngine,
+)
+from ..name_index import ClassNameIndex, ClassNameIndexBuilder
 from ..generator import PlantUMLGenerator
 from ..evaluator import ConceptEvaluator
 
+# Ways of splitting the model into independent FCA contexts (None = no split)
+PARTITION_STRATEGIES = (None, "package", "component", "community")
+
+# Knowledge graph export formats ("none" skips the export)
+KG_EXPORT_FORMATS = ("ndjson", "node-link", "none")
+
 
 class PipelineConfig:
     """Configuration for the pipeline."""
@@ -28,8 +43,98 @@ class PipelineConfig:
         output_dir: str = "output",
         logs_dir: str = "logs",
         reports_dir: str = "reports",
+        partition_by: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        partition_feature_sharing: Optional[bool] = None,
+        fca_hubs: bool = False,
+        kg_backend: str = "networkx",
+        shared_features: bool = False,
+        kg_export_format: str = "ndjson",
+        kg_export_compress: bool = False,
+        kg_store_path: Optional[str] = None,
+        kg_export_rdf: bool = False,
+        naming_concurrency: int = 4,
+        naming_batch_size: int = 1,
+        naming_cache_path: Optional[str] = None,
+        naming_cache_ttl: Optional[float] = None,
+        naming_similarity: Optional[float] = None,
+        llm_requests_per_minute: Optional[float] = None,
+        llm_tokens_per_minute: Optional[float] = None,
+        llm_max_retries: int = 3,
+        llm_timeout: Optional[float] = 30.0,
+        llm_base_url: Optional[str] = None,
+        llm_record_path: Optional[str] = None,
+        llm_replay_path: Optional[str] = None,
+        fallback_rules_paths: Optional[List[str]] = None,
+        name_index_path: Optional[str] = None,
     ):
-        """Initialize pipeline configuration."""
+        """
+        Initialize pipeline configuration.
+
+        Args:
+            partition_by: Split FCA into independent contexts, one per
+                "package", per connected "component" or per label-propagation
+                "community" of the knowledge graph; None analyses the whole
+                model as one context
+            max_workers: Maximum number of partitions analysed in parallel
+                (defaults to the ThreadPoolExecutor default)
+            partition_feature_sharing: Link classes declaring a common feature
+                when computing components or communities (None uses the
+                KnowledgeGraph default: off for components, on for
+                communities)
+            fca_hubs: Also analyse the classes linked across partitions
+                together, so abstractions spanning partitions are not lost
+            kg_backend: Knowledge graph storage, "networkx" or the
+                integer-indexed "compact" backend for very large models
+            shared_features: Build one knowledge graph node per distinct
+                feature instead of one per member occurrence
+            kg_export_format: Knowledge graph export, streamed "ndjson"
+                (one record per line), legacy indented "node-link" JSON, or
+                "none" to skip the export
+            kg_export_compress: Gzip the ndjson knowledge graph export
+            kg_store_path: SQLite database where every run's knowledge graph
+                is appended (see KnowledgeGraphStore); disabled if None
+            kg_export_rdf: Also stream the knowledge graph as N-Triples
+            naming_concurrency: Maximum number of concurrent LLM naming
+                requests
+            naming_batch_size: Number of concepts named per LLM request
+                (1 sends one prompt per concept)
+            naming_cache_path: SQLite file caching LLM names across runs
+                (see NameCache); disabled if None
+            naming_cache_ttl: Lifetime of cached names in seconds (None:
+                never expire)
+            naming_similarity: Jaccard similarity of intents above which
+                candidates share one LLM name (None: identical intents only)
+            llm_requests_per_minute: LLM request rate limit (None: unlimited)
+            llm_tokens_per_minute: LLM token rate limit (None: unlimited)
+            llm_max_retries: Retries of transient LLM failures (429,
+                timeouts, 5xx) with jittered exponential backoff
+            llm_timeout: Per-request LLM timeout in seconds
+            llm_base_url: Endpoint of the 'local' provider (an
+                OpenAI-compatible server such as src.mock_llm)
+            llm_record_path: Append every LLM prompt and response to this
+                JSON lines file
+            llm_replay_path: Answer LLM prompts from a recording instead of
+                calling the provider
+            fallback_rules_paths: JSON rule tables of fallback naming, tried
+                before the shipped rules
+            name_index_path: Class name index of previously processed
+                diagrams; fallback naming suggests names from it and every
+                run adds its classes
+        """
+        if partition_by not in PARTITION_STRATEGIES:
+            raise ValueError(
+                f"Unknown partition strategy '{partition_by}'. "
+                f"Expected one of: {', '.join(s for s in PARTITION_STRATEGIES if s)}"
+            )
+        if kg_export_format not in KG_EXPORT_FORMATS:
+            raise ValueError(
+                f"Unknown knowledge graph export format '{kg_export_format}'. "
+                f"Expected one of: {', '.join(KG_EXPORT_FORMATS)}"
+            )
+        if llm_record_path and llm_replay_path:
+            raise ValueError("llm_record_path and llm_replay_path are exclusive")
+
         self.llm_provider = llm_provider
         self.llm_api_key = llm_api_key
         self.fca4j_path = fca4j_path
@@ -38,6 +143,30 @@ class PipelineConfig:
         self.output_dir = output_dir
         self.logs_dir = logs_dir
         self.reports_dir = reports_dir
+        self.partition_by = partition_by
+        self.max_workers = max_workers
+        self.partition_feature_sharing = partition_feature_sharing
+        self.fca_hubs = fca_hubs
+        self.kg_backend = kg_backend
+        self.shared_features = shared_features
+        self.kg_export_format = kg_export_format
+        self.kg_export_compress = kg_export_compress
+        self.kg_store_path = kg_store_path
+        self.kg_export_rdf = kg_export_rdf
+        self.naming_concurrency = naming_concurrency
+        self.naming_batch_size = naming_batch_size
+        self.naming_cache_path = naming_cache_path
+        self.naming_cache_ttl = naming_cache_ttl
+        self.naming_similarity = naming_similarity
+        self.llm_requests_per_minute = llm_requests_per_minute
+        self.llm_tokens_per_minute = llm_tokens_per_minute
+        self.llm_max_retries = llm_max_retries
+        self.llm_timeout = llm_timeout
+        self.llm_base_url = llm_base_url
+        self.llm_record_path = llm_record_path
+        self.llm_replay_path = llm_replay_path
+        self.fallback_rules_paths = list(fallback_rules_paths or [])
+        self.name_index_path = name_index_path
 
 
 class UMLEnhancementPipeline:
@@ -55,10 +184,41 @@ class UMLEnhancementPipeline:
 
         # Initialize components
         self.parser = PlantUMLParser()
-        self.knowledge_graph = KnowledgeGraph()
+        self.knowledge_graph = KnowledgeGraph(
+            backend=self.config.kg_backend,
+            shared_features=self.config.shared_features,
+        )
         self.fca_analyzer = FCAAnalyzer(fca4j_path=self.config.fca4j_path)
         self.llm_service = LLMNamingService(
-            provider=self.config.llm_provider, api_key=self.config.llm_api_key
+            provider=self.config.llm_provider,
+            api_key=self.config.llm_api_key,
+            concurrency=self.config.naming_concurrency,
+            batch_size=self.config.naming_batch_size,
+            cache=(
+                NameCache(
+                    self.config.naming_cache_path, ttl=self.config.naming_cache_ttl
+                )
+                if self.config.naming_cache_path
+                else None
+            ),
+            dedupe_threshold=self.config.naming_similarity,
+            requests_per_minute=self.config.llm_requests_per_minute,
+            tokens_per_minute=self.config.llm_tokens_per_minute,
+            max_retries=self.config.llm_max_retries,
+            request_timeout=self.config.llm_timeout,
+            base_url=self.config.llm_base_url,
+            recording=self._open_recording(),
+            fallback_rules=(
+                FallbackRuleEngine.load(*self.config.fallback_rules_paths)
+                if self.config.fallback_rules_paths
+                else None
+            ),
+            name_index=(
+                ClassNameIndex.open(self.config.name_index_path)
+                if self.config.name_index_path
+                and os.path.exists(self.config.name_index_path)
+                else None
+            ),
         )
         self.generator = PlantUMLGenerator()
         self.evaluator = ConceptEvaluator()
@@ -68,6 +228,29 @@ class UMLEnhancementPipeline:
         os.makedirs(self.config.logs_dir, exist_ok=True)
         os.makedirs(self.config.reports_dir, exist_ok=True)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the naming cache database and unmap the name index."""
+        if self.llm_service.cache is not None:
+            self.llm_service.cache.close()
+            self.llm_service.cache = None
+        if self.llm_service.name_index is not None:
+            self.llm_service.name_index.close()
+            self.llm_service.name_index = None
+
+    def _open_recording(self) -> Optional[PromptRecording]:
+        """LLM record/replay file configured for this run, if any."""
+        if self.config.llm_replay_path:
+            return PromptRecording(self.config.llm_replay_path, mode="replay")
+        if self.config.llm_record_path:
+            return PromptRecording(self.config.llm_record_path, mode="record")
+        return None
+
     def _setup_logging(self):
         """Setup logging configuration."""
         log_file = os.path.join(
@@ -85,12 +268,15 @@ class UMLEnhancementPipeline:
 
         self.logger = logging.getLogger(__name__)
 
-    def run(self, input_path: str, output_path: Optional[str] = None) -> Dict:
+    def run(
+        self, input_path: Union[str, List[str]], output_path: Optional[str] = None
+    ) -> Dict:
         """
         Run the complete enhancement pipeline.
 
         Args:
-            input_path: Path to input PlantUML file
+            input_path: Path to input PlantUML file, or a list of paths whose
+                models are merged and analysed as a single context
             output_path: Path for output enhanced diagram (optional)
 
         Returns:
@@ -101,9 +287,10 @@ class UMLEnhancementPipeline:
         self.logger.info("=" * 80)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        input_paths = [input_path] if isinstance(input_path, str) else input_path
 
         if output_path is None:
-            input_name = Path(input_path).stem
+            input_name = Path(input_paths[0]).stem
             output_path = os.path.join(
                 self.config.output_dir, f"{input_name}_enhanced_{timestamp}.puml"
             )
@@ -119,6 +306,8 @@ class UMLEnhancementPipeline:
         self.logger.info("Step 1: Parsing PlantUML diagram...")
         parsed_data = self._step_parse(input_path)
         results["steps"]["parsing"] = {
+            "input_files": len(input_paths),
+            "parsed_files": len(self.parser.include_cache),
             "classes_count": len(parsed_data["classes"]),
             "relationships_count": len(parsed_data["relationships"]),
         }
@@ -130,30 +319,55 @@ class UMLEnhancementPipeline:
         # Step 2: Build Knowledge Graph
         self.logger.info("Step 2: Building knowledge graph...")
         kg = self._step_build_knowledge_graph(parsed_data)
-        kg_output = os.path.join(
-            self.config.output_dir, f"knowledge_graph_{timestamp}.json"
-        )
-        self._export_knowledge_graph(kg, kg_output)
+        kg_output = self._step_export_knowledge_graph(timestamp)
         results["steps"]["knowledge_graph"] = {
             "nodes_count": kg.number_of_nodes(),
             "edges_count": kg.number_of_edges(),
             "output_file": kg_output,
         }
         self.logger.info(f"  - Created graph with {kg.number_of_nodes()} nodes")
-        self.logger.info(f"  - Saved to {kg_output}")
+        if kg_output:
+            self.logger.info(f"  - Saved to {kg_output}")
+        if self.config.kg_export_rdf:
+            rdf_output = self.knowledge_graph.export_rdf(
+                os.path.join(self.config.output_dir, f"knowledge_graph_{timestamp}.nt")
+            )
+            results["steps"]["knowledge_graph"]["rdf_file"] = rdf_output
+            self.logger.info(f"  - RDF saved to {rdf_output}")
+        if self.config.kg_store_path:
+            with KnowledgeGraphStore(self.config.kg_store_path) as store:
+                run_id = store.save(self.knowledge_graph, source=", ".join(input_paths))
+            results["steps"]["knowledge_graph"]["store_run_id"] = run_id
+            self.logger.info(
+                f"  - Stored as run {run_id} in {self.config.kg_store_path}"
+            )
 
-        # Step 3: Export for FCA
-        self.logger.info("Step 3: Exporting formal context for FCA...")
-        fca_context = os.path.join(
-            self.config.output_dir, f"fca_context_{timestamp}.csv"
-        )
-        self.knowledge_graph.export_for_fca(fca_context)
-        results["steps"]["fca_export"] = {"context_file": fca_context}
-        self.logger.info(f"  - Exported to {fca_context}")
+        if self.config.partition_by:
+            # Steps 3-4: Export and analyse each partition independently
+            self.logger.info(
+                f"Steps 3-4: Running FCA per {self.config.partition_by} partition..."
+            )
+            partitions = self._partition_classes(parsed_data)
+            concepts, context_files = self._step_partitioned_fca(partitions, timestamp)
+            results["steps"]["fca_export"] = {
+                "partition_by": self.config.partition_by,
+                "partitions_count": len(partitions),
+                "context_files": context_files,
+            }
+            self.logger.info(f"  - Analysed {len(context_files)} partitions")
+        else:
+            # Step 3: Export for FCA
+            self.logger.info("Step 3: Exporting formal context for FCA...")
+            fca_context = os.path.join(
+                self.config.output_dir, f"fca_context_{timestamp}.csv"
+            )
+            self.knowledge_graph.export_for_fca(fca_context)
+            results["steps"]["fca_export"] = {"context_file": fca_context}
+            self.logger.info(f"  - Exported to {fca_context}")
 
-        # Step 4: FCA Analysis
-        self.logger.info("Step 4: Running FCA analysis...")
-        concepts = self._step_fca_analysis(fca_context, timestamp)
+            # Step 4: FCA Analysis
+            self.logger.info("Step 4: Running FCA analysis...")
+            concepts = self._step_fca_analysis(fca_context, timestamp)
         concepts_output = os.path.join(
             self.config.reports_dir, f"concepts_{timestamp}.json"
         )
@@ -192,7 +406,9 @@ class UMLEnhancementPipeline:
 
         # Step 7: Name Abstract Classes with LLM
         self.logger.info("Step 7: Naming abstract classes using LLM...")
+        self.llm_service.metrics.reset()
         named_classes = self._step_name_abstract_classes(abstract_classes)
+        naming_metrics = self.llm_service.metrics.summary(include_calls=True)
         abstract_output = os.path.join(
             self.config.reports_dir, f"abstract_classes_{timestamp}.json"
         )
@@ -200,7 +416,25 @@ class UMLEnhancementPipeline:
         results["steps"]["abstract_classes"] = {
             "count": len(named_classes),
             "output_file": abstract_output,
+            "naming_metrics": naming_metrics,
         }
+        if self.config.name_index_path:
+            indexed = self._step_update_name_index(parsed_data["classes"])
+            results["steps"]["abstract_classes"]["name_index"] = {
+                "path": self.config.name_index_path,
+                "classes": indexed,
+            }
+            self.logger.info(
+                f"  - Name index {self.config.name_index_path}: {indexed} classes"
+            )
+        self.logger.info(
+            f"  - {naming_metrics['calls']} LLM calls "
+            f"({naming_metrics['total_tokens']} tokens, "
+            f"p50 {naming_metrics['latency_p50']:.2f}s, "
+            f"p95 {naming_metrics['latency_p95']:.2f}s), "
+            f"{naming_metrics['cache_hits']} cache hits, "
+            f"{naming_metrics['fallbacks']} fallback names"
+        )
         for ac in named_classes:
             self.logger.info(f"  - {ac.suggested_name}: {', '.join(ac.extent)}")
 
@@ -237,7 +471,9 @@ class UMLEnhancementPipeline:
         # Step 10: Generate Report
         self.logger.info("Step 10: Generating comparison report...")
         report_path = os.path.join(self.config.reports_dir, f"report_{timestamp}.md")
-        self.generator.generate_comparison_report(input_path, output_path, report_path)
+        self.generator.generate_comparison_report(
+            ", ".join(input_paths), output_path, report_path
+        )
         results["steps"]["report"] = {"output_file": report_path}
         self.logger.info(f"  - Saved report to {report_path}")
 
@@ -255,11 +491,14 @@ class UMLEnhancementPipeline:
 
         return results
 
-    def _step_parse(self, input_path: str) -> Dict:
-        """Step 1: Parse PlantUML diagram."""
-        with open(input_path, "r") as f:
-            content = f.read()
-        return self.parser.parse(content)
+    def _step_parse(self, input_path: Union[str, List[str]]) -> Dict:
+        """Step 1: Parse PlantUML diagram(s), resolving !include directives."""
+        input_paths = [input_path] if isinstance(input_path, str) else input_path
+
+        # Fresh include cache per run: shared fragments are parsed once per run
+        # but edits between runs are always picked up
+        self.parser.include_cache = {}
+        return self.parser.parse_files(input_paths)
 
     def _step_build_knowledge_graph(self, parsed_data: Dict):
         """Step 2: Build knowledge graph."""
@@ -267,6 +506,25 @@ class UMLEnhancementPipeline:
             parsed_data["classes"], parsed_data["relationships"]
         )
 
+    def _step_export_knowledge_graph(self, timestamp: str) -> Optional[str]:
+        """Export the knowledge graph in the configured format."""
+        export_format = self.config.kg_export_format
+        if export_format == "none":
+            return None
+
+        base = os.path.join(self.config.output_dir, f"knowledge_graph_{timestamp}")
+        if export_format == "node-link":
+            output_path = f"{base}.json"
+            self._export_knowledge_graph(self.knowledge_graph.graph, output_path)
+            return output_path
+
+        output_path = f"{base}.jsonl"
+        if self.config.kg_export_compress:
+            output_path += ".gz"
+        return self.knowledge_graph.export_stream(
+            output_path, compress=self.config.kg_export_compress
+        )
+
     def _export_knowledge_graph(self, kg, output_path: str):
         """Export knowledge graph to JSON."""
         import networkx as nx
@@ -281,6 +539,81 @@ class UMLEnhancementPipeline:
         output_dir = os.path.join(self.config.output_dir, f"fca_{timestamp}")
         return self.fca_analyzer.analyze(context_file, output_dir)
 
+    def _partition_classes(self, parsed_data: Dict) -> Dict[str, List[str]]:
+        """
+        Split the parsed classes into independent FCA partitions.
+
+        Returns:
+            Mapping of partition label to the class names it contains
+        """
+        classes = parsed_data["classes"]
+
+        if self.config.partition_by == "package":
+            partitions: Dict[str, List[str]] = {}
+            for class_name, uml_class in classes.items():
+                partitions.setdefault(uml_class.package or "", []).append(class_name)
+            return partitions
+
+        options = {}
+        if self.config.partition_feature_sharing is not None:
+            options["feature_sharing"] = self.config.partition_feature_sharing
+        if self.config.partition_by == "community":
+            groups, prefix = self.knowledge_graph.communities(**options), "community"
+        else:
+            groups = self.knowledge_graph.connected_components(**options)
+            prefix = "component"
+
+        # Classes without relationships would each form a partition too small
+        # to yield concepts, so they are analysed together
+        partitions = {}
+        isolated = []
+        for members in groups:
+            if len(members) == 1:
+                isolated.extend(members)
+            else:
+                partitions[f"{prefix}_{len(partitions) + 1}"] = members
+        if isolated:
+            partitions["isolated"] = isolated
+        return partitions
+
+    def _step_partitioned_fca(self, partitions: Dict[str, List[str]], timestamp: str):
+        """Steps 3-4: Export and analyse each partition, then merge the concepts."""
+        output_dir = os.path.join(self.config.output_dir, f"fca_{timestamp}")
+
+        # Partitions with fewer than two classes cannot produce abstractions
+        jobs = [
+            (f"p{index}", f"partition_{index}", class_names)
+            for index, class_names in enumerate(partitions.values(), start=1)
+            if len(class_names) >= 2
+        ]
+        if self.config.fca_hubs:
+            # Classes linked across partitions get one more, joint analysis;
+            # duplicate concepts are dropped when merging
+            hubs = self.knowledge_graph.boundary_classes(list(partitions.values()))
+            self.logger.info(f"  - {len(hubs)} cross-partition hub classes")
+            if len(hubs) >= 2:
+                jobs.append(("hubs", "partition_hubs", hubs))
+
+        def analyze(job):
+            suffix, directory, class_names = job
+            context_file = os.path.join(
+                self.config.output_dir, f"fca_context_{timestamp}_{suffix}.csv"
+            )
+            self.knowledge_graph.export_for_fca(context_file, classes=class_names)
+            analyzer = FCAAnalyzer(fca4j_path=self.config.fca4j_path)
+            concepts = analyzer.analyze(
+                context_file, os.path.join(output_dir, directory)
+            )
+            return context_file, concepts
+
+        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+            outcomes = list(executor.map(analyze, jobs))
+
+        concepts = self.fca_analyzer.merge_concepts(
+            [concepts for _, concepts in outcomes]
+        )
+        return concepts, [context_file for context_file, _ in outcomes]
+
     def _step_create_abstract_classes(self, concepts):
         """Step 6: Create abstract classes from concepts."""
         abstract_classes = []
@@ -300,24 +633,24 @@ class UMLEnhancementPipeline:
         If a class has ALL attributes/methods of an abstract class (plus possibly more),
         it should inherit from that abstract class.
         """
+        # Features are normalized keys, so each class's feature set is built
+        # once and subsumption is a set inclusion test
+        class_features = {
+            class_name: set(uml_class.attributes) | set(uml_class.methods)
+            for class_name, uml_class in all_classes.items()
+        }
+
         for abstract_class in abstract_classes:
             abstract_intent = set(abstract_class.intent)
             current_extent = set(abstract_class.extent)
 
             # Check all classes
-            for class_name, uml_class in all_classes.items():
+            for class_name, features in class_features.items():
                 if class_name in current_extent:
                     continue  # Already in extent
 
-                # Get all features of this class
-                class_features = set()
-                for attr in uml_class.attributes:
-                    class_features.add(attr)
-                for method in uml_class.methods:
-                    class_features.add(method)
-
                 # If class has ALL features of the abstract class, add it to extent
-                if abstract_intent.issubset(class_features):
+                if abstract_intent.issubset(features):
                     abstract_class.extent.append(class_name)
 
         return abstract_classes
@@ -326,6 +659,22 @@ class UMLEnhancementPipeline:
         """Step 7: Name abstract classes."""
         return self.llm_service.batch_name_abstract_classes(abstract_classes)
 
+    def _step_update_name_index(self, classes) -> int:
+        """Add the model's classes to the name index and reopen it."""
+        current = self.llm_service.name_index
+        builder = (
+            ClassNameIndexBuilder.from_index(current)
+            if current is not None
+            else ClassNameIndexBuilder()
+        )
+        builder.add_classes(classes)
+        builder.save(self.config.name_index_path)
+
+        self.llm_service.name_index = ClassNameIndex.open(self.config.name_index_path)
+        if current is not None:
+            current.close()
+        return len(builder)
+
     def _step_generate_diagram(
         self, classes, relationships, abstract_classes, output_path
     ):
@@ -0,0 +1,240 @@
+"""MinHash/LSH similarity index over the feature sets of knowledge graph classes."""
+
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+# Mersenne prime modulus of the universal hash family; keeps a * x + b
+# within 64 bits for 31-bit feature hashes
+_PRIME = (1 << 31) - 1
+
+# Maximum number of (class, feature) incidences hashed at once
+_CHUNK = 1 << 16
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("NumPy package not installed. Run: pip install numpy")
+    return np
+
+
+class MinHashIndex:
+    """
+    Approximate Jaccard similarity between classes.
+
+    Each class is summarized by a MinHash signature of its feature set; the
+    signatures are cut into bands and classes whose signatures agree on a
+    whole band land in the same bucket. Candidate pairs are the classes
+    sharing at least one bucket, which avoids comparing every pair. With
+    the defaults (128 permutations, 32 bands of 4 rows) pairs above a
+    Jaccard similarity of about 0.4 are very likely to be candidates.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_perm: Signature length (number of hash permutations)
+            bands: Number of LSH bands; must divide num_perm
+            seed: Seed of the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError(
+                f"bands ({bands}) must divide num_perm ({num_perm}) evenly"
+            )
+
+        np = _numpy()
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        # Random multipliers folding the rows of a band into one bucket key
+        self._fold = rng.integers(1, 1 << 63, size=self.rows, dtype=np.uint64)
+
+        self.classes: List[str] = []
+        self.class_index: Dict[str, int] = {}
+        self.signatures = None
+        self._bucket_keys = None
+        self._bucket_order = None
+        self._sorted_keys = None
+
+    @classmethod
+    def from_knowledge_graph(
+        cls, kg, classes: Optional[List[str]] = None, **kwargs
+    ) -> "MinHashIndex":
+        """
+        Build an index from the class x feature incidence of a knowledge graph.
+
+        Args:
+            kg: KnowledgeGraph built with either backend
+            classes: Restrict to these classes; all declared classes if omitted
+            **kwargs: Passed to MinHashIndex (num_perm, bands, seed)
+
+        Returns:
+            The populated index
+        """
+        matrix, class_labels, feature_labels = kg.incidence_matrix(
+            layout="csr", classes=classes
+        )
+        index = cls(**kwargs)
+        index.build(class_labels, feature_labels, matrix.indptr, matrix.indices)
+        return index
+
+    def build(self, classes: List[str], features: List[str], indptr, indices):
+        """
+        Compute signatures and LSH buckets from a CSR incidence.
+
+        The features of classes[i] are features[indices[indptr[i]:indptr[i + 1]]].
+        Features are hashed by name (CRC32), so signatures built from
+        different graphs are comparable.
+
+        Args:
+            classes: Class labels (rows)
+            features: Feature labels (columns)
+            indptr: CSR row pointer
+            indices: CSR column indices
+        """
+        np = _numpy()
+        self.classes = list(classes)
+        self.class_index = {name: i for i, name in enumerate(self.classes)}
+
+        feature_hashes = np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) & _PRIME for f in features),
+            dtype=np.uint64,
+            count=len(features),
+        )
+        indptr = np.asarray(indptr, dtype=np.int64)
+        values = feature_hashes[np.asarray(indices, dtype=np.int64)]
+
+        # Empty classes keep the sentinel signature and are never candidates
+        signatures = np.full((len(self.classes), self.num_perm), _PRIME, np.uint64)
+        sizes = np.diff(indptr)
+        rows = np.flatnonzero(sizes)
+
+        # Hash the incidences a block of whole rows at a time and take the
+        # per-row minimum of every permutation with reduceat
+        start = 0
+        while start < len(rows):
+            stop = start + 1
+            budget = sizes[rows[start]]
+            while stop < len(rows) and budget + sizes[rows[stop]] <= _CHUNK:
+                budget += sizes[rows[stop]]
+                stop += 1
+            block = rows[start:stop]
+            lo, hi = indptr[block[0]], indptr[block[-1] + 1]
+            hashed = (self._a * values[lo:hi] + self._b) % _PRIME
+            signatures[block] = np.minimum.reduceat(
+                hashed, indptr[block] - lo, axis=1
+            ).T
+            start = stop
+
+        self.signatures = signatures
+        self._index_bands(sizes > 0)
+
+    def _index_bands(self, non_empty):
+        """Fold each band into a bucket key and sort classes by key per band."""
+        np = _numpy()
+        banded = self.signatures.reshape(len(self.classes), self.bands, self.rows)
+        # Multiply-and-add with uint64 wrap-around: a cheap hash of the band
+        keys = (banded * self._fold).sum(axis=2, dtype=np.uint64)
+        # Give empty classes unique keys so they never share a bucket
+        empty = np.flatnonzero(~non_empty)
+        keys[empty] = np.arange(len(empty), dtype=np.uint64)[:, None] | (
+            np.uint64(1) << np.uint64(63)
+        )
+
+        self._bucket_keys = keys
+        self._bucket_order = np.argsort(keys, axis=0, kind="stable")
+        self._sorted_keys = np.take_along_axis(keys, self._bucket_order, axis=0)
+
+    def similarity(self, first: str, second: str) -> float:
+        """Estimated Jaccard similarity of two indexed classes."""
+        i, j = self.class_index[first], self.class_index[second]
+        return float((self.signatures[i] == self.signatures[j]).mean())
+
+    def query(self, class_name: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the classes most similar to an indexed class.
+
+        Only classes sharing an LSH bucket with it are scored.
+
+        Args:
+            class_name: Indexed class
+            top_k: Maximum number of results
+
+        Returns:
+            (class name, estimated Jaccard similarity) tuples, most similar
+            first
+        """
+        np = _numpy()
+        i = self.class_index[class_name]
+
+        candidates = []
+        for band in range(self.bands):
+            column = self._sorted_keys[:, band]
+            key = self._bucket_keys[i, band]
+            lo = np.searchsorted(column, key, side="left")
+            hi = np.searchsorted(column, key, side="right")
+            candidates.append(self._bucket_order[lo:hi, band])
+        candidates = np.unique(np.concatenate(candidates))
+        candidates = candidates[candidates != i]
+        if not len(candidates):
+            return []
+
+        scores = (self.signatures[candidates] == self.signatures[i]).mean(axis=1)
+        ranked = np.lexsort((candidates, -scores))[:top_k]
+        return [(self.classes[candidates[k]], float(scores[k])) for k in ranked]
+
+    def candidate_pairs(self, threshold: float = 0.0) -> List[Tuple[str, str, float]]:
+        """
+        All pairs of classes sharing at least one LSH bucket.
+
+        Args:
+            threshold: Drop pairs whose estimated similarity is below it
+
+        Returns:
+            (class, class, estimated Jaccard similarity) tuples, most similar
+            first
+        """
+        np = _numpy()
+        n = len(self.classes)
+        pair_codes = []
+
+        for band in range(self.bands):
+            column = self._sorted_keys[:, band]
+            order = self._bucket_order[:, band]
+            # Classes of a bucket are adjacent in key order: pair each class
+            # with the one `offset` positions later while the keys still match
+            offset = 1
+            while offset < n:
+                same = np.flatnonzero(column[:-offset] == column[offset:])
+                if not len(same):
+                    break
+                first, second = order[same], order[same + offset]
+                pair_codes.append(
+                    np.minimum(first, second) * n + np.maximum(first, second)
+                )
+                offset += 1
+
+        if not pair_codes:
+            return []
+
+        # Pairs found in several bands are deduplicated by sorting their codes
+        codes = np.concatenate(pair_codes)
+        codes.sort()
+        codes = codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+        first, second = codes // n, codes % n
+        scores = (self.signatures[first] == self.signatures[second]).mean(axis=1)
+        keep = scores >= threshold
+        first, second, scores = first[keep], second[keep], scores[keep]
+
+        ranked = np.argsort(-scores, kind="stable")
+        return [
+            (self.classes[first[k]], self.classes[second[k]], float(scores[k]))
+            for k in ranked
+        ]
@@ -146,3 +146,19 @@ class TestFCAAnalyzer:
         assert isinstance(concepts, list)
         assert len(concepts) > 0
         assert all(isinstance(c, FormalConcept) for c in concepts)
+
+    def test_merge_concepts_deduplicates(self):
+        """Test that concepts found by several analyses are merged once."""
+        analyzer = FCAAnalyzer()
+
+        merged = analyzer.merge_concepts(
+            [
+                [FormalConcept(extent={"A", "B"}, intent={"x"})],
+                [
+                    FormalConcept(extent={"B", "A"}, intent={"x"}),
+                    FormalConcept(extent={"C", "D"}, intent={"y"}),
+                ],
+            ]
+        )
+
+        assert [c.extent for c in merged] == [{"A", "B"}, {"C", "D"}]
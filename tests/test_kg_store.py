@@ -0,0 +1,92 @@
+"""Unit tests for the knowledge graph store."""
+
+import pytest
+from src.kg_store import KnowledgeGraphStore
+from src.knowledge_graph import KnowledgeGraph
+from src.parser import UMLClass
+
+
+@pytest.mark.unit
+class TestKnowledgeGraphStore:
+    """Test suite for the SQLite knowledge graph store."""
+
+    @pytest.fixture
+    def store(self):
+        with KnowledgeGraphStore() as store:
+            yield store
+
+    def test_save_and_load_roundtrip(
+        self, store, sample_uml_classes, sample_uml_relationships
+    ):
+        """Test that a loaded run matches the saved graph."""
+        kg = KnowledgeGraph()
+        kg.from_uml_model(sample_uml_classes, sample_uml_relationships)
+
+        run_id = store.save(kg, source="animals.puml")
+        loaded = store.load(run_id)
+
+        assert store.runs()[0]["source"] == "animals.puml"
+        assert loaded._class_feature_sets() == kg._class_feature_sets()
+        assert dict(loaded.iter_classes())["Dog"]["attributes"] == (
+            sample_uml_classes["Dog"].attributes
+        )
+        assert [(s, t) for s, t, _ in loaded.iter_relationships()] == [
+            (s, t) for s, t, _ in kg.iter_relationships()
+        ]
+
+    def test_classes_with_feature_across_runs(self, store, sample_uml_classes):
+        """Test querying the classes sharing a feature in every run."""
+        kg = KnowledgeGraph(backend="compact")
+        kg.from_uml_model(sample_uml_classes, [])
+        first = store.save(kg)
+
+        kg = KnowledgeGraph()
+        kg.from_uml_model(
+            {"Robot": UMLClass("Robot", ["+name: String"], ["+beep()"])}, []
+        )
+        second = store.save(kg)
+
+        assert store.classes_with_feature("name") == [
+            (first, "Cat"),
+            (first, "Dog"),
+            (second, "Robot"),
+        ]
+        assert store.classes_with_feature("+bark()") == [(first, "Dog")]
+        assert store.classes_with_feature("name", run_id=second) == [(second, "Robot")]
+
+    def test_load_subgraph(self, store, sample_uml_classes, sample_uml_relationships):
+        """Test lazily loading only some classes of a run."""
+        kg = KnowledgeGraph()
+        kg.from_uml_model(sample_uml_classes, sample_uml_relationships)
+        run_id = store.save(kg)
+
+        partial = store.load(run_id, classes=["Dog"], backend="compact")
+
+        assert list(partial._class_feature_sets()) == ["Dog"]
+        assert [(s, t) for s, t, _ in partial.iter_relationships()] == [
+            ("Dog", "Animal")
+        ]
+
+    def test_rolled_back_save_does_not_cache_features(
+        self, store, sample_uml_classes, monkeypatch
+    ):
+        """Test that a failed save leaves the store usable for the next one."""
+        kg = KnowledgeGraph()
+        kg.from_uml_model(sample_uml_classes, [])
+
+        def failing_relationships(*args, **kwargs):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(kg, "iter_relationships", failing_relationships)
+        with pytest.raises(RuntimeError):
+            store.save(kg)
+        assert store.runs() == []
+        monkeypatch.undo()
+
+        run_id = store.save(kg)
+        assert store.load(run_id)._class_feature_sets() == kg._class_feature_sets()
+        assert store.classes_with_feature("+name: String", run_id) == [
+            (run_id, name)
+            for name, uml_class in sorted(sample_uml_classes.items())
+            if "+name: String" in uml_class.attributes
+        ]
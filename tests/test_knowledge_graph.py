@@ -93,3 +93,458 @@ class TestKnowledgeGraph:
         features = kg.get_class_features("NonExistent")
 
         assert features == {}
+
+    def test_export_for_fca_matches_normalized_members(self, temp_output_dir):
+        """Test that differently spaced members become one FCA column."""
+        import csv
+        import os
+        from src.parser import PlantUMLParser
+
+        parsed = PlantUMLParser().parse(
+            "class A {\n  + email : String\n}\nclass B {\n  +email: String\n}"
+        )
+        kg = KnowledgeGraph()
+        kg.from_uml_model(parsed["classes"], parsed["relationships"])
+
+        output_path = os.path.join(temp_output_dir, "context.csv")
+        kg.export_for_fca(output_path)
+
+        with open(output_path, newline="") as f:
+            rows = list(csv.reader(f))
+
+        assert rows[0] == ["", "+email: String"]
+        assert rows[1:] == [["A", "X"], ["B", "X"]]
+
+    def test_invalid_backend(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError, match="Unknown knowledge graph backend"):
+            KnowledgeGraph(backend="graphdb")
+
+    def test_compact_backend_structure(
+        self, sample_uml_classes, sample_uml_relationships
+    ):
+        """Test the integer-indexed storage of the compact backend."""
+        kg = KnowledgeGraph(backend="compact")
+        compact = kg.from_uml_model(sample_uml_classes, sample_uml_relationships)
+
+        # Dog, Cat plus Animal (only referenced by relationships)
+        assert compact.class_names == ["Dog", "Cat", "Animal"]
+        assert compact.declared_classes() == ["Dog", "Cat"]
+        # Shared members are stored once
+        assert len(compact.feature_keys) == 5
+        assert compact.class_members("Cat", "attribute") == [
+            "+name: String",
+            "+age: int",
+        ]
+        assert list(compact.edges["inheritance"]["source"]) == [0, 1]
+        assert compact.number_of_nodes() == 8
+        assert compact.number_of_edges() == 10
+
+    def test_compact_backend_networkx_view(
+        self, sample_uml_classes, sample_uml_relationships
+    ):
+        """Test that the NetworkX view is materialized on demand."""
+        kg = KnowledgeGraph(backend="compact")
+        kg.from_uml_model(sample_uml_classes, sample_uml_relationships)
+
+        graph = kg.graph
+
+        assert isinstance(graph, nx.DiGraph)
+        assert graph.nodes["Dog"]["type"] == "class"
+        assert graph.has_edge("Dog", "attribute:+name: String")
+        assert graph.has_edge("Cat", "attribute:+name: String")
+        assert graph.edges["Dog", "Animal"]["relation"] == "inheritance"
+
+    def test_compact_backend_matches_networkx(
+        self, sample_uml_classes, sample_uml_relationships, temp_output_dir
+    ):
+        """Test that both backends export the same context and features."""
+        import os
+
+        outputs = []
+        for backend in ("networkx", "compact"):
+            kg = KnowledgeGraph(backend=backend)
+            kg.from_uml_model(sample_uml_classes, sample_uml_relationships)
+            path = os.path.join(temp_output_dir, f"{backend}.csv")
+            kg.export_for_fca(path)
+            with open(path) as f:
+                outputs.append((f.read(), kg.get_class_features("Dog")))
+
+        assert outputs[0] == outputs[1]
+
+    def test_shared_feature_nodes(self, sample_uml_classes, temp_output_dir):
+        """Test that each distinct feature becomes a single node."""
+        import os
+
+        kg = KnowledgeGraph(shared_features=True)
+        graph = kg.from_uml_model(sample_uml_classes, [])
+
+        feature_nodes = [
+            n for n, d in graph.nodes(data=True) if d.get("type") != "class"
+        ]
+        # +name, +age, +eat() shared by Dog and Cat; +bark() and +meow()
+        assert len(feature_nodes) == 5
+        assert set(graph.predecessors("attribute:+name: String")) == {"Dog", "Cat"}
+        assert graph.edges["Dog", "method:+eat()"]["relation"] == "has_method"
+
+        per_occurrence = KnowledgeGraph()
+        per_occurrence.from_uml_model(sample_uml_classes, [])
+        paths = []
+        for name, graph_kg in (("shared", kg), ("occurrence", per_occurrence)):
+            paths.append(os.path.join(temp_output_dir, f"{name}.csv"))
+            graph_kg.export_for_fca(paths[-1])
+        with open(paths[0]) as shared, open(paths[1]) as occurrence:
+            assert shared.read() == occurrence.read()
+
+    def test_incidence_matrix_csr(self, sample_uml_classes):
+        """Test exporting the class x feature incidence as a CSR matrix."""
+        pytest.importorskip("scipy")
+
+        kg = KnowledgeGraph()
+        kg.from_uml_model(sample_uml_classes, [])
+
+        matrix, classes, features = kg.incidence_matrix()
+
+        assert classes == ["Cat", "Dog"]
+        assert features == sorted(features)
+        assert matrix.shape == (2, 5)
+        dense = matrix.toarray()
+        assert dense[classes.index("Dog"), features.index("+bark()")] == 1
+        assert dense[classes.index("Cat"), features.index("+bark()")] == 0
+        # +name, +age and +eat() are shared
+        assert int((matrix @ matrix.T)[0, 1]) == 3
+
+    def test_incidence_matrix_packed(self, sample_uml_classes):
+        """Test the packed-bit incidence matrix against the CSR one."""
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("scipy")
+
+        kg = KnowledgeGraph(backend="compact")
+        kg.from_uml_model(sample_uml_classes, [])
+
+        packed, classes, features = kg.incidence_matrix(layout="packed")
+        csr, _, _ = kg.incidence_matrix(layout="csr")
+
+        assert packed.dtype == np.uint8
+        unpacked = np.unpackbits(packed, axis=1)[:, : len(features)]
+        assert (unpacked == csr.toarray()).all()
+
+    def test_incidence_matrix_unknown_layout(self):
+        """Test that unknown matrix layouts are rejected."""
+        with pytest.raises(ValueError, match="Unknown incidence matrix layout"):
+            KnowledgeGraph().incidence_matrix(layout="coo")
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_export_stream(
+        self, backend, sample_uml_classes, sample_uml_relationships, temp_output_dir
+    ):
+        """Test streaming the graph as ndjson, plain and gzipped."""
+        import gzip
+        import json
+        import os
+
+        kg = KnowledgeGraph(backend=backend, shared_features=True)
+        kg.from_uml_model(sample_uml_classes, sample_uml_relationships)
+
+        plain = kg.export_stream(os.path.join(temp_output_dir, "kg.jsonl"))
+        packed = kg.export_stream(
+            os.path.join(temp_output_dir, "kg.jsonl.gz"), compress=True
+        )
+
+        with open(plain) as f:
+            lines = f.read().splitlines()
+        with gzip.open(packed, "rt") as f:
+            assert f.read().splitlines() == lines
+
+        records = [json.loads(line) for line in lines]
+        nodes = {r["node"]: r for r in records if "node" in r}
+        edges = {tuple(r["edge"]): r for r in records if "edge" in r}
+        # Compact view was never materialized
+        assert kg._graph_is_view is False
+        assert len(nodes) == kg.graph.number_of_nodes()
+        assert len(edges) == kg.graph.number_of_edges()
+        assert nodes["Dog"]["type"] == "class"
+        assert edges[("Dog", "Animal")]["relation"] == "inheritance"
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_export_rdf(self, backend, sample_uml_classes, temp_output_dir):
+        """Test that the streamed N-Triples match the rdflib graph."""
+        import os
+
+        rdflib = pytest.importorskip("rdflib")
+        from src.parser import UMLRelationship
+
+        relationships = [
+            UMLRelationship(
+                source="Dog",
+                target="Cat",
+                relationship_type="association",
+                cardinality_source="1",
+                cardinality_target="0..*",
+                label='chases "fast"',
+            )
+        ]
+        kg = KnowledgeGraph(backend=backend)
+        kg.from_uml_model(sample_uml_classes, relationships)
+
+        streamed = kg.export_rdf(os.path.join(temp_output_dir, "kg.nt"))
+        built = kg.export_rdf(
+            os.path.join(temp_output_dir, "built.nt"), build_graph=True
+        )
+
+        graph = rdflib.Graph().parse(streamed, format="nt")
+        assert set(graph) == set(rdflib.Graph().parse(built, format="nt"))
+
+        vocab = rdflib.Namespace("http://uml-enhancing-tool.org/kg/vocab#")
+        assert len(set(graph.subjects(rdflib.RDF.type, vocab.Attribute))) == 2
+        (relationship,) = graph.subjects(rdflib.RDF.type, vocab.Relationship)
+        assert str(graph.value(relationship, vocab.cardinalityTarget)) == "0..*"
+        assert str(graph.value(relationship, vocab.label)) == 'chases "fast"'
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_relationship_indexes(self, backend, sample_uml_classes):
+        """Test indexed outgoing and incoming relationship lookups."""
+        from src.parser import UMLRelationship
+
+        relationships = [
+            UMLRelationship("Dog", "Animal", "inheritance"),
+            UMLRelationship("Cat", "Animal", "inheritance"),
+            UMLRelationship("Dog", "Cat", "association", "1", "*", "chases"),
+        ]
+        kg = KnowledgeGraph(backend=backend)
+        kg.from_uml_model(sample_uml_classes, relationships)
+
+        assert sorted(c for c, _ in kg.neighbors("Animal", direction="in")) == [
+            "Cat",
+            "Dog",
+        ]
+        assert [c for c, _ in kg.neighbors("Dog", relation="association")] == ["Cat"]
+        assert kg.neighbors("Dog", relation="composition") == []
+
+        features = kg.get_features_for(["Cat", "Dog", "Missing"])
+        assert set(features) == {"Cat", "Dog"}
+        assert features["Cat"]["incoming_relationships"] == [
+            {"source": "Dog", "type": "association", "cardinality": "1"}
+        ]
+        assert {r["target"] for r in features["Dog"]["relationships"]} == {
+            "Animal",
+            "Cat",
+        }
+
+        with pytest.raises(ValueError, match="Unknown direction"):
+            kg.neighbors("Dog", direction="both")
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_duplicate_relationship_indexed_once(self, backend, sample_uml_classes):
+        """Test that a repeated relationship is indexed like its single edge."""
+        relationships = [
+            UMLRelationship("Dog", "Cat", "association", "1", "*", "chases"),
+            UMLRelationship("Dog", "Cat", "association", "1", "*", "chases"),
+        ]
+        kg = KnowledgeGraph(backend=backend)
+        kg.from_uml_model(sample_uml_classes, relationships)
+
+        assert kg.graph.number_of_edges("Dog", "Cat") == 1
+        assert len(list(kg.iter_relationships())) == 1
+        assert [c for c, _ in kg.neighbors("Dog")] == ["Cat"]
+        assert [c for c, _ in kg.neighbors("Cat", direction="in")] == ["Dog"]
+        assert kg.get_class_features("Cat")["incoming_relationships"] == [
+            {"source": "Dog", "type": "association", "cardinality": "1"}
+        ]
+
+    def test_backends_agree_on_duplicate_relationships(self, sample_uml_classes):
+        """Test that both backends collapse repeated relationships the same way."""
+        relationships = [
+            UMLRelationship("Dog", "Animal", "inheritance"),
+            UMLRelationship("Dog", "Animal", "inheritance"),
+            UMLRelationship("Cat", "Animal", "inheritance"),
+            UMLRelationship("Dog", "Cat", "association", "1", "*", "chases"),
+            UMLRelationship("Dog", "Cat", "association", "1", "*", "chases"),
+            UMLRelationship("Dog", "Cat", "association", "1", "*", "chases"),
+        ]
+        views = []
+        for backend in ("networkx", "compact"):
+            kg = KnowledgeGraph(backend=backend)
+            kg.from_uml_model(sample_uml_classes, relationships)
+            views.append(
+                (
+                    sorted(
+                        (s, t, d["relation"], d["label"])
+                        for s, t, d in kg.iter_relationships()
+                    ),
+                    {
+                        (name, direction): sorted(
+                            (c, d["relation"])
+                            for c, d in kg.neighbors(name, direction=direction)
+                        )
+                        for name in ("Animal", "Cat", "Dog")
+                        for direction in ("out", "in")
+                    },
+                )
+            )
+
+        assert views[0] == views[1]
+        assert len(views[0][0]) == 3
+
+    def test_remove_relationship_cleans_both_indexes(self, sample_uml_classes):
+        """Test that removal clears one index even if the other lacks the entry."""
+        chases = UMLRelationship("Dog", "Cat", "association", "1", "*", "chases")
+        kg = KnowledgeGraph()
+        kg.from_uml_model(sample_uml_classes, [chases])
+        # Outgoing entry already gone: the incoming one must still be removed
+        del kg._adjacency["out"]["Dog"]
+
+        kg.apply_diff({}, [], {}, {"removed": [chases]})
+
+        assert kg.neighbors("Cat", direction="in") == []
+        assert not kg.graph.has_edge("Dog", "Cat")
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_partitions(self, backend):
+        """Test components, communities and cross-partition hubs."""
+        from src.parser import UMLRelationship
+
+        classes = {
+            name: UMLClass(name, attributes, [])
+            for name, attributes in {
+                "A1": ["+a: int", "+id: int"],
+                "A2": ["+a: int", "+id: int"],
+                "A3": ["+a: int", "+id: int"],
+                "B1": ["+b: int", "+id: int"],
+                "B2": ["+b: int", "+id: int"],
+                "C": ["+id: int"],
+            }.items()
+        }
+        relationships = [
+            UMLRelationship("A1", "A2", "association"),
+            UMLRelationship("A1", "A3", "association"),
+            UMLRelationship("B1", "B2", "association"),
+            UMLRelationship("A3", "B1", "association"),
+        ]
+        kg = KnowledgeGraph(backend=backend)
+        kg.from_uml_model(classes, relationships)
+
+        assert kg.connected_components() == [["A1", "A2", "A3", "B1", "B2"], ["C"]]
+        # +id is declared by every class: ignored above the degree cap
+        assert kg.connected_components(feature_sharing=True, max_feature_degree=3) == [
+            ["A1", "A2", "A3", "B1", "B2"],
+            ["C"],
+        ]
+        assert len(kg.connected_components(feature_sharing=True)) == 1
+
+        communities = kg.communities(max_feature_degree=3)
+        assert sorted(communities) == [["A1", "A2", "A3"], ["B1", "B2"], ["C"]]
+        assert kg.communities(max_feature_degree=3) == communities
+
+        assert kg.boundary_classes(communities, max_feature_degree=3) == ["A3", "B1"]
+
+    def test_from_uml_model_replaces_graph(self, sample_uml_classes):
+        """Test that building twice does not duplicate nodes."""
+        kg = KnowledgeGraph()
+        kg.from_uml_model(sample_uml_classes, [])
+        nodes = kg.graph.number_of_nodes()
+
+        kg.from_uml_model(sample_uml_classes, [])
+
+        assert kg.graph.number_of_nodes() == nodes
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"shared_features": True}, {"backend": "compact"}],
+    )
+    def test_apply_diff_matches_rebuild(self, options):
+        """Test that applying a reparse diff equals building from scratch."""
+        from src.parser import PlantUMLParser
+
+        old_text = (
+            "class Animal {\n  +name: String\n}\n"
+            "class Dog {\n  +name: String\n  +bark()\n}\n"
+            "class Cat {\n  +name: String\n  +meow()\n}\n"
+            "Dog --> Animal\nCat --> Animal\nCat --> Dog : chases\n"
+        )
+        new_text = (
+            "class Animal {\n  +name: String\n}\n"
+            "class Dog {\n  +name: String\n  +age: int\n}\n"
+            "class Bird {\n  +name: String\n  +fly()\n}\n"
+            "Dog --> Animal\nBird --> Animal\nBird --> Cat\n"
+        )
+        parser = PlantUMLParser()
+        old = parser.parse(old_text)
+        new = parser.reparse(old, new_text)
+        changes = new["changes"]
+
+        kg = KnowledgeGraph(**options)
+        kg.from_uml_model(old["classes"], old["relationships"])
+        affected = kg.apply_diff(
+            changes["added"],
+            changes["removed"],
+            changes["modified"],
+            changes["relationships"],
+        )
+
+        fresh = KnowledgeGraph(**options)
+        fresh.from_uml_model(new["classes"], new["relationships"])
+
+        assert affected == {
+            "classes": ["Bird", "Cat", "Dog"],
+            # +name lost Cat and gained Bird
+            "features": ["+age: int", "+bark()", "+fly()", "+meow()", "+name: String"],
+        }
+        assert kg._class_feature_sets() == fresh._class_feature_sets()
+        assert sorted(
+            (s, t, d["relation"]) for s, t, d in kg.iter_relationships()
+        ) == sorted((s, t, d["relation"]) for s, t, d in fresh.iter_relationships())
+        assert sorted(c for c, _ in kg.neighbors("Animal", direction="in")) == [
+            "Bird",
+            "Dog",
+        ]
+        assert [c for c, _ in kg.neighbors("Cat", direction="in")] == ["Bird"]
+        assert kg.graph.number_of_nodes() == fresh.graph.number_of_nodes()
+        assert kg.graph.number_of_edges() == fresh.graph.number_of_edges()
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"shared_features": True}, {"backend": "compact"}],
+    )
+    def test_apply_diff_removes_one_duplicate(self, options):
+        """Test that removing one of two repeated relationships keeps the other."""
+        from src.parser import PlantUMLParser
+
+        classes = "class A {\n  +id: int\n}\nclass B\nclass C\n"
+        parser = PlantUMLParser()
+        old = parser.parse(classes + "A --> B\nB --> C\nB --> C\n")
+        new = parser.reparse(old, classes + "A --> B\nB --> C\n")
+        changes = new["changes"]
+        assert len(changes["relationships"]["removed"]) == 1
+
+        kg = KnowledgeGraph(**options)
+        kg.from_uml_model(old["classes"], old["relationships"])
+        kg.apply_diff(
+            changes["added"],
+            changes["removed"],
+            changes["modified"],
+            changes["relationships"],
+        )
+
+        fresh = KnowledgeGraph(**options)
+        fresh.from_uml_model(new["classes"], new["relationships"])
+
+        assert [c for c, _ in kg.neighbors("B")] == ["C"]
+        assert [c for c, _ in kg.neighbors("C", direction="in")] == ["B"]
+        assert sorted((s, t) for s, t, _ in kg.iter_relationships()) == sorted(
+            (s, t) for s, t, _ in fresh.iter_relationships()
+        )
+        assert kg.graph.number_of_edges() == fresh.graph.number_of_edges()
+
+        # Removing the last declaration drops the relationship
+        last = parser.reparse(new, classes + "A --> B\n")
+        changes = last["changes"]
+        kg.apply_diff(
+            changes["added"],
+            changes["removed"],
+            changes["modified"],
+            changes["relationships"],
+        )
+        assert kg.neighbors("B") == []
+        assert kg.neighbors("C", direction="in") == []
+        assert [(s, t) for s, t, _ in kg.iter_relationships()] == [("A", "B")]
@@ -2,6 +2,7 @@
 
 import pytest
 from src.llm_naming import LLMNamingService, AbstractClass
+from src.parser import parse_member
 
 
 @pytest.mark.unit
@@ -181,3 +182,458 @@ class TestLLMNamingService:
 
         assert ac.relevance_score == 75.0
         assert ac.confidence == 0.8
+
+    def test_fallback_naming_uses_member_names(self):
+        """Test that fallback naming matches member names, not raw lines."""
+        service = LLMNamingService()
+
+        ac = AbstractClass(extent=["Client", "Produit"], intent=["- id : int"])
+        result = service._fallback_naming(ac)
+        assert result.suggested_name == "AbstractIdentifiable"
+
+        ac = AbstractClass(extent=["A", "B"], intent=["+valid: boolean"])
+        result = service._fallback_naming(ac)
+        assert result.suggested_name == "AbstractValid"
+
+    def test_batch_naming_is_concurrent_and_ordered(self):
+        """Test that batch naming overlaps requests and keeps input order."""
+        import threading
+        import time
+
+        service = LLMNamingService(provider="openai", concurrency=4, dedupe=False)
+        service.client = object()
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def query(prompt, max_tokens=50):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            # Later concepts answer first
+            time.sleep(0.05 if "Class0" in prompt else 0.01)
+            with lock:
+                in_flight[0] -= 1
+            return prompt.split("Classes to be abstracted:\n")[1].split(",")[0]
+
+        service._query_openai = query
+        classes = [
+            AbstractClass(extent=[f"Class{i}", "Other"], intent=["+x: int"])
+            for i in range(8)
+        ]
+
+        named = service.batch_name_abstract_classes(classes)
+
+        assert [ac.suggested_name for ac in named] == [f"Class{i}" for i in range(8)]
+        assert 1 < peak[0] <= 4
+
+        with pytest.raises(ValueError, match="concurrency"):
+            LLMNamingService(concurrency=0)
+
+    def test_batched_naming(self):
+        """Test multi-concept prompts, validation and per-item fallback."""
+        service = LLMNamingService(
+            provider="openai", batch_size=3, concurrency=1, dedupe=False
+        )
+        service.client = object()
+        prompts = []
+
+        def query(prompt, max_tokens=50):
+            prompts.append(prompt)
+            if "C1:" in prompt:
+                # C2 is missing and C3 is not a valid name
+                return '```json\n{"C1": "Vehicle", "C3": "!!"}\n```'
+            return "Animal"
+
+        service._query_openai = query
+        classes = [
+            AbstractClass(extent=[f"A{i}", f"B{i}"], intent=["+x: int"])
+            for i in range(3)
+        ]
+
+        named = service.batch_name_abstract_classes(classes)
+
+        assert [ac.suggested_name for ac in named] == ["Vehicle", "Animal", "Animal"]
+        # One batched request, then one request for each rejected entry
+        assert len(prompts) == 3
+        assert '"C1", "C2", "C3"' in prompts[0]
+
+    def test_batched_naming_request_failure(self):
+        """Test that a failed batch request falls back for every concept."""
+        service = LLMNamingService(provider="openai", batch_size=5)
+        service.client = object()
+
+        def query(prompt, max_tokens=50):
+            raise RuntimeError("quota exceeded")
+
+        service._query_openai = query
+        classes = [
+            AbstractClass(extent=["A", "B"], intent=["+id: int"]) for _ in range(2)
+        ]
+
+        named = service.batch_name_abstract_classes(classes)
+
+        assert [ac.suggested_name for ac in named] == ["AbstractIdentifiable"] * 2
+
+    def test_split_batches(self):
+        """Test that batches respect the size and the token estimate."""
+        service = LLMNamingService(batch_size=4, max_prompt_tokens=10**6)
+        classes = [AbstractClass(extent=["A", "B"], intent=["+x: int"])] * 10
+        assert [len(b) for b in service._split_batches(classes)] == [4, 4, 2]
+
+        overhead = service._estimate_tokens(service._create_batch_prompt([]))
+        service.max_prompt_tokens = overhead + 2 * service._estimate_tokens(
+            service._describe_concept("C00", classes[0])
+        )
+        assert [len(b) for b in service._split_batches(classes)] == [2] * 5
+
+    def test_name_cache(self, temp_output_dir, monkeypatch):
+        """Test the persistent cache, its TTL, eviction and counters."""
+        import os
+        from src.llm_naming import NameCache
+
+        path = os.path.join(temp_output_dir, "names.sqlite")
+        calls = []
+
+        def query(prompt, max_tokens=50):
+            calls.append(prompt)
+            return "Entity"
+
+        service = LLMNamingService(provider="openai", cache=NameCache(path))
+        service.client = object()
+        service._query_openai = query
+        service.name_abstract_class(
+            AbstractClass(extent=["B", "A"], intent=["+name: String", "+id: int"])
+        )
+
+        # A new run (new service, same file) reuses the name, whatever the order
+        cache = NameCache(path)
+        service = LLMNamingService(provider="openai", cache=cache)
+        service.client = object()
+        service._query_openai = query
+        named = service.name_abstract_class(
+            AbstractClass(extent=["A", "B"], intent=["+id: int", "+name: String"])
+        )
+        assert named.suggested_name == "Entity"
+        assert len(calls) == 1
+        assert cache.stats() == {"hits": 1, "misses": 0, "size": 1}
+
+        # Other models do not share entries
+        assert NameCache.make_key("openai", "gpt-4o", ["A"], ["x"]) != (
+            NameCache.make_key("openai", "gpt-4o-mini", ["A"], ["x"])
+        )
+
+        clock = [1000.0]
+        monkeypatch.setattr("src.llm_naming.time.time", lambda: clock[0])
+
+        # Least recently used entries are evicted beyond max_entries
+        small = NameCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            clock[0] += 1
+            small.put(key, key.upper(), 0.9)
+        assert small.get("a") is None
+        assert small.get("c") == ("C", 0.9)
+
+        # Expired entries are misses
+        expiring = NameCache(ttl=60)
+        expiring.put("k", "Named", 0.9)
+        clock[0] += 61
+        assert expiring.get("k") is None
+        assert expiring.stats()["misses"] == 1
+
+    def test_batch_naming_deduplicates_intents(self):
+        """Test that identical and similar intents cost one request."""
+        prompts = []
+
+        def query(prompt, max_tokens=50):
+            prompts.append(prompt)
+            return f"Name{len(prompts)}"
+
+        def candidates():
+            return [
+                AbstractClass(extent=["A", "B"], intent=["+id: int", "+name: String"]),
+                AbstractClass(extent=["C", "D"], intent=["+name: String", "+id: int"]),
+                AbstractClass(
+                    extent=["E", "F"],
+                    intent=["+id: int", "+name: String", "+code: String"],
+                ),
+            ]
+
+        service = LLMNamingService(provider="openai", concurrency=1)
+        service.client = object()
+        service._query_openai = query
+        named = service.batch_name_abstract_classes(candidates())
+
+        assert [ac.suggested_name for ac in named] == ["Name1", "Name1", "Name2"]
+        assert "A, B, C, D" in prompts[0]
+
+        prompts.clear()
+        service.dedupe_threshold = 0.6
+        named = service.batch_name_abstract_classes(candidates())
+        assert [ac.suggested_name for ac in named] == ["Name1"] * 3
+        assert len(prompts) == 1
+
+    def test_transient_failures_are_retried(self, monkeypatch):
+        """Test jittered backoff retries of transient errors only."""
+        service = LLMNamingService(provider="openai", max_retries=2)
+        service.client = object()
+        sleeps = []
+        monkeypatch.setattr("src.llm_naming.time.sleep", sleeps.append)
+        outcomes = [TimeoutError("timed out"), ConnectionError("reset"), "Entity"]
+
+        def query(prompt, max_tokens=50):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        service._query_openai = query
+        named = service.name_abstract_class(
+            AbstractClass(extent=["A", "B"], intent=["+id: int"])
+        )
+
+        assert named.suggested_name == "Entity"
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[1] <= service.retry_base_delay * 2
+
+        class AuthenticationError(Exception):
+            status_code = 401
+
+        def denied(prompt, max_tokens=50):
+            raise AuthenticationError("bad key")
+
+        service._query_openai = denied
+        service.name_abstract_class(AbstractClass(extent=["A"], intent=["+id: int"]))
+        assert len(sleeps) == 2
+
+    def test_circuit_breaker_switches_to_fallback(self, monkeypatch):
+        """Test that repeated failures stop calls until the reset timeout."""
+        service = LLMNamingService(
+            provider="openai", failure_threshold=2, reset_timeout=60
+        )
+        service.client = object()
+        calls = []
+
+        def failing(prompt, max_tokens=50):
+            calls.append(prompt)
+            raise ValueError("invalid request")
+
+        service._query_openai = failing
+        for _ in range(4):
+            named = service.name_abstract_class(
+                AbstractClass(extent=["A", "B"], intent=["+id: int"])
+            )
+            assert named.suggested_name == "AbstractIdentifiable"
+
+        assert len(calls) == 2
+        assert service.circuit_breaker.state == "open"
+
+        # After the reset timeout one trial request goes through
+        clock = service.circuit_breaker.opened_at + 61
+        monkeypatch.setattr("src.llm_naming.time.monotonic", lambda: clock)
+        service._query_openai = lambda prompt, max_tokens=50: "Entity"
+        named = service.name_abstract_class(
+            AbstractClass(extent=["A", "B"], intent=["+id: int"])
+        )
+        assert named.suggested_name == "Entity"
+        assert service.circuit_breaker.state == "closed"
+
+    def test_token_bucket_limits_rate(self, monkeypatch):
+        """Test that the bucket waits for tokens to refill."""
+        from src.llm_naming import RateLimiter
+
+        clock = [0.0]
+        monkeypatch.setattr("src.llm_naming.time.monotonic", lambda: clock[0])
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        monkeypatch.setattr("src.llm_naming.time.sleep", sleep)
+
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+        waits = [limiter.acquire(100) for _ in range(8)]
+
+        # 600 tokens of burst, then 100 tokens every 10 seconds
+        assert waits[:6] == [0.0] * 6
+        assert waits[6] == pytest.approx(10.0)
+        assert clock[0] == pytest.approx(20.0)
+
+    def test_client_is_created_lazily_and_pooled(self, monkeypatch):
+        """Test that clients are built on first use and shared by services."""
+        from src.llm_naming import clear_client_pool
+
+        clear_client_pool()
+        created = []
+
+        def initialize(service):
+            created.append(service)
+            service._client = object()
+
+        monkeypatch.setattr(LLMNamingService, "_initialize_client", initialize)
+        service = LLMNamingService(provider="openai", api_key="test-key")
+        assert created == []
+
+        # Fallback-only services never build a client
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        assert LLMNamingService(provider="openai").client is None
+
+        assert service.client is service.client
+        assert len(created) == 1
+        monkeypatch.undo()
+
+        first = LLMNamingService(provider="local", base_url="http://127.0.0.1:9/v1")
+        second = LLMNamingService(provider="local", base_url="http://127.0.0.1:9/v1")
+        other = LLMNamingService(provider="local", base_url="http://127.0.0.1:8/v1")
+        assert first.client is second.client
+        assert first.client is not other.client
+        clear_client_pool()
+
+    def test_cached_batch_does_not_create_client(self, temp_output_dir, monkeypatch):
+        """Test that the SDK is not imported when every name is cached."""
+        import os
+        import sys
+        from src.llm_naming import NameCache
+
+        cache = NameCache(os.path.join(temp_output_dir, "names.sqlite"))
+        service = LLMNamingService(
+            provider="openai", api_key="test-key", cache=cache, batch_size=2
+        )
+        concepts = [
+            AbstractClass(extent=["Dog", "Cat"], intent=["+name: String"]),
+            AbstractClass(extent=["Car", "Bike"], intent=["+speed: int"]),
+            AbstractClass(extent=["User", "Admin"], intent=["+email: String"]),
+        ]
+        for ac, name in zip(concepts, ["Animal", "Vehicle", "Account"]):
+            cache.put(service._cache_key(ac), name, 0.9)
+        monkeypatch.delitem(sys.modules, "openai", raising=False)
+
+        assert service.batch_name_abstract_classes([]) == []
+        named = service.batch_name_abstract_classes(concepts)
+
+        assert [ac.suggested_name for ac in named] == ["Animal", "Vehicle", "Account"]
+        assert "openai" not in sys.modules
+        assert not service._client_resolved
+        cache.close()
+
+    def test_naming_metrics(self, monkeypatch):
+        """Test per-call metrics, usage estimates and latency percentiles."""
+        service = LLMNamingService(provider="openai", max_retries=1, dedupe=False)
+        service.client = object()
+        monkeypatch.setattr("src.llm_naming.time.sleep", lambda seconds: None)
+        outcomes = [TimeoutError("timed out"), "Entity", "Vehicle"]
+
+        def query(prompt, max_tokens=50):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            service._report_usage(100, 2)
+            return outcome
+
+        service._query_openai = query
+        service.batch_name_abstract_classes(
+            [
+                AbstractClass(extent=["A", "B"], intent=["+id: int"]),
+                AbstractClass(extent=["C", "D"], intent=["+speed: int"]),
+            ]
+        )
+        service._fallback_naming(AbstractClass(extent=["E"], intent=["+name: str"]))
+
+        summary = service.metrics.summary(include_calls=True)
+        assert summary["calls"] == 2
+        assert summary["retries"] == 1
+        assert summary["prompt_tokens"] == 200
+        assert summary["completion_tokens"] == 4
+        assert summary["estimated_usage_calls"] == 0
+        assert summary["fallbacks"] == 1
+        assert len(summary["per_call"]) == 2
+
+        service.metrics.reset()
+        for latency in (0.1, 0.2, 0.3, 0.4, 1.0):
+            service.metrics.record_call(
+                ok=True,
+                latency=latency,
+                rate_limit_wait=0.0,
+                retries=0,
+                prompt_tokens=1,
+                completion_tokens=1,
+                estimated=True,
+            )
+        summary = service.metrics.summary()
+        assert summary["latency_p50"] == pytest.approx(0.3)
+        assert summary["latency_p95"] == pytest.approx(0.88)
+        assert summary["latency_max"] == 1.0
+        assert "per_call" not in summary
+
+    @pytest.mark.parametrize(
+        "intent, expected",
+        [
+            (["+email: String", "+motDePasse: String", "+seConnecter()"], "User"),
+            (["+getUserEmail()"], "Authenticatable"),
+            (["+id: int", "+name()"], "Entity"),
+            (["+id: int"], "Identifiable"),
+            (["+id()", "+title: String"], "Titled"),
+            (["+nom: String"], "Named"),
+            (["+name()"], "Name"),
+        ],
+    )
+    def test_fallback_rule_engine(self, intent, expected):
+        """Test that the shipped rules reproduce the fallback names."""
+        from src.llm_naming import FallbackRuleEngine
+
+        engine = FallbackRuleEngine.load()
+        assert (engine.match(intent) or parse_member(intent[0]).name.title()) == (
+            expected
+        )
+
+    def test_fallback_rule_cache_is_bounded(self):
+        """Test that the engine caches the hits of a bounded number of features."""
+        from src.llm_naming import FallbackRuleEngine
+
+        engine = FallbackRuleEngine.load(cache_size=2)
+        for index in range(10):
+            assert engine.match([f"+field{index}: int"]) is None
+        assert engine.match(["+email: String"]) == "Authenticatable"
+        assert engine.match(["+email: String", "+id: int"]) == "Authenticatable"
+
+        info = engine._feature_hits.cache_info()
+        assert info.currsize == 2
+        assert info.hits == 1
+
+    def test_custom_fallback_rules(self, tmp_path):
+        """Test that custom rule files take precedence and overlap correctly."""
+        import json
+        from src.llm_naming import FallbackRuleEngine
+
+        rules = tmp_path / "rules.json"
+        rules.write_text(
+            json.dumps(
+                {
+                    "rules": [
+                        {
+                            "match": {"contains": ["log"], "scope": "members"},
+                            "names": [
+                                {
+                                    "match": {"contains": ["catalog"]},
+                                    "name": "Cataloged",
+                                },
+                                {"name": "Logged"},
+                            ],
+                        }
+                    ]
+                }
+            )
+        )
+        engine = FallbackRuleEngine.load(str(rules))
+        service = LLMNamingService(fallback_rules=engine)
+
+        # "catalog" and "log" overlap at different positions of one name
+        assert engine.match(["+catalogId: int"]) == "Cataloged"
+        # "login" also contains "log": the custom rule comes first
+        assert engine.match(["+login()"]) == "Logged"
+        assert engine.match(["+password: String"]) == "Authenticatable"
+        named = service._fallback_naming(
+            AbstractClass(extent=["A"], intent=["+blog: str"])
+        )
+        assert named.suggested_name == "AbstractLogged"
+
+        with pytest.raises(ValueError):
+            FallbackRuleEngine([{"match": {"scope": "members"}, "names": []}])
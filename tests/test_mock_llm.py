@@ -0,0 +1,158 @@
+"""Unit tests for the mock LLM server and the local naming provider."""
+
+import json
+import os
+import urllib.request
+
+import pytest
+from src.llm_naming import (
+    AbstractClass,
+    LLMNamingService,
+    PromptRecording,
+    ReplayMissError,
+)
+from src.mock_llm import MockLLMServer
+from src.pipeline import PipelineConfig, UMLEnhancementPipeline
+
+
+def _concepts():
+    return [
+        AbstractClass(extent=["Dog", "Cat"], intent=["+name: String", "+eat()"]),
+        AbstractClass(extent=["Car", "Bike"], intent=["+speed: int"]),
+        AbstractClass(extent=["User", "Admin"], intent=["+email: String"]),
+    ]
+
+
+@pytest.mark.unit
+class TestMockLLMServer:
+    """Test suite for the mock chat-completions server."""
+
+    def test_chat_completion_shape(self):
+        """Test that responses follow the OpenAI chat-completions shape."""
+        with MockLLMServer() as server:
+            request = urllib.request.Request(
+                f"{server.base_url}/chat/completions",
+                data=json.dumps(
+                    {
+                        "model": "mock",
+                        "messages": [{"role": "user", "content": "  - +id: int"}],
+                    }
+                ).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                data = json.loads(response.read())
+
+        assert data["object"] == "chat.completion"
+        assert data["choices"][0]["message"]["content"] == "Id"
+        assert data["usage"]["total_tokens"] > 0
+
+    def test_local_provider_names_concepts(self):
+        """Test single and batched naming through the local provider."""
+        with MockLLMServer() as server:
+            service = LLMNamingService(provider="local", base_url=server.base_url)
+            single = service.batch_name_abstract_classes(_concepts())
+
+            batched = LLMNamingService(
+                provider="local", base_url=server.base_url, batch_size=3
+            ).batch_name_abstract_classes(_concepts())
+            stats = server.stats()
+
+        assert [ac.suggested_name for ac in single] == ["Name", "Speed", "Email"]
+        assert [ac.suggested_name for ac in batched] == ["Name", "Speed", "Email"]
+        assert all(ac.confidence == 0.9 for ac in single + batched)
+        assert stats["requests"] == 4
+
+    def test_injected_errors_are_retried(self):
+        """Test that injected 429s are retried until the request succeeds."""
+        with MockLLMServer(error_rate=0.5, error_status=429, seed=3) as server:
+            service = LLMNamingService(
+                provider="local",
+                base_url=server.base_url,
+                max_retries=10,
+                retry_base_delay=0,
+            )
+            named = service.batch_name_abstract_classes(_concepts())
+            stats = server.stats()
+
+        assert [ac.suggested_name for ac in named] == ["Name", "Speed", "Email"]
+        assert stats["errors"] > 0
+        assert stats["requests"] == 3 + stats["errors"]
+
+    def test_sdk_client_does_not_retry(self):
+        """Test that only the service retries requests of the OpenAI SDK client."""
+        pytest.importorskip("openai")
+        with MockLLMServer(error_rate=0.5, error_status=429, seed=3) as server:
+            service = LLMNamingService(
+                provider="openai",
+                api_key="test",
+                base_url=server.base_url,
+                max_retries=10,
+                retry_base_delay=0,
+            )
+            named = service.batch_name_abstract_classes(_concepts())
+            stats = server.stats()
+
+        assert [ac.suggested_name for ac in named] == ["Name", "Speed", "Email"]
+        assert stats["errors"] > 0
+        assert stats["requests"] == 3 + stats["errors"]
+        assert service.metrics.summary()["retries"] == stats["errors"]
+
+        with MockLLMServer(error_rate=1.0, error_status=503) as server:
+            LLMNamingService(
+                provider="openai",
+                api_key="test",
+                base_url=server.base_url,
+                max_retries=2,
+                retry_base_delay=0,
+            ).batch_name_abstract_classes(_concepts())
+            stats = server.stats()
+
+        # One attempt plus two retries per concept, none added by the SDK
+        assert stats["requests"] == stats["errors"] == 3 * 3
+
+    def test_record_and_replay(self, tmp_path):
+        """Test that a recorded run replays without any server."""
+        path = str(tmp_path / "naming.jsonl")
+        with MockLLMServer() as server:
+            LLMNamingService(
+                provider="local",
+                base_url=server.base_url,
+                recording=PromptRecording(path, mode="record"),
+            ).batch_name_abstract_classes(_concepts())
+
+        recording = PromptRecording(path, mode="replay")
+        assert len(recording) == 3
+
+        replayed = LLMNamingService(
+            provider="openai", recording=recording
+        ).batch_name_abstract_classes(_concepts())
+        assert [ac.suggested_name for ac in replayed] == ["Name", "Speed", "Email"]
+
+        with pytest.raises(ReplayMissError):
+            recording.replay("unknown prompt", 50)
+
+    def test_pipeline_reports_naming_metrics(self, sample_plantuml, temp_output_dir):
+        """Test that a pipeline run writes the naming metrics to its results."""
+        input_file = os.path.join(temp_output_dir, "input.puml")
+        with open(input_file, "w") as f:
+            f.write(sample_plantuml)
+
+        with MockLLMServer() as server:
+            config = PipelineConfig(
+                llm_provider="local",
+                llm_base_url=server.base_url,
+                output_dir=temp_output_dir,
+                logs_dir=os.path.join(temp_output_dir, "logs"),
+                reports_dir=os.path.join(temp_output_dir, "reports"),
+                min_relevance=0.0,
+            )
+            results = UMLEnhancementPipeline(config).run(input_file)
+            requests = server.stats()["requests"]
+
+        metrics = results["steps"]["abstract_classes"]["naming_metrics"]
+        assert metrics["calls"] == requests > 0
+        assert metrics["estimated_usage_calls"] == 0
+        assert metrics["total_tokens"] > 0
+        assert metrics["latency_p95"] >= metrics["latency_p50"] > 0
+        assert len(metrics["per_call"]) == requests
@@ -0,0 +1,125 @@
+"""Unit tests for the class name index."""
+
+import os
+
+import pytest
+from src.llm_naming import AbstractClass, LLMNamingService
+from src.name_index import ClassNameIndex, ClassNameIndexBuilder, feature_terms
+from src.pipeline import PipelineConfig, UMLEnhancementPipeline
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    builder = ClassNameIndexBuilder()
+    builder.add_class("Animal", ["+name: String", "+age: int", "+eat()", "+sleep()"])
+    builder.add_class("Dog", ["+name: String", "+age: int", "+bark()"])
+    builder.add_class("Vehicle", ["+speed: int", "+start()", "+stop()"])
+    builder.add_class("shop.Product", ["+price: float", "+sku: String"])
+    # Indexed again by a later run: kept once
+    builder.add_class("Vehicle", ["+speed: int", "+start()", "+stop()"])
+    path = str(tmp_path / "names.idx")
+    builder.save(path)
+    return path
+
+
+@pytest.mark.unit
+class TestClassNameIndex:
+    """Test suite for the memory-mapped name index."""
+
+    def test_feature_terms(self):
+        """Test that member names contribute whole-name and word terms."""
+        assert feature_terms("+ createdAt : Date") == {
+            "m:createdat",
+            "w:created",
+            "w:at",
+        }
+
+    def test_suggest_nearest_class(self, index_path):
+        """Test nearest-neighbour suggestions on an intent."""
+        with ClassNameIndex.open(index_path) as index:
+            assert len(index) == 4
+
+            suggestions = index.suggest(["+name: String", "+age: int", "+eat()"])
+            assert suggestions[0][0] == "Animal"
+            assert suggestions[0][1] > suggestions[1][1] > 0
+
+            excluded = index.suggest(
+                ["+name: String", "+age: int"], exclude=["zoo.Animal"]
+            )
+            assert [name for name, _ in excluded] == ["Dog"]
+
+            assert index.suggest(["+price: float"])[0][0] == "Product"
+            assert index.suggest(["+unknown()"]) == []
+
+    def test_extend_existing_index(self, index_path):
+        """Test that an index is extended with the documents it holds."""
+        with ClassNameIndex.open(index_path) as index:
+            builder = ClassNameIndexBuilder.from_index(index)
+        builder.add_class("User", ["+email: String", "+password: String"])
+        builder.save(index_path)
+
+        with ClassNameIndex.open(index_path) as index:
+            assert len(index) == 5
+            assert index.suggest(["+email: String"])[0][0] == "User"
+            assert index.suggest(["+speed: int", "+start()"])[0][0] == "Vehicle"
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test that a file without the index header is rejected."""
+        path = tmp_path / "other.idx"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            ClassNameIndex.open(str(path))
+
+    def test_fallback_naming_uses_index(self, index_path):
+        """Test that fallback naming takes the nearest class when no rule applies."""
+        with ClassNameIndex.open(index_path) as index:
+            service = LLMNamingService(name_index=index)
+            named = service._fallback_naming(
+                AbstractClass(extent=["Car", "Bike"], intent=["+speed: int", "+stop()"])
+            )
+            assert named.suggested_name == "AbstractVehicle"
+            assert service.metrics.summary()["index_names"] == 1
+
+            # Rules still take precedence; weak matches keep the generic name
+            named = service._fallback_naming(
+                AbstractClass(extent=["A", "B"], intent=["+name: String"])
+            )
+            assert named.suggested_name == "AbstractNamed"
+            named = service._fallback_naming(
+                AbstractClass(extent=["A", "B"], intent=["+stop()", "+color: int"])
+            )
+            assert named.suggested_name == "AbstractStop"
+
+    def test_pipeline_builds_index(self, sample_plantuml, temp_output_dir):
+        """Test that every pipeline run adds its classes to the index."""
+        input_file = os.path.join(temp_output_dir, "input.puml")
+        with open(input_file, "w") as f:
+            f.write(sample_plantuml)
+        index_file = os.path.join(temp_output_dir, "names.idx")
+
+        def make_pipeline():
+            config = PipelineConfig(
+                output_dir=temp_output_dir,
+                logs_dir=os.path.join(temp_output_dir, "logs"),
+                reports_dir=os.path.join(temp_output_dir, "reports"),
+                min_relevance=0.0,
+                name_index_path=index_file,
+            )
+            return UMLEnhancementPipeline(config)
+
+        with make_pipeline() as pipeline:
+            first = pipeline.run(input_file)
+        with make_pipeline() as pipeline:
+            second = pipeline.run(input_file)
+            index = pipeline.llm_service.name_index
+
+            indexed = first["steps"]["abstract_classes"]["name_index"]["classes"]
+            assert indexed > 0
+            assert (
+                second["steps"]["abstract_classes"]["name_index"]["classes"] == indexed
+            )
+            assert len(index) == indexed
+
+        # Closing the pipeline unmaps the index
+        assert pipeline.llm_service.name_index is None
+        assert index._buffer.closed
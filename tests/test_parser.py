@@ -1,7 +1,15 @@
 """Unit tests for PlantUML parser."""
 
+import sys
+
 import pytest
-from src.parser import PlantUMLParser, UMLClass, UMLRelationship
+from src.parser import (
+    PlantUMLParser,
+    SymbolTable,
+    UMLClass,
+    UMLRelationship,
+    parse_member,
+)
 
 
 @pytest.mark.unit
@@ -190,3 +198,235 @@ Student "1..*" -- "1..*" Course
         assert rel.source == "X"
         assert rel.target == "Y"
         assert rel.relationship_type == "association"
+
+    def test_parse_file_resolves_include(self, tmp_path):
+        """Test that !include pulls classes from a relative file."""
+        (tmp_path / "common.puml").write_text(
+            "@startuml\nclass Entity {\n  +id: int\n}\n@enduml"
+        )
+        main_file = tmp_path / "main.puml"
+        main_file.write_text(
+            "@startuml\n!include common.puml\nclass Order {\n  +id: int\n}\n"
+            "Order --|> Entity\n@enduml"
+        )
+
+        parser = PlantUMLParser()
+        result = parser.parse_file(str(main_file))
+
+        assert set(result["classes"]) == {"Entity", "Order"}
+        assert len(result["relationships"]) == 1
+
+    def test_include_cache_parses_shared_fragment_once(self, tmp_path):
+        """Test that a fragment included by several diagrams is parsed once."""
+        (tmp_path / "common.puml").write_text("class Entity {\n  +id: int\n}")
+        (tmp_path / "a.puml").write_text("!include common.puml\nclass A {\n}")
+        (tmp_path / "b.puml").write_text("!include common.puml\nclass B {\n}")
+
+        cache = {}
+        result_a = PlantUMLParser(include_cache=cache).parse_file(
+            str(tmp_path / "a.puml")
+        )
+        result_b = PlantUMLParser(include_cache=cache).parse_file(
+            str(tmp_path / "b.puml")
+        )
+
+        assert str(tmp_path / "common.puml") in cache
+        assert result_a["classes"]["Entity"] is result_b["classes"]["Entity"]
+
+    def test_circular_include_raises(self, tmp_path):
+        """Test that include cycles are detected."""
+        (tmp_path / "a.puml").write_text("!include b.puml\nclass A {\n}")
+        (tmp_path / "b.puml").write_text("!include a.puml\nclass B {\n}")
+
+        parser = PlantUMLParser()
+
+        with pytest.raises(ValueError, match="Circular !include"):
+            parser.parse_file(str(tmp_path / "a.puml"))
+
+    def test_parse_files_merges_model(self, tmp_path):
+        """Test parsing a model split across several files."""
+        (tmp_path / "common.puml").write_text("class Base {\n}\nA --|> Base")
+        (tmp_path / "a.puml").write_text("!include common.puml\nclass A {\n}")
+        (tmp_path / "b.puml").write_text("!include_once common.puml\nclass B {\n}")
+
+        parser = PlantUMLParser()
+        result = parser.parse_files(
+            [str(tmp_path / "a.puml"), str(tmp_path / "b.puml")]
+        )
+
+        assert set(result["classes"]) == {"Base", "A", "B"}
+        # The shared relationship is merged only once
+        assert len(result["relationships"]) == 1
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 10), reason="dataclass slots require Python 3.10"
+    )
+    def test_model_classes_are_slotted(self):
+        """Test that model classes do not carry a per-instance __dict__."""
+        uml_class = UMLClass(name="A", attributes=[], methods=[])
+        rel = UMLRelationship(source="A", target="B", relationship_type="association")
+
+        assert not hasattr(uml_class, "__dict__")
+        assert not hasattr(rel, "__dict__")
+
+    def test_symbol_table_interns_strings(self):
+        """Test that equal strings resolve to a single shared object."""
+        symbols = SymbolTable()
+        first = symbols.intern("".join(["+id", ": int"]))
+        second = symbols.intern("".join(["+id:", " int"]))
+
+        assert first is second
+        assert "+id: int" in symbols
+        assert len(symbols) == 1
+        assert symbols.intern(None) is None
+
+    def test_default_symbols_use_sys_intern(self):
+        """Test that default interning shares names without keeping them alive."""
+        import sys
+
+        from src.parser import SYMBOLS, Symbols
+
+        assert isinstance(SYMBOLS, Symbols)
+        assert isinstance(SymbolTable(), Symbols)
+        name = "".join(["Temporary", "ClassName"])
+        assert SYMBOLS.intern(name) is sys.intern("TemporaryClassName")
+        assert SYMBOLS.intern(None) is None
+        assert not hasattr(SYMBOLS, "_symbols")
+
+    def test_parser_interns_member_and_class_names(self):
+        """Test that repeated members share storage across classes."""
+        parser = PlantUMLParser(symbols=SymbolTable())
+        result = parser.parse(
+            "class A {\n  +id: int\n}\nclass B {\n  +id: int\n}\nA --|> B"
+        )
+
+        attr_a = result["classes"]["A"].attributes[0]
+        attr_b = result["classes"]["B"].attributes[0]
+        assert attr_a is attr_b
+        assert result["relationships"][0].target is result["classes"]["B"].name
+
+    def test_parse_member_normalizes_feature_key(self):
+        """Test that spacing variants of a member share one feature key."""
+        first = parse_member("+ email : String")
+        second = parse_member("+email: String")
+
+        assert first.key == second.key == "+email: String"
+        assert first.kind == "attribute"
+        assert first.visibility == "+"
+        assert first.name == "email"
+        assert first.type == "String"
+
+    def test_parse_member_method_signature(self):
+        """Test parsing parameters and return type of a method."""
+        member = parse_member("+ ajouterProduit(p : Produit, qte:int) : void")
+
+        assert member.kind == "method"
+        assert member.name == "ajouterProduit"
+        assert member.parameters == ("p: Produit", "qte: int")
+        assert member.return_type == "void"
+        assert member.key == "+ajouterProduit(p: Produit, qte: int): void"
+
+    def test_parse_class_records_structured_members(self):
+        """Test that parsed classes keep structured members and keys."""
+        parser = PlantUMLParser()
+        result = parser.parse(
+            "class Client {\n  - id : int\n  + seConnecter() : boolean\n}"
+        )
+
+        client = result["classes"]["Client"]
+        assert client.attributes == ["-id: int"]
+        assert client.methods == ["+seConnecter(): boolean"]
+        assert [m.name for m in client.members] == ["id", "seConnecter"]
+
+    def test_parse_packages_and_class_kinds(self):
+        """Test packages, namespaces, abstract classes, interfaces and enums."""
+        parser = PlantUMLParser()
+        plantuml = """@startuml
+package shop {
+  namespace orders {
+    abstract class Order <<Entity>> {
+      +id: int
+    }
+    interface Payable {
+      +pay(): void
+    }
+  }
+  enum Status {
+    NEW
+  }
+}
+class Free {
+  +x: int
+}
+@enduml"""
+
+        result = parser.parse(plantuml)
+        classes = result["classes"]
+
+        assert classes["Order"].kind == "abstract"
+        assert classes["Order"].package == "shop.orders"
+        assert classes["Order"].stereotypes == ["Entity"]
+        assert classes["Payable"].kind == "interface"
+        assert classes["Payable"].methods == ["+pay(): void"]
+        assert classes["Status"].kind == "enum"
+        assert classes["Status"].package == "shop"
+        assert classes["Free"].package is None
+        assert classes["Free"].attributes == ["+x: int"]
+
+    def test_class_without_body_does_not_capture_members(self):
+        """Test that a bodiless declaration does not swallow a package brace."""
+        parser = PlantUMLParser()
+        result = parser.parse("package p {\n  class A\n}\nclass B {\n  +b: int\n}")
+
+        assert result["classes"]["A"].package == "p"
+        assert result["classes"]["B"].package is None
+        assert result["classes"]["B"].attributes == ["+b: int"]
+
+    def test_reparse_reuses_unchanged_elements(self):
+        """Test that only edited class blocks are re-tokenized."""
+        parser = PlantUMLParser()
+        old_text = (
+            "@startuml\nclass A {\n  +a: int\n}\nclass B {\n  +b: int\n}\n"
+            "A --> B\n@enduml"
+        )
+        old = parser.parse(old_text)
+        new_text = old_text.replace("+b: int", "+b: int\n  +c: String")
+
+        new = parser.reparse(old, new_text)
+
+        assert new["classes"]["A"] is old["classes"]["A"]
+        assert new["relationships"][0] is old["relationships"][0]
+        assert new["classes"]["B"].attributes == ["+b: int", "+c: String"]
+        assert list(new["changes"]["modified"]) == ["B"]
+        assert new["changes"]["added"] == {}
+        assert new["changes"]["removed"] == []
+        assert new["changes"]["retokenized_lines"] < len(new["lines"])
+
+    def test_reparse_reports_added_and_removed_elements(self):
+        """Test that class and relationship additions/removals are reported."""
+        parser = PlantUMLParser()
+        old = parser.parse("class A {\n}\nclass B {\n}\nA --> B")
+
+        new = parser.reparse(old, "class A {\n}\nclass C {\n}\nA --|> C")
+
+        assert list(new["changes"]["added"]) == ["C"]
+        assert new["changes"]["removed"] == ["B"]
+        added = new["changes"]["relationships"]["added"]
+        removed = new["changes"]["relationships"]["removed"]
+        assert [(r.source, r.target) for r in added] == [("A", "C")]
+        assert [(r.source, r.target) for r in removed] == [("A", "B")]
+
+    def test_reparse_matches_full_parse_after_package_edit(self):
+        """Test that a renamed package re-tokenizes the classes it contains."""
+        parser = PlantUMLParser()
+        old_text = "package a {\nclass A {\n  +x: int\n}\n}\nclass B {\n}"
+        old = parser.parse(old_text)
+        new_text = old_text.replace("package a", "package renamed")
+
+        new = parser.reparse(old, new_text)
+        full = PlantUMLParser().parse(new_text)
+
+        assert new["classes"] == full["classes"]
+        assert new["classes"]["A"].package == "renamed"
+        assert list(new["changes"]["modified"]) == ["A"]
+        assert new["classes"]["B"] is old["classes"]["B"]
@@ -31,6 +31,7 @@ class TestPipeline:
 
         assert pipeline.config.output_dir == temp_output_dir
         assert os.path.exists(temp_output_dir)
+        assert os.path.isdir(os.path.join(temp_output_dir, "reports"))
 
     def test_step_parse(self, sample_plantuml, temp_output_dir):
         """Test parsing step."""
@@ -78,6 +79,184 @@ class TestPipeline:
         # Verify output file exists
         assert os.path.exists(results["output_path"])
 
+    def test_step_parse_multiple_files(self, temp_output_dir):
+        """Test parsing a multi-file model as a single context."""
+        common = os.path.join(temp_output_dir, "common.puml")
+        with open(common, "w") as f:
+            f.write("class Entity {\n  +id: int\n}")
+
+        input_files = []
+        for name in ("Order", "Invoice"):
+            path = os.path.join(temp_output_dir, f"{name.lower()}.puml")
+            with open(path, "w") as f:
+                f.write(f"!include common.puml\nclass {name} {{\n  +id: int\n}}")
+            input_files.append(path)
+
+        pipeline = UMLEnhancementPipeline()
+        result = pipeline._step_parse(input_files)
+
+        assert set(result["classes"]) == {"Entity", "Order", "Invoice"}
+        assert len(pipeline.parser.include_cache) == 3
+
+    def test_kg_export_formats(self, sample_plantuml, temp_output_dir):
+        """Test the knowledge graph export options of the pipeline."""
+        input_file = os.path.join(temp_output_dir, "input.puml")
+        with open(input_file, "w") as f:
+            f.write(sample_plantuml)
+
+        with pytest.raises(ValueError, match="Unknown knowledge graph export format"):
+            PipelineConfig(kg_export_format="graphml")
+
+        expected = {"ndjson": ".jsonl.gz", "node-link": ".json", "none": None}
+        for export_format, suffix in expected.items():
+            config = PipelineConfig(
+                output_dir=temp_output_dir,
+                logs_dir=os.path.join(temp_output_dir, "logs"),
+                reports_dir=os.path.join(temp_output_dir, "reports"),
+                kg_export_format=export_format,
+                kg_export_compress=True,
+            )
+            pipeline = UMLEnhancementPipeline(config)
+            pipeline._step_build_knowledge_graph(pipeline._step_parse(input_file))
+
+            output = pipeline._step_export_knowledge_graph(export_format)
+            if suffix is None:
+                assert output is None
+            else:
+                assert output.endswith(suffix)
+                assert os.path.exists(output)
+
+    def test_kg_store(self, sample_plantuml, temp_output_dir):
+        """Test that each run is appended to the knowledge graph store."""
+        from src.kg_store import KnowledgeGraphStore
+
+        input_file = os.path.join(temp_output_dir, "input.puml")
+        with open(input_file, "w") as f:
+            f.write(sample_plantuml)
+        store_path = os.path.join(temp_output_dir, "kg.sqlite")
+
+        config = PipelineConfig(
+            output_dir=temp_output_dir,
+            logs_dir=os.path.join(temp_output_dir, "logs"),
+            reports_dir=os.path.join(temp_output_dir, "reports"),
+            kg_store_path=store_path,
+        )
+        results = UMLEnhancementPipeline(config).run(input_file)
+
+        run_id = results["steps"]["knowledge_graph"]["store_run_id"]
+        with KnowledgeGraphStore(store_path) as store:
+            assert [run["id"] for run in store.runs()] == [run_id]
+            assert store.classes_with_feature("breed", run_id=run_id) == [
+                (run_id, "Dog")
+            ]
+
+    def test_close_releases_naming_cache(self, temp_output_dir):
+        """Test that closing the pipeline closes its naming cache database."""
+        import sqlite3
+
+        config = PipelineConfig(
+            output_dir=temp_output_dir,
+            logs_dir=os.path.join(temp_output_dir, "logs"),
+            reports_dir=os.path.join(temp_output_dir, "reports"),
+            naming_cache_path=os.path.join(temp_output_dir, "names.db"),
+        )
+        with UMLEnhancementPipeline(config) as pipeline:
+            cache = pipeline.llm_service.cache
+            assert cache is not None
+
+        assert pipeline.llm_service.cache is None
+        with pytest.raises(sqlite3.ProgrammingError):
+            cache.stats()
+        # Closing twice is harmless
+        pipeline.close()
+
+    def test_invalid_partition_strategy(self):
+        """Test that unknown partition strategies are rejected."""
+        with pytest.raises(ValueError, match="Unknown partition strategy"):
+            PipelineConfig(partition_by="galaxy")
+
+    def test_partition_classes(self, temp_output_dir):
+        """Test splitting classes by package and by relationship component."""
+        from src.parser import PlantUMLParser
+
+        parsed = PlantUMLParser().parse(
+            "package a {\n class A1 {\n }\n class A2 {\n }\n}\n"
+            "package b {\n class B1 {\n }\n}\nclass C {\n}\nA1 --> B1"
+        )
+        logs_dir = os.path.join(temp_output_dir, "logs")
+
+        pipeline = UMLEnhancementPipeline(
+            PipelineConfig(
+                output_dir=temp_output_dir, logs_dir=logs_dir, partition_by="package"
+            )
+        )
+        assert pipeline._partition_classes(parsed) == {
+            "a": ["A1", "A2"],
+            "b": ["B1"],
+            "": ["C"],
+        }
+
+        pipeline._step_build_knowledge_graph(parsed)
+        pipeline.config.partition_by = "component"
+        assert pipeline._partition_classes(parsed) == {
+            "component_1": ["A1", "B1"],
+            "isolated": ["A2", "C"],
+        }
+
+    def test_full_pipeline_run_partitioned(self, temp_output_dir):
+        """Test running FCA per package and merging the concepts."""
+        input_file = os.path.join(temp_output_dir, "input.puml")
+        with open(input_file, "w") as f:
+            f.write(
+                "package animals {\n"
+                "class Dog {\n  +name: String\n  +bark()\n}\n"
+                "class Cat {\n  +name: String\n  +meow()\n}\n}\n"
+                "package vehicles {\n"
+                "class Car {\n  +speed: int\n}\n"
+                "class Truck {\n  +speed: int\n}\n}\n"
+            )
+
+        config = PipelineConfig(
+            output_dir=temp_output_dir,
+            logs_dir=os.path.join(temp_output_dir, "logs"),
+            reports_dir=os.path.join(temp_output_dir, "reports"),
+            min_relevance=0.0,
+            partition_by="package",
+            max_workers=2,
+        )
+        results = UMLEnhancementPipeline(config).run(input_file)
+
+        assert results["steps"]["fca_export"]["partitions_count"] == 2
+        assert len(results["steps"]["fca_export"]["context_files"]) == 2
+        assert results["steps"]["abstract_classes"]["count"] == 2
+
+    def test_full_pipeline_run_communities_with_hubs(self, temp_output_dir):
+        """Test FCA per community plus the joint analysis of hub classes."""
+        input_file = os.path.join(temp_output_dir, "input.puml")
+        with open(input_file, "w") as f:
+            f.write(
+                "class Dog {\n  +name: String\n  +legs: int\n}\n"
+                "class Cat {\n  +name: String\n  +legs: int\n}\n"
+                "class Car {\n  +wheels: int\n  +owner: String\n}\n"
+                "class Truck {\n  +wheels: int\n  +owner: String\n}\n"
+                "class Bike {\n  +wheels: int\n  +name: String\n}\n"
+                "Dog --> Cat\nCar --> Truck\n"
+            )
+
+        config = PipelineConfig(
+            output_dir=temp_output_dir,
+            logs_dir=os.path.join(temp_output_dir, "logs"),
+            reports_dir=os.path.join(temp_output_dir, "reports"),
+            min_relevance=0.0,
+            partition_by="community",
+            fca_hubs=True,
+        )
+        results = UMLEnhancementPipeline(config).run(input_file)
+
+        context_files = results["steps"]["fca_export"]["context_files"]
+        assert results["steps"]["fca_export"]["partitions_count"] == 2
+        assert any(path.endswith("_hubs.csv") for path in context_files)
+
 
 @pytest.mark.e2e
 class TestEndToEnd:
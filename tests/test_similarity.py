@@ -0,0 +1,59 @@
+"""Unit tests for the MinHash/LSH similarity index."""
+
+import pytest
+from src.knowledge_graph import KnowledgeGraph
+from src.parser import UMLClass
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from src.similarity import MinHashIndex
+
+
+@pytest.fixture
+def similar_classes():
+    """Two near-duplicate classes, one close variant and one unrelated class."""
+    shared = [f"+field{i}: String" for i in range(8)]
+    return {
+        "Customer": UMLClass("Customer", shared, ["+save()"]),
+        "Client": UMLClass("Client", shared, ["+save()"]),
+        "Supplier": UMLClass("Supplier", shared[:6], ["+save()", "+ship()"]),
+        "Engine": UMLClass("Engine", ["+power: int"], ["+start()"]),
+        "Empty": UMLClass("Empty", [], []),
+    }
+
+
+@pytest.mark.unit
+class TestMinHashIndex:
+    """Test suite for the similarity index."""
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_query(self, backend, similar_classes):
+        """Test that the most similar classes come first."""
+        kg = KnowledgeGraph(backend=backend)
+        kg.from_uml_model(similar_classes, [])
+
+        index = MinHashIndex.from_knowledge_graph(kg)
+        results = index.query("Customer", top_k=2)
+
+        assert results[0] == ("Client", 1.0)
+        assert results[1][0] == "Supplier"
+        assert 0.4 < results[1][1] < 1.0
+        assert index.query("Empty") == []
+
+    def test_candidate_pairs(self, similar_classes):
+        """Test candidate pairs and the similarity threshold."""
+        kg = KnowledgeGraph()
+        kg.from_uml_model(similar_classes, [])
+        index = MinHashIndex.from_knowledge_graph(kg)
+
+        pairs = index.candidate_pairs()
+        assert pairs[0] == ("Client", "Customer", 1.0)
+        assert all("Engine" not in pair and "Empty" not in pair for pair in pairs)
+        assert index.candidate_pairs(threshold=0.99) == [("Client", "Customer", 1.0)]
+        assert index.similarity("Client", "Engine") < 0.2
+
+    def test_invalid_bands(self):
+        """Test that bands must divide the signature length."""
+        with pytest.raises(ValueError, match="must divide"):
+            MinHashIndex(num_perm=128, bands=30)